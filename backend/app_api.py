@@ -4,13 +4,23 @@ Exposes structured JSON endpoints for the React frontend while using
 the same LangChain / RAG pipeline (ingestion, retrieval, reasoning).
 """
 
+import contextvars
+import functools
+import hmac
 import logging
 import os
 import hashlib
+import random
 import json
+import threading
+import time
 import traceback
-from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from typing import List, Dict, Any, Callable, Iterator, NamedTuple, Optional, Tuple, Union
 
+import numpy as np
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -23,18 +33,17 @@ logging.basicConfig(
 )
 logger = logging.getLogger("squad_api")
 
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from langchain_openai import ChatOpenAI
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from langchain_core.messages import HumanMessage
 
-from src import ingestion, retrieval, reasoning
-
-# Valid tactic options (must match frontend types)
-VALID_FORMATIONS = ("4-3-3", "4-4-2", "3-5-2", "4-2-3-1", "3-4-3")
-VALID_BUILD_UP = ("Balanced", "Counter-Attack", "Short Passing")
-VALID_DEFENSIVE = ("Balanced", "Deep Block", "High Press", "Aggressive")
+from src import (
+    admission, clients, embeddings, ingestion, lexical, loader, metrics, presets, profiling, retrieval, reasoning, scoring,
+    similarity, tactics, tracing,
+)
+from src.tactics import VALID_FORMATIONS, VALID_BUILD_UP, VALID_DEFENSIVE
 
 app = FastAPI(title="World Cup Squad Builder API")
 
@@ -48,46 +57,266 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    """Load FAISS index at startup to avoid per-request loading."""
-    global _vector_store, _retriever, _player_lookup
-    if os.path.isdir(FAISS_INDEX_PATH):
-        try:
-            logger.info("Loading FAISS index from disk at startup...")
-            _vector_store = retrieval.load_vector_store(FAISS_INDEX_PATH)
-            _retriever = retrieval.get_retriever(_vector_store, k=50)
-            logger.info("FAISS index loaded successfully.")
-            
-            # Build lightweight player lookup from FAISS metadata (no CSV loading)
-            logger.info("Building player lookup cache...")
-            if hasattr(_vector_store, 'docstore') and hasattr(_vector_store.docstore, '_dict'):
-                for doc in _vector_store.docstore._dict.values():
-                    meta = doc.metadata if hasattr(doc, 'metadata') else {}
-                    name = str(meta.get('short_name', '')).strip().upper()
-                    if name:
-                        _player_lookup[name] = meta
-            logger.info("Player lookup cache built with %d entries.", len(_player_lookup))
-        except Exception as e:
-            logger.error("Failed to load FAISS index: %s", e)
+    """Warm the FAISS index and player table: on a background thread (default) or before serving."""
+    if STARTUP_MODE == "eager":
+        _warm_up()
     else:
-        logger.warning("No FAISS index found at %s. Will build on first request.", FAISS_INDEX_PATH)
+        threading.Thread(target=_warm_up, name="index-warm-up", daemon=True).start()
+
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    """Latency per endpoint into src.metrics and a root trace span per request (its trace id is
+    returned in X-Trace-Id); with TIMING_HEADERS=1 the request's stage timings are returned in a
+    Server-Timing header."""
+    start = time.perf_counter()
+    with tracing.span(request.method, kind="server", traceparent=request.headers.get("traceparent")) as root:
+        with metrics.request_timings() as timings:
+            response = await call_next(request)
+        seconds = time.perf_counter() - start
+        endpoint = getattr(request.scope.get("route"), "path", "unmatched")
+        if root is not None:
+            root.name = f"{request.method} {endpoint}"
+            root.set_attributes(**{
+                "http.method": request.method, "http.route": endpoint, "http.status_code": response.status_code,
+            })
+            if response.status_code >= 500:
+                root.error = f"HTTP {response.status_code}"
+            response.headers["X-Trace-Id"] = root.trace_id
+    metrics.observe(
+        "squad_http_request_seconds", seconds, endpoint=endpoint, method=request.method, status=response.status_code
+    )
+    if TIMING_HEADERS:
+        response.headers["Server-Timing"] = ", ".join(
+            [f"{name};dur={s * 1000:.1f}" for name, s in timings.items()] + [f"total;dur={seconds * 1000:.1f}"]
+        )
+    return response
 
 # ── Module-level cache ──────────────────────────────────────────────────────
-_documents: List[Any] = []  # Only for initial FAISS build, then cleared
-_vector_store: Any = None
-_retriever: Any = None
 _last_shortlist: List[Dict[str, Any]] = []
 _last_squad: Dict[str, Any] = {}
-_player_lookup: Dict[str, Dict[str, Any]] = {}  # Lightweight name→metadata cache
+_last_tactic: Tuple[str, str, str] = ("4-3-3", "Balanced", "Balanced")
+
+
+class DatasetSnapshot(NamedTuple):
+    """One load of the player index and everything derived from it. A reload builds a new snapshot
+    and swaps it in whole; a request reads one snapshot from start to finish (current_snapshot)."""
+
+    version: str  # fingerprint of the player metadata ("" before the first load); tags cache keys
+    vector_store: Any
+    retriever: Any
+    # Player table: metadata rows in index order, keyed by ingestion.player_key (the dataset's player_id)
+    players: List[Dict[str, Any]]
+    player_rows: Dict[int, int]  # player key -> row in players / projections
+    projections: List["PlayerProjection"]  # Frontend Player shapes built at index load
+    fit_features: np.ndarray  # stat table, row per player
+    slot_eligible: np.ndarray  # player can play slot position
+    # Tactic fit scores per (formation, build-up, defensive): n x len(scoring.SLOT_POSITIONS), 0 where ineligible
+    fit_cache: Dict[Tuple[str, str, str], np.ndarray]
+    similarity_vectors: np.ndarray
+    player_values: np.ndarray  # value_eur per player row, for similar-player filters
+    lexical_index: lexical.BM25Index  # keyword index over the player table
+    position_partitions: Dict[str, np.ndarray]  # FAISS row ids per bucket / natural position
+    nation_partitions: Dict[str, np.ndarray]  # FAISS row ids per lowercased nationality
+
+
+_EMPTY_SNAPSHOT = DatasetSnapshot(
+    version="",
+    vector_store=None,
+    retriever=None,
+    players=[],
+    player_rows={},
+    projections=[],
+    fit_features=np.zeros((0, len(scoring.FIT_FEATURES)), dtype=np.float32),
+    slot_eligible=np.zeros((0, len(scoring.SLOT_POSITIONS)), dtype=bool),
+    fit_cache={},
+    similarity_vectors=np.zeros((0, len(similarity.SIMILARITY_FEATURES)), dtype=np.float32),
+    player_values=np.zeros(0),
+    lexical_index=lexical.BM25Index([]),
+    position_partitions={},
+    nation_partitions={},
+)
+_snapshot = _EMPTY_SNAPSHOT  # latest snapshot; replaced (never mutated) by _on_data_loaded
+_fit_cache_max_size = 8
+
+
+class _SnapshotPin(threading.local):
+    active = False
+    snapshot: Optional[DatasetSnapshot] = None
+
+
+_pin = _SnapshotPin()
+
+
+def current_snapshot() -> DatasetSnapshot:
+    """The snapshot to read. Inside pin_snapshot() the first loaded snapshot seen stays pinned for the
+    rest of the request, so a request in flight during a reload finishes on the data it started with."""
+    if not _pin.active:
+        return _snapshot
+    if _pin.snapshot is None and _snapshot is not _EMPTY_SNAPSHOT:
+        _pin.snapshot = _snapshot
+    return _pin.snapshot or _snapshot
+
+
+@contextmanager
+def pin_snapshot(snapshot: Optional[DatasetSnapshot] = None) -> Iterator[None]:
+    """Pin `snapshot` (default: the next loaded snapshot read) for the current thread; nested pins keep the outer one."""
+    previous = (_pin.active, _pin.snapshot)
+    _pin.active, _pin.snapshot = True, previous[1] or snapshot
+    try:
+        yield
+    finally:
+        _pin.active, _pin.snapshot = previous
+
+
+def pinned(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Run a (sync) endpoint under pin_snapshot()."""
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with pin_snapshot():
+            return endpoint(*args, **kwargs)
+
+    return wrapper
+
+
+# Main shortlist query: "hybrid" (BM25 + FAISS fused, lexical fast path), "semantic" or "lexical"
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+
+# Squads built concurrently by a batch request (each holds one reasoning LLM call at a time); a request
+# may ask for less, never more. BATCH_MAX_JOBS caps the jobs in one /api/batch-build-squads request.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "256"))
+
+# Admin endpoints (e.g. POST /api/admin/reload) require this value in X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+_reload_lock = threading.Lock()
+
+# Request profiling: a squad build or chat request sent with "X-Profile: 1" and a valid X-Admin-Token,
+# or a PROFILE_SAMPLE_RATE share of all of them, is profiled into PROFILE_DIR as a collapsed-stack
+# (flamegraph) file named in the X-Profile-Id response header; PROFILE_MAX_FILES and
+# PROFILE_MAX_BYTES cap how many are kept and how large each may be
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(ingestion.PROJECT_ROOT, "data/profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_MAX_BYTES = int(os.getenv("PROFILE_MAX_BYTES", "2000000"))
+_profiler = profiling.Profiler(PROFILE_DIR, max_files=PROFILE_MAX_FILES, max_bytes=PROFILE_MAX_BYTES)
+
+# Tracing: TRACE_EXPORTER "file" appends one JSON span per line to TRACE_FILE, "otlp" posts OTLP/HTTP
+# JSON to TRACE_OTLP_ENDPOINT (a collector or stand-in), "none" disables it; TRACE_SAMPLE_RATE is the
+# share of requests traced
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(ingestion.PROJECT_ROOT, "data/traces/spans.jsonl"))
+TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "1"))
+tracing.configure(TRACE_EXPORTER, path=TRACE_FILE, endpoint=TRACE_OTLP_ENDPOINT, sample_rate=TRACE_SAMPLE_RATE)
+
+# Per-request stage timings in a Server-Timing response header (GET /metrics always has the totals)
+TIMING_HEADERS = os.getenv("TIMING_HEADERS", "0") == "1"
+
+# "background": answer /api/health at once and warm the index on a thread (/api/ready reports
+# when it is done); "eager": finish the warm-up before the server accepts requests
+STARTUP_MODE = os.getenv("STARTUP_MODE", "background")
+
+# Concurrent reasoning generations per squad build (first valid wins); 1 disables speculation
+SPECULATIVE_GENERATIONS = int(os.getenv("SPECULATIVE_GENERATIONS", "1"))
+# With speculation: 1 awaits every generation and keeps the best valid squad instead of the first;
+# SPECULATIVE_MAX_PROMPT_TOKENS caps the generations so their prompts total at most that many tokens
+SPECULATIVE_PICK_BEST = os.getenv("SPECULATIVE_PICK_BEST", "0") == "1"
+SPECULATIVE_MAX_PROMPT_TOKENS = int(os.getenv("SPECULATIVE_MAX_PROMPT_TOKENS", "0")) or None
+
+# Admission control for LLM-bound requests (uncached squad builds, batch jobs included; LLM tactics inference):
+# at most ADMISSION_MAX_CONCURRENT run at once (default: what the LLM connection pool can serve
+# with speculation; 0 disables admission control), ADMISSION_MAX_QUEUE more wait up to
+# ADMISSION_MAX_WAIT seconds, and one client may hold at most ADMISSION_PER_CLIENT of either.
+# Requests beyond that get 429 with Retry-After.
+ADMISSION_MAX_CONCURRENT = int(
+    os.getenv("ADMISSION_MAX_CONCURRENT", str(max(1, clients.MAX_CONCURRENCY // max(1, SPECULATIVE_GENERATIONS))))
+)
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "30"))
+ADMISSION_PER_CLIENT = int(os.getenv("ADMISSION_PER_CLIENT", "4"))
+# Peer addresses of reverse proxies whose X-Forwarded-For is believed (comma-separated); from anyone
+# else the header is ignored, so clients cannot pick their own identity
+TRUSTED_PROXIES = frozenset(h.strip() for h in os.getenv("TRUSTED_PROXIES", "").split(",") if h.strip())
+_admission = admission.AdmissionController(
+    ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUE, ADMISSION_PER_CLIENT, ADMISSION_MAX_WAIT
+)
+
 
-# Persisted FAISS index path (avoid re-embedding 16k docs on every server start)
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-FAISS_INDEX_PATH = os.path.join(PROJECT_ROOT, "data/faiss_index")
+def _llm_slot(client: Optional[str]):
+    """Admission slot for LLM-bound work on behalf of `client`; internal callers (client None) skip it."""
+    if client is None or ADMISSION_MAX_CONCURRENT <= 0:
+        return nullcontext()
+    return _admission.slot(client)
+
+
+def _client_id(request: Request) -> str:
+    """Caller identity for per-client admission: the peer address or, when the peer is a trusted proxy,
+    the nearest X-Forwarded-For hop that is not itself a trusted proxy."""
+    peer = request.client.host if request.client else "anonymous"
+    if peer not in TRUSTED_PROXIES:
+        return peer
+    hops = [h.strip() for h in request.headers.get("x-forwarded-for", "").split(",") if h.strip()]
+    for hop in reversed(hops):
+        if hop not in TRUSTED_PROXIES:
+            return hop
+    return hops[0] if hops else peer
+
+
+@contextmanager
+def _profiled(request: Request, label: str) -> Iterator[Dict[str, str]]:
+    """Profile the block when the request asks for it (X-Profile: 1, admin token required) or is
+    sampled; yields the response headers naming the profile (empty when not profiled)."""
+    headers: Dict[str, str] = {}
+    if request.headers.get("x-profile") == "1":
+        _require_admin(request.headers.get("x-admin-token"))
+    elif not (PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE):
+        yield headers
+        return
+    with _profiler.record(label) as name:
+        if name is not None:
+            headers["X-Profile-Id"] = name
+        yield headers
 
 # Pipeline response cache: same request returns cached result (no extra API calls)
 _response_cache: Dict[str, Dict[str, Any]] = {}
 _response_cache_max_size = 100
 _response_cache_keys: List[str] = []  # order for LRU eviction
 
+# Per-slot alternatives are served lazily by GET /api/squads/{squad_id}/alternatives/{slot_index};
+# PREFETCH_ALTERNATIVES=1 computes them in a background task after the build response is sent
+ALTERNATIVES_PER_SLOT = 5
+PREFETCH_ALTERNATIVES = os.getenv("PREFETCH_ALTERNATIVES", "0") == "1"
+
+
+class SquadContext(NamedTuple):
+    """What a built squad's alternatives are computed from; kept as long as its cached response."""
+
+    version: str  # dataset snapshot the squad was built from
+    shortlist: List[Dict[str, Any]]
+    tactic: Tuple[str, str, str]
+    slot_positions: List[str]
+    slot_player_ids: List[Optional[str]]
+    alternatives: Dict[int, List[orjson.Fragment]]  # slot index -> computed alternatives
+
+
+_squad_contexts: Dict[str, SquadContext] = {}  # squad handle (pipeline cache key) -> context
+
+# Preset squads (src/presets.py) served from the precomputed artifact while its data version matches
+PRESETS_PATH = os.getenv("PRESETS_PATH", presets.DEFAULT_ARTIFACT_PATH)
+PRESETS_ENABLED = os.getenv("PRESETS_ENABLED", "1") == "1"
+# A stale artifact is only rebuilt on request (POST /api/admin/presets/refresh or precompute_presets.py)
+# unless PRESETS_AUTO_REFRESH=1; the API's rebuilds are admitted as one internal client and run
+# PRESETS_REFRESH_CONCURRENCY squads at a time, so they never crowd out user requests
+PRESETS_AUTO_REFRESH = os.getenv("PRESETS_AUTO_REFRESH", "0") == "1"
+PRESETS_REFRESH_CONCURRENCY = int(os.getenv("PRESETS_REFRESH_CONCURRENCY", "1"))
+PRESETS_CLIENT = "internal:presets"
+# Passes over preset jobs that admission control turned away
+PRESETS_REFRESH_PASSES = 3
+_preset_squads: Dict[str, Dict[str, Any]] = {}  # pipeline cache key -> result
+_preset_refresh_lock = threading.Lock()
+
 # ── Formation Templates (must mirror the frontend exactly) ──────────────────
 FORMATION_TEMPLATES: Dict[str, List[Dict[str, Any]]] = {
     "4-3-3": [
@@ -227,8 +456,8 @@ COUNTRY_FLAGS: Dict[str, str] = {
 
 
 def _player_id(p: Dict[str, Any]) -> str:
-    key = f"{p.get('short_name', '')}_{p.get('overall', '')}_{p.get('club_name', '')}"
-    return hashlib.md5(key.encode()).hexdigest()[:8]
+    """Frontend player id: the stable integer player key as a string."""
+    return str(ingestion.player_key(p))
 
 
 def _safe_int(val: Any, default: int = 0) -> int:
@@ -250,53 +479,190 @@ def _get_specific_positions(p: Dict[str, Any]) -> List[str]:
     return [pos.strip().upper() for pos in raw.split(",") if pos.strip()]
 
 
-def transform_player(player_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Transform backend player metadata to the frontend Player shape. Tolerates missing keys."""
-    if not isinstance(player_data, dict):
-        player_data = {}
+STAT_NAMES = ("pace", "shooting", "passing", "dribbling", "defending", "physical")
+
+
+class PlayerProjection(NamedTuple):
+    """Frontend Player fields for one player (minus justification), built once at index load."""
+
+    id: str
+    name: str
+    position: str
+    rating: int
+    country: str
+    country_flag: str
+    club: str
+    age: int
+    stats: Tuple[int, ...]
+    price: float
+    height: int
+    encoded: bytes = b""  # orjson bytes of to_player() with an empty justification
+
+    def to_player(self, justification: str = "") -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "position": self.position,
+            "rating": self.rating,
+            "country": self.country,
+            "countryFlag": self.country_flag,
+            "club": self.club,
+            "age": self.age,
+            "stats": dict(zip(STAT_NAMES, self.stats)),
+            "price": self.price,
+            "height": self.height,
+            "justification": justification,
+        }
+
+    @property
+    def fragment(self) -> orjson.Fragment:
+        """Pre-encoded JSON for embedding in FastJSONResponse payloads without re-serializing."""
+        return orjson.Fragment(self.encoded)
+
+
+def _build_projection(player_data: Dict[str, Any]) -> PlayerProjection:
     positions = _get_specific_positions(player_data)
     first_position = positions[0] if positions else str(player_data.get("primary_position") or "ST")
     value_eur = _safe_float(player_data.get("value_eur", 0))
 
-    is_gk = first_position == "GK"
-    if is_gk:
-        stats = {
-            "pace": _safe_int(player_data.get("gk_speed", player_data.get("pace"))),
-            "shooting": _safe_int(player_data.get("gk_kicking", player_data.get("shooting"))),
-            "passing": _safe_int(player_data.get("gk_kicking", player_data.get("passing"))),
-            "dribbling": _safe_int(player_data.get("gk_handling", player_data.get("dribbling"))),
-            "defending": _safe_int(player_data.get("gk_positioning", player_data.get("defending"))),
-            "physical": _safe_int(player_data.get("gk_reflexes", player_data.get("physic"))),
-        }
+    if first_position == "GK":
+        stats = (
+            _safe_int(player_data.get("gk_speed", player_data.get("pace"))),
+            _safe_int(player_data.get("gk_kicking", player_data.get("shooting"))),
+            _safe_int(player_data.get("gk_kicking", player_data.get("passing"))),
+            _safe_int(player_data.get("gk_handling", player_data.get("dribbling"))),
+            _safe_int(player_data.get("gk_positioning", player_data.get("defending"))),
+            _safe_int(player_data.get("gk_reflexes", player_data.get("physic"))),
+        )
     else:
-        stats = {
-            "pace": _safe_int(player_data.get("pace")),
-            "shooting": _safe_int(player_data.get("shooting")),
-            "passing": _safe_int(player_data.get("passing")),
-            "dribbling": _safe_int(player_data.get("dribbling")),
-            "defending": _safe_int(player_data.get("defending")),
-            "physical": _safe_int(player_data.get("physic")),
-        }
+        stats = tuple(
+            _safe_int(player_data.get(k))
+            for k in ("pace", "shooting", "passing", "dribbling", "defending", "physic")
+        )
 
-    return {
-        "id": _player_id(player_data),
-        "name": player_data.get("short_name", player_data.get("long_name", "Unknown")),
-        "position": first_position,
-        "rating": _safe_int(player_data.get("overall")),
-        "country": player_data.get("nationality_name", ""),
-        "countryFlag": COUNTRY_FLAGS.get(player_data.get("nationality_name", ""), "🏳️"),
-        "club": player_data.get("club_name", ""),
-        "age": _safe_int(player_data.get("age")),
-        "stats": stats,
-        "price": round(value_eur / 1_000_000, 1) if value_eur else 0,
-        "height": _safe_int(player_data.get("height_cm")),
-        "justification": player_data.get("justification", ""),
-    }
+    projection = PlayerProjection(
+        id=_player_id(player_data),
+        name=player_data.get("short_name", player_data.get("long_name", "Unknown")),
+        position=first_position,
+        rating=_safe_int(player_data.get("overall")),
+        country=player_data.get("nationality_name", ""),
+        country_flag=COUNTRY_FLAGS.get(player_data.get("nationality_name", ""), "🏳️"),
+        club=player_data.get("club_name", ""),
+        age=_safe_int(player_data.get("age")),
+        stats=stats,
+        price=round(value_eur / 1_000_000, 1) if value_eur else 0,
+        height=_safe_int(player_data.get("height_cm")),
+    )
+    return projection._replace(encoded=orjson.dumps(projection.to_player()))
 
 
-def _can_play_slot(player_positions: List[str], slot_position: str) -> bool:
-    compatible = SLOT_COMPATIBLE_POSITIONS.get(slot_position, [slot_position])
-    return any(pp in compatible for pp in player_positions)
+def project_player(player_data: Dict[str, Any]) -> PlayerProjection:
+    """Precomputed projection for an indexed player; built on the fly for anything else."""
+    if not isinstance(player_data, dict):
+        player_data = {}
+    snap = current_snapshot()
+    row = snap.player_rows.get(ingestion.player_key(player_data))
+    return snap.projections[row] if row is not None else _build_projection(player_data)
+
+
+def transform_player(player_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Transform backend player metadata to the frontend Player shape. Tolerates missing keys."""
+    if not isinstance(player_data, dict):
+        player_data = {}
+    return project_player(player_data).to_player(player_data.get("justification", ""))
+
+
+def get_player(player_id: int) -> Optional[Dict[str, Any]]:
+    """O(1) lookup of an indexed player's metadata by player key."""
+    snap = current_snapshot()
+    row = snap.player_rows.get(player_id)
+    return snap.players[row] if row is not None else None
+
+
+def _build_snapshot(vector_store: Any, retriever: Any) -> DatasetSnapshot:
+    """Player table, frontend projections and every derived index for a loaded vector store."""
+    players: List[Dict[str, Any]] = []
+    rows: Dict[int, int] = {}
+    for doc in vector_store.docstore._dict.values():
+        meta = getattr(doc, "metadata", None)
+        if meta is None:
+            continue
+        key = ingestion.player_key(meta)
+        if key in rows:
+            continue
+        rows[key] = len(players)
+        players.append(meta)
+    slot_eligible = np.array(
+        [[_can_cover_slot(meta, pos) for pos in scoring.SLOT_POSITIONS] for meta in players], dtype=bool
+    ).reshape(len(players), len(scoring.SLOT_POSITIONS))
+    return DatasetSnapshot(
+        version=hashlib.md5(orjson.dumps(players, default=str, option=orjson.OPT_SORT_KEYS)).hexdigest()[:12],
+        vector_store=vector_store,
+        retriever=retriever,
+        players=players,
+        player_rows=rows,
+        projections=[_build_projection(meta) for meta in players],
+        fit_features=scoring.feature_matrix(players),
+        slot_eligible=slot_eligible,
+        fit_cache={},
+        similarity_vectors=similarity.similarity_matrix(players),
+        player_values=np.array([_safe_float(meta.get("value_eur")) for meta in players], dtype=np.float64),
+        lexical_index=lexical.BM25Index(players),
+        position_partitions=retrieval.position_partitions(vector_store),
+        nation_partitions=retrieval.nation_partitions(vector_store),
+    )
+
+
+def tactic_fit(formation: str, build_up_style: str, defensive_approach: str) -> np.ndarray:
+    """Fit scores of every indexed player for every slot position under a tactic (cached per tactic)."""
+    snap = current_snapshot()
+    key = (formation, build_up_style, defensive_approach)
+    scores = snap.fit_cache.get(key)
+    metrics.record_cache("tactic_fit", scores is not None)
+    if scores is None:
+        raw = scoring.fit_scores(snap.fit_features, formation, build_up_style, defensive_approach)
+        scores = np.where(snap.slot_eligible, raw, 0.0).astype(np.float32)
+        if len(snap.fit_cache) >= _fit_cache_max_size:
+            snap.fit_cache.pop(next(iter(snap.fit_cache)), None)
+        snap.fit_cache[key] = scores
+    return scores
+
+
+def slot_fit(players: List[Dict[str, Any]], slot_position: str, scores: np.ndarray) -> List[float]:
+    """Fit of each player for one slot position; players outside the table fall back to overall."""
+    col = scoring.SLOT_INDEX.get(slot_position)
+    player_rows = current_snapshot().player_rows
+    fits = []
+    for p in players:
+        row = player_rows.get(ingestion.player_key(p))
+        if row is None or col is None:
+            fits.append(float(_safe_int(p.get("overall"))))
+        else:
+            fits.append(float(scores[row, col]))
+    return fits
+
+
+def rerank_shortlist(
+    shortlist: List[Dict[str, Any]], formation: str, build_up_style: str, defensive_approach: str
+) -> List[Dict[str, Any]]:
+    """Order the shortlist by each player's best fit for a slot in the formation under the tactic."""
+    template = FORMATION_TEMPLATES.get(formation, FORMATION_TEMPLATES["4-3-3"])
+    cols = sorted({scoring.SLOT_INDEX[s["position"]] for s in template})
+    best = tactic_fit(formation, build_up_style, defensive_approach)[:, cols].max(axis=1)
+    player_rows = current_snapshot().player_rows
+    fits = []
+    for p in shortlist:
+        row = player_rows.get(ingestion.player_key(p))
+        fits.append(float(best[row]) if row is not None else float(_safe_int(p.get("overall"))))
+    order = sorted(range(len(shortlist)), key=lambda i: fits[i], reverse=True)
+    return [shortlist[i] for i in order]
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; understands pre-encoded orjson.Fragment values."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
 
 def _category_match(player_data: Dict[str, Any], slot_position: str) -> bool:
@@ -305,149 +671,309 @@ def _category_match(player_data: Dict[str, Any], slot_position: str) -> bool:
     return bool(slot_cat and player_cat == slot_cat)
 
 
-def ensure_documents_loaded() -> None:
-    """Load only documents (CSV parsing). No OpenAI key needed."""
-    global _documents
-    if not _documents:
-        logger.info("Loading and cleaning player data from CSV...")
-        _documents = ingestion.load_and_clean_data()
-        logger.info("Loaded %d player documents", len(_documents))
-    else:
-        logger.debug("Using cached documents (%d)", len(_documents))
+def _can_cover_slot(player_data: Dict[str, Any], slot_position: str) -> bool:
+    """Whether a player is an alternative/replacement candidate for a slot position."""
+    compatible = SLOT_COMPATIBLE_POSITIONS.get(slot_position, [slot_position])
+    positions = _get_specific_positions(player_data)
+    return any(pp in compatible for pp in positions) or _category_match(player_data, slot_position)
 
 
 def ensure_data_loaded() -> None:
-    """Ensure vector store is loaded. Only load CSV if FAISS index doesn't exist."""
-    global _documents, _vector_store, _retriever, _player_lookup
-    
-    if _vector_store is not None:
-        logger.debug("Using cached vector store.")
-        return
-    
-    # Try loading from disk first (avoids CSV parsing and embedding)
-    if os.path.isdir(FAISS_INDEX_PATH):
-        try:
-            logger.info("Loading FAISS index from %s...", FAISS_INDEX_PATH)
-            _vector_store = retrieval.load_vector_store(FAISS_INDEX_PATH)
-            _retriever = retrieval.get_retriever(_vector_store, k=50)
-            logger.info("Vector store loaded from disk.")
-            
-            # Build player lookup
-            if hasattr(_vector_store, 'docstore') and hasattr(_vector_store.docstore, '_dict'):
-                for doc in _vector_store.docstore._dict.values():
-                    meta = doc.metadata if hasattr(doc, 'metadata') else {}
-                    name = str(meta.get('short_name', '')).strip().upper()
-                    if name:
-                        _player_lookup[name] = meta
-            logger.info("Player lookup cache built with %d entries.", len(_player_lookup))
-            return
-        except Exception as e:
-            logger.warning("Failed to load FAISS index: %s. Rebuilding...", e)
-    
-    # Only load documents if we need to rebuild FAISS (should be rare)
-    logger.info("Loading and cleaning player data from CSV...")
-    _documents = ingestion.load_and_clean_data()
-    logger.info("Loaded %d player documents", len(_documents))
-    
-    logger.info("Building FAISS vector store (first run or rebuild)...")
-    _vector_store = retrieval.create_vector_store(_documents)
-    retrieval.save_vector_store(_vector_store, FAISS_INDEX_PATH)
-    _retriever = retrieval.get_retriever(_vector_store, k=50)
-    logger.info("Vector store built and saved to %s", FAISS_INDEX_PATH)
-    
-    # Build player lookup
-    for doc in _documents:
-        meta = doc.metadata if hasattr(doc, 'metadata') else {}
-        name = str(meta.get('short_name', '')).strip().upper()
-        if name:
-            _player_lookup[name] = meta
-    
-    # Clear documents from memory after FAISS is built
-    _documents = []
-    logger.info("Cleared documents from memory to save RAM.")
-
-
-def retrieve_diverse_shortlist(query: str) -> List[Dict[str, Any]]:
-    """Retrieve a broad shortlist covering all positions (1 main query + 2 supplements to limit embedding calls)."""
-    logger.info("Retrieving shortlist for query: %s", query[:80] if query else "(empty)")
-    ensure_data_loaded()
+    """Ensure the vector store and player table are loaded (once per process; see src/loader.py)."""
+    _data_loader.get()
+
+
+def _on_data_loaded(data: loader.LoadedData) -> None:
+    """Build a snapshot from a freshly loaded (or reloaded) index and swap it in. Requests already
+    running keep the snapshot they pinned; cached responses of the old one are dropped."""
+    global _snapshot, _last_shortlist, _last_squad
+    start = time.perf_counter()
+    snapshot = _build_snapshot(data.vector_store, data.retriever)
+    previous, _snapshot = _snapshot, snapshot
+    logger.info(
+        "Dataset snapshot %s: %d players (built in %.1fs)",
+        snapshot.version, len(snapshot.players), time.perf_counter() - start,
+    )
+    if previous is not _EMPTY_SNAPSHOT and previous.version != snapshot.version:
+        logger.info("Replaced dataset snapshot %s; clearing cached squads", previous.version)
+        _response_cache.clear()
+        _response_cache_keys.clear()
+        _squad_contexts.clear()
+        # /api/replace-player must not offer players from the old data
+        _last_shortlist, _last_squad = [], {}
+    _load_presets()
+
+
+# Persisted FAISS index (avoid re-embedding 16k docs on every server start); one index per embedding backend.
+# Startup, every endpoint and the agent tools share this loader, so the index is loaded or built once.
+_data_loader = loader.shared_loader()
+_data_loader.on_loaded = _on_data_loaded
+
+
+def _warm_up() -> None:
+    """Startup warm-up: load the index and player table, then build the shared LLM client
+    (its langchain_openai import is deferred until first use)."""
+    start = time.perf_counter()
+    try:
+        ensure_data_loaded()
+        clients.chat_model("reasoning")
+        logger.info("Warm-up finished in %.1fs.", time.perf_counter() - start)
+    except Exception as e:
+        logger.error("Warm-up failed: %s (data will load on the first request)", e)
 
-    # Main query with larger k to get diverse players in one call
-    main_ret = retrieval.get_retriever(_vector_store, k=60)
-    docs = list(retrieval.retrieve_players(query, main_ret))
 
-    # Two supplement queries instead of four to reduce embedding API cost
-    supplement_queries = [
-        "top rated goalkeepers and defenders",
-        "skilled midfielders and forwards creative passing",
-    ]
-    for sq in supplement_queries:
-        extra_ret = retrieval.get_retriever(_vector_store, k=15)
-        docs.extend(retrieval.retrieve_players(sq, extra_ret))
+# Shortlist quotas: each bucket gets SHORTLIST_BUCKET_FACTOR x its squad minimum, and each formation
+# slot position SHORTLIST_SLOT_MIN candidates per slot using it
+SHORTLIST_BUCKET_FACTOR = 2
+SHORTLIST_SLOT_MIN = 2
+DEFAULT_SHORTLIST_CONSTRAINTS = {"min_gk": 3, "min_def": 8, "min_mid": 7, "min_fwd": 5}
+
+
+def shortlist_quotas(constraints: Dict[str, Any], formation: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Minimum shortlist candidates per position bucket and per formation slot position."""
+    buckets = {
+        bucket: SHORTLIST_BUCKET_FACTOR * int(constraints.get(key) or 0)
+        for bucket, key in (("GK", "min_gk"), ("DEF", "min_def"), ("MID", "min_mid"), ("FWD", "min_fwd"))
+    }
+    slots: Dict[str, int] = {}
+    for slot in FORMATION_TEMPLATES.get(formation, FORMATION_TEMPLATES["4-3-3"]):
+        slots[slot["position"]] = slots.get(slot["position"], 0) + SHORTLIST_SLOT_MIN
+    return buckets, slots
+
+
+def _partition_candidates(
+    partition_names: List[str],
+    need: int,
+    exclude: set,
+    query_vector: Optional[np.ndarray],
+    restrict_to: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
+    """Up to `need` players from the union of position partitions (optionally intersected with
+    `restrict_to` FAISS rows), not in `exclude`: nearest to the query if it was embedded, otherwise
+    highest overall (no embedding call either way)."""
+    snap = current_snapshot()
+    parts = [snap.position_partitions[name] for name in partition_names if name in snap.position_partitions]
+    if restrict_to is not None:
+        parts = [part[np.isin(part, restrict_to)] for part in parts]
+    if not parts or need <= 0:
+        return []
+    partition = np.concatenate(parts)
+    if query_vector is not None:
+        found = retrieval.search_by_vector(snap.vector_store, query_vector, need + len(exclude), partition=partition)
+    else:
+        found = [
+            snap.vector_store.docstore.search(snap.vector_store.index_to_docstore_id[int(row)]).metadata
+            for part in parts for row in part[:need + len(exclude)]
+        ]
+        found.sort(key=lambda p: _safe_int(p.get("overall")), reverse=True)
+    picked: List[Dict[str, Any]] = []
+    for meta in found:
+        key = ingestion.player_key(meta)
+        if key not in exclude:
+            exclude.add(key)
+            picked.append(meta)
+            if len(picked) == need:
+                break
+    return picked
+
+
+def retrieve_diverse_shortlist(
+    query: str,
+    constraints: Optional[Dict[str, Any]] = None,
+    formation: str = "4-3-3",
+    nation: str = "",
+    query_vector: Optional[np.ndarray] = None,
+) -> List[Dict[str, Any]]:
+    """Retrieve a shortlist that can always field the squad: one main query, then per-position quotas
+    (shortlist_quotas) topped up by filtered searches over position partitions with the same query
+    embedding, so there is at most one embedding call.
 
-    seen: set[str] = set()
+    With `nation`, every candidate comes from that nation's players. A precomputed `query_vector`
+    (e.g. from a batched embedding call) skips the embedding call entirely."""
+    logger.info("Retrieving shortlist for query: %s", query[:80] if query else "(empty)")
+    ensure_data_loaded()
+    snap = current_snapshot()
+
+    nation_rows: Optional[np.ndarray] = None
+    if nation:
+        nation_rows = snap.nation_partitions.get(nation.strip().lower(), np.zeros(0, dtype=np.int64))
+        if query_vector is None:
+            query_vector = retrieval.embed_query(snap.vector_store, query)
+        result = retrieval.SearchResult(
+            retrieval.search_by_vector(snap.vector_store, query_vector, 60, partition=nation_rows),
+            "nation_filtered", query_vector,
+        )
+    elif query_vector is not None:
+        result = retrieval.SearchResult(
+            retrieval.search_by_vector(snap.vector_store, query_vector, 60), "precomputed_vector", query_vector
+        )
+    else:
+        # Main query with larger k to get diverse players in one call; keyword + semantic fused,
+        # entity lookups ("Real Madrid midfielders") answered by the keyword index alone
+        result = retrieval.hybrid_search(
+            query, snap.vector_store, snap.lexical_index, snap.players, k=60, mode=RETRIEVAL_MODE
+        )
+    logger.info("Main query answered via %s", result.path)
+
+    seen: set[int] = set()
     shortlist: List[Dict[str, Any]] = []
-    for d in docs:
-        meta = d.metadata if hasattr(d, "metadata") else {}
-        name = str(meta.get("short_name", ""))
-        if name and name not in seen:
-            seen.add(name)
+    for meta in result.players:
+        key = ingestion.player_key(meta)
+        if key not in seen:
+            seen.add(key)
             shortlist.append(meta)
-    logger.info("Shortlist size: %d players", len(shortlist))
+
+    bucket_quotas, slot_quotas = shortlist_quotas(constraints or DEFAULT_SHORTLIST_CONSTRAINTS, formation)
+    topped_up = 0
+    for slot_position, quota in slot_quotas.items():
+        compatible = SLOT_COMPATIBLE_POSITIONS.get(slot_position, [slot_position])
+        have = sum(1 for p in shortlist if any(pp in compatible for pp in _get_specific_positions(p)))
+        extra = _partition_candidates(compatible, quota - have, seen, result.query_vector, nation_rows)
+        shortlist.extend(extra)
+        topped_up += len(extra)
+    for bucket, quota in bucket_quotas.items():
+        have = sum(1 for p in shortlist if str(p.get("primary_position", "")).upper() == bucket)
+        extra = _partition_candidates([bucket], quota - have, seen, result.query_vector, nation_rows)
+        shortlist.extend(extra)
+        topped_up += len(extra)
+    logger.info("Shortlist size: %d players (%d added to meet position quotas)", len(shortlist), topped_up)
     return shortlist
 
 
+# Assignment costs: position fit dominates, rating breaks ties among equally suited players
+EXACT_POSITION_COST = 0.0
+COMPATIBLE_POSITION_COST = 30.0
+SECONDARY_POSITION_COST = 5.0  # per place the matching position sits down the player's list
+WRONG_SIDE_COST = 15.0
+RATING_WEIGHT = 1.0
+FORBIDDEN_COST = 1e6
+
+
+def _position_side(position: str) -> str:
+    """'L', 'R' or 'C' for a specific position code (LB, RWB, CM, ...)."""
+    if position.startswith("L"):
+        return "L"
+    if position.startswith("R"):
+        return "R"
+    return "C"
+
+
+def _slot_cost(positions: List[str], rating: int, slot_position: str) -> float:
+    """Cost of putting a player with `positions` into a pitch slot; FORBIDDEN_COST if they can't play it."""
+    if not positions:
+        return FORBIDDEN_COST
+    compatible = SLOT_COMPATIBLE_POSITIONS.get(slot_position, [slot_position])
+    if positions[0] == slot_position:
+        cost = EXACT_POSITION_COST
+    else:
+        rank = next((i for i, pp in enumerate(positions) if pp in compatible), None)
+        if rank is None:
+            return FORBIDDEN_COST
+        cost = COMPATIBLE_POSITION_COST + SECONDARY_POSITION_COST * rank
+    side = _position_side(slot_position)
+    if side != "C" and _position_side(positions[0]) not in (side, "C"):
+        cost += WRONG_SIDE_COST
+    return cost - RATING_WEIGHT * rating
+
+
+def _solve_assignment(cost: List[List[float]]) -> List[int]:
+    """Minimum-cost assignment of each row to a distinct column (Hungarian algorithm, rows <= columns).
+    Returns the chosen column index for every row."""
+    n = len(cost)
+    m = len(cost[0]) if n else 0
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)  # owner[j]: 1-based row assigned to column j (0 = free)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                cur = row[j - 1] - u[i0] - v[j]
+                if cur < minv[j]:
+                    minv[j] = cur
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    assignment = [-1] * n
+    for j in range(1, m + 1):
+        if owner[j]:
+            assignment[owner[j] - 1] = j - 1
+    return assignment
+
+
 def assign_to_formation(
-    selected_players: List[Dict[str, Any]], formation: str
+    selected_players: List[Dict[str, Any]], formation: Union[str, List[Dict[str, Any]]]
 ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
     """Place players into pitch slots (11), bench (7), reserves (up to 5).
-    Uses strict position matching: sided positions (LB/RB, LW/RW) are never swapped."""
-    selected_players = [p for p in selected_players if isinstance(p, dict)]
-    template = FORMATION_TEMPLATES.get(formation, FORMATION_TEMPLATES["4-3-3"])
-    available = list(range(len(selected_players)))
-    slot_player: List[Optional[int]] = [None] * len(template)
 
-    # Pass 1: exact first-position match (highest priority)
-    for si, slot in enumerate(template):
-        for pi in list(available):
-            positions = _get_specific_positions(selected_players[pi])
-            if positions and positions[0] == slot["position"]:
-                slot_player[si] = pi
-                available.remove(pi)
-                break
+    `formation` is a FORMATION_TEMPLATES key or a custom template (list of {position, x, y}).
+    Slots are filled by a global minimum-cost matching (exact position, then compatible
+    position, then rating), so a slot is only left empty when no remaining player can play it.
+    Playing a sided player on the other flank (a natural LB at RB) is allowed at WRONG_SIDE_COST,
+    so it only happens when it makes the whole XI better."""
+    selected_players = [p for p in selected_players if isinstance(p, dict)]
+    if isinstance(formation, str):
+        template = FORMATION_TEMPLATES.get(formation, FORMATION_TEMPLATES["4-3-3"])
+    else:
+        template = formation
+    positions = [_get_specific_positions(p) for p in selected_players]
+    projected = [transform_player(p) for p in selected_players]
 
-    # Pass 2: compatible position match (respects side constraints)
-    for si, slot in enumerate(template):
-        if slot_player[si] is not None:
-            continue
-        for pi in list(available):
-            positions = _get_specific_positions(selected_players[pi])
-            if _can_play_slot(positions, slot["position"]):
+    slot_player: List[Optional[int]] = [None] * len(template)
+    if template and selected_players:
+        width = max(len(selected_players), len(template))
+        cost = []
+        for slot in template:
+            row = [
+                _slot_cost(positions[pi], projected[pi]["rating"], slot["position"])
+                for pi in range(len(selected_players))
+            ]
+            row.extend([FORBIDDEN_COST] * (width - len(row)))
+            cost.append(row)
+        for si, pi in enumerate(_solve_assignment(cost)):
+            if pi < len(selected_players) and cost[si][pi] < FORBIDDEN_COST:
                 slot_player[si] = pi
-                available.remove(pi)
-                break
 
     pitch_slots = []
     for si, slot in enumerate(template):
-        player = None
-        if slot_player[si] is not None:
-            player = transform_player(selected_players[slot_player[si]])
+        pi = slot_player[si]
         pitch_slots.append({
             "position": slot["position"],
-            "player": player,
+            "player": projected[pi] if pi is not None else None,
             "x": slot["x"],
             "y": slot["y"],
         })
 
-    remaining = [selected_players[i] for i in available]
-    bench_slots = [
-        {"position": transform_player(p)["position"], "player": transform_player(p), "x": 0, "y": 0}
-        for p in remaining[:7]
-    ]
-    reserve_slots = [
-        {"position": transform_player(p)["position"], "player": transform_player(p), "x": 0, "y": 0}
-        for p in remaining[7:12]
-    ]
+    placed = {pi for pi in slot_player if pi is not None}
+    remaining = [projected[pi] for pi in range(len(selected_players)) if pi not in placed]
+    bench_slots = [{"position": p["position"], "player": p, "x": 0, "y": 0} for p in remaining[:7]]
+    reserve_slots = [{"position": p["position"], "player": p, "x": 0, "y": 0} for p in remaining[7:12]]
 
     return pitch_slots, bench_slots, reserve_slots
 
@@ -455,13 +981,17 @@ def assign_to_formation(
 def _enrich_selected_from_shortlist(
     selected: List[Dict[str, Any]], shortlist: List[Dict[str, Any]]
 ) -> List[Dict[str, Any]]:
-    """Ensure every selected player has full metadata (player_positions, value_eur, etc.) by merging from shortlist."""
-    by_name = {str(p.get("short_name", "")).strip().upper(): p for p in shortlist}
-    by_name_long = {str(p.get("long_name", "")).strip().upper(): p for p in shortlist}
+    """Ensure every selected player has full metadata (player_positions, value_eur, etc.) by merging from
+    the player table (by player_id) or, for players without one, from the shortlist by name."""
+    by_name: Dict[str, Dict[str, Any]] = {}
     enriched = []
     for s in selected:
-        key = str(s.get("short_name", "")).strip().upper()
-        full = by_name.get(key) or by_name_long.get(key)
+        full = get_player(s["player_id"]) if s.get("player_id") is not None else None
+        if full is None:
+            if not by_name:
+                by_name = {str(p.get("long_name", "")).strip().upper(): p for p in shortlist}
+                by_name.update({str(p.get("short_name", "")).strip().upper(): p for p in shortlist})
+            full = by_name.get(str(s.get("short_name", "")).strip().upper())
         if full:
             merged = {**full}
             for k, v in s.items():
@@ -511,6 +1041,30 @@ class ReplaceRequest(BaseModel):
     currentSquadIds: List[str]
 
 
+class BatchJob(BaseModel):
+    nation: str = ""  # restrict candidates to this nationality
+    prompt: str = ""  # defaults to a "best <nation> players" query
+    formation: str = "4-3-3"
+    buildUpStyle: str = "Balanced"
+    defensiveApproach: str = "Balanced"
+    budget: float = 0
+    budgetEnabled: bool = False
+    constraints: SquadConstraints = SquadConstraints()
+
+
+class BatchBuildRequest(BaseModel):
+    jobs: List[BatchJob] = Field(max_length=BATCH_MAX_JOBS)
+    concurrency: int = BATCH_CONCURRENCY  # clamped to 1..BATCH_CONCURRENCY
+
+
+class ReloadRequest(BaseModel):
+    rebuild: bool = False  # re-parse the CSV and re-embed instead of re-reading the saved index
+
+
+class PresetRefreshRequest(BaseModel):
+    nations: Optional[List[str]] = None  # default: the nations of the current artifact
+
+
 # ── Shared pipeline logic ──────────────────────────────────────────────────
 
 
@@ -522,14 +1076,18 @@ def _pipeline_cache_key(
     budget: float,
     budget_enabled: bool,
     cons: SquadConstraints,
+    nation: str = "",
 ) -> str:
-    """Stable cache key for pipeline response caching."""
+    """Stable cache key for pipeline response caching (the budget only counts when enabled), tagged
+    with the dataset snapshot version so a reload never serves squads built from older data."""
     key_dict = {
+        "data_version": current_snapshot().version,
         "query": query or "",
+        "nation": nation,
         "formation": formation,
         "build_up_style": build_up_style,
         "defensive_approach": defensive_approach,
-        "budget": budget,
+        "budget": float(budget) if budget_enabled else 0.0,
         "budget_enabled": budget_enabled,
         "minGK": cons.minGK,
         "maxGK": cons.maxGK,
@@ -548,17 +1106,63 @@ def _run_pipeline(
     budget: float,
     budget_enabled: bool,
     cons: SquadConstraints,
+    nation: str = "",
+    query_vector: Optional[np.ndarray] = None,
+    client: Optional[str] = None,
+    contexts: Optional[Dict[str, SquadContext]] = None,
 ) -> Dict[str, Any]:
-    global _last_shortlist, _last_squad, _response_cache, _response_cache_keys
+    """Build a squad, or return it from the presets / response cache. With `client`, building
+    (retrieval and the LLM) waits for an admission slot; cache hits never do. With `contexts`
+    (preset builds), the squad is always built and its SquadContext goes there instead of the
+    user response cache."""
+    global _last_shortlist, _last_tactic
 
-    cache_key = _pipeline_cache_key(query, formation, build_up_style, defensive_approach, budget, budget_enabled, cons)
+    ensure_data_loaded()
+    cache_key = _pipeline_cache_key(
+        query, formation, build_up_style, defensive_approach, budget, budget_enabled, cons, nation
+    )
+    if contexts is not None:
+        with _llm_slot(client):
+            return _build_pipeline_result(
+                cache_key, query, formation, build_up_style, defensive_approach, budget, budget_enabled, cons,
+                nation, query_vector, contexts,
+            )
+    if _preset_squads:
+        metrics.record_cache("presets", cache_key in _preset_squads)
+    if cache_key in _preset_squads:
+        logger.info("Returning preset squad for key %s", cache_key[:8])
+        context = _squad_contexts.get(cache_key)
+        if context is not None:
+            _last_shortlist, _last_tactic = context.shortlist, context.tactic
+        return _preset_squads[cache_key]
+    metrics.record_cache("responses", cache_key in _response_cache)
     if cache_key in _response_cache:
         logger.info("Returning cached pipeline result for key %s", cache_key[:8])
         return _response_cache[cache_key]
 
-    shortlist = retrieve_diverse_shortlist(query)
-    _last_shortlist = shortlist
+    with _llm_slot(client):
+        return _build_pipeline_result(
+            cache_key, query, formation, build_up_style, defensive_approach, budget, budget_enabled, cons,
+            nation, query_vector,
+        )
+
 
+def _build_pipeline_result(
+    cache_key: str,
+    query: str,
+    formation: str,
+    build_up_style: str,
+    defensive_approach: str,
+    budget: float,
+    budget_enabled: bool,
+    cons: SquadConstraints,
+    nation: str,
+    query_vector: Optional[np.ndarray],
+    contexts: Optional[Dict[str, SquadContext]] = None,
+) -> Dict[str, Any]:
+    global _last_shortlist, _last_squad, _last_tactic, _response_cache, _response_cache_keys
+
+    snap = current_snapshot()
     constraints_dict: Dict[str, Any] = {
         "max_players": 23,
         "min_gk": cons.minGK,
@@ -568,8 +1172,18 @@ def _run_pipeline(
         "min_fwd": cons.minFWD,
     }
 
+    with metrics.stage("retrieval", formation=formation, nation=nation):
+        shortlist = retrieve_diverse_shortlist(query, constraints_dict, formation, nation, query_vector)
+        tracing.set_attributes(shortlist_size=len(shortlist))
+    with metrics.stage("rerank"):
+        shortlist = rerank_shortlist(shortlist, formation, build_up_style, defensive_approach)
+    tactic = (formation, build_up_style, defensive_approach)
+    if contexts is None:
+        _last_shortlist, _last_tactic = shortlist, tactic
+
     user_prefs = (
-        f"Formation: {formation}. "
+        (f"Nation: {nation} (all candidates are {nation} players). " if nation else "")
+        + f"Formation: {formation}. "
         f"Build-up style: {build_up_style}. "
         f"Defensive approach: {defensive_approach}. "
         f"User query: {query}"
@@ -587,21 +1201,33 @@ def _run_pipeline(
 
     logger.info("Calling reasoning.build_squad (LLM)...")
     try:
-        squad = reasoning.build_squad(shortlist, constraints_dict, user_prefs)
+        with metrics.stage("reasoning", shortlist_size=len(shortlist), speculative=SPECULATIVE_GENERATIONS):
+            squad = reasoning.build_squad(
+                shortlist,
+                constraints_dict,
+                user_prefs,
+                tactics={"build_up_style": build_up_style, "defensive_approach": defensive_approach},
+                speculative=SPECULATIVE_GENERATIONS,
+                pick_best=SPECULATIVE_PICK_BEST,
+                max_prompt_tokens=SPECULATIVE_MAX_PROMPT_TOKENS,
+            )
     except Exception as e:
         logger.exception("reasoning.build_squad failed: %s", e)
         raise
-    _last_squad = squad
+    if contexts is None:
+        _last_squad = squad
 
     selected = squad.get("selected", [])
     logger.info("LLM returned %d selected players", len(selected))
     if not selected:
-        logger.warning("No players selected by LLM; using top 23 from shortlist by overall.")
-        selected = sorted(shortlist, key=lambda p: _safe_int(p.get("overall")), reverse=True)[:23]
-    selected = _enrich_selected_from_shortlist(selected, shortlist)
+        logger.warning("No players selected by LLM; using top 23 from shortlist by tactical fit.")
+        selected = shortlist[:23]
+    with metrics.stage("enrichment", players=len(selected)):
+        selected = _enrich_selected_from_shortlist(selected, shortlist)
     logger.info("Assigning %d players to formation %s", len(selected), formation)
     try:
-        pitch_slots, bench_slots, reserve_slots = assign_to_formation(selected, formation)
+        with metrics.stage("assignment", players=len(selected), formation=formation):
+            pitch_slots, bench_slots, reserve_slots = assign_to_formation(selected, formation)
     except Exception as e:
         logger.exception("assign_to_formation failed: %s", e)
         raise
@@ -622,24 +1248,20 @@ def _run_pipeline(
         f"Total cost: €{total_cost:.0f}M."
     )
 
-    # Compute top-5 alternatives per pitch slot from the full shortlist
-    selected_ids = {s["player"]["id"] for s in pitch_slots if s["player"]}
-    logger.info("Building alternatives for %d pitch slots", len(pitch_slots))
-    for slot in pitch_slots:
-        pos = slot["position"]
-        compatible = SLOT_COMPATIBLE_POSITIONS.get(pos, [pos])
-        candidates = []
-        for p in shortlist:
-            pid = _player_id(p)
-            if pid in selected_ids and slot["player"] and pid == slot["player"]["id"]:
-                continue
-            positions = _get_specific_positions(p)
-            if any(pp in compatible for pp in positions) or _category_match(p, pos):
-                candidates.append(p)
-        candidates.sort(key=lambda c: _safe_int(c.get("overall")), reverse=True)
-        slot["alternatives"] = [transform_player(c) for c in candidates[:5]]
+    # Alternatives are fetched per slot on demand; the payload only says whether there are any
+    with metrics.stage("alternatives"):
+        shortlist_rows = np.array(
+            [r for r in (snap.player_rows.get(ingestion.player_key(p)) for p in shortlist) if r is not None],
+            dtype=np.int64,
+        )
+        for slot in pitch_slots:
+            col = scoring.SLOT_INDEX.get(slot["position"])
+            eligible = shortlist_rows[snap.slot_eligible[shortlist_rows, col]] if col is not None else shortlist_rows
+            own_row = snap.player_rows.get(int(slot["player"]["id"])) if slot["player"] else None
+            slot["hasAlternatives"] = bool(len(eligible) - int(own_row is not None and own_row in eligible))
 
     result = {
+        "squadId": cache_key,
         "pitchSlots": pitch_slots,
         "benchSlots": bench_slots,
         "reserveSlots": reserve_slots,
@@ -648,24 +1270,51 @@ def _run_pipeline(
         "excluded": squad.get("excluded", []),
     }
 
+    context = SquadContext(
+        version=snap.version,
+        shortlist=shortlist,
+        tactic=tactic,
+        slot_positions=[s["position"] for s in pitch_slots],
+        slot_player_ids=[s["player"]["id"] if s["player"] else None for s in pitch_slots],
+        alternatives={},
+    )
+    if contexts is not None:
+        contexts[cache_key] = context
+        return result
+
     # Cache result for identical requests (avoid repeated API calls)
     if len(_response_cache) >= _response_cache_max_size and _response_cache_keys:
         oldest = _response_cache_keys.pop(0)
         _response_cache.pop(oldest, None)
+        _squad_contexts.pop(oldest, None)
     _response_cache[cache_key] = result
+    _squad_contexts[cache_key] = context
     if cache_key not in _response_cache_keys:
         _response_cache_keys.append(cache_key)
 
     return result
 
 
-def _infer_tactics_from_message(message: str) -> Tuple[str, str, str, bool, float]:
+def _infer_tactics_from_message(message: str, client: Optional[str] = None) -> Tuple[str, str, str, bool, float]:
     """
-    Use the LLM to infer formation, build-up style, defensive approach, and budget
-    from the user's natural language (e.g. "I want a defensive team under 200 million").
+    Infer formation, build-up style, defensive approach, and budget from the user's natural
+    language (e.g. "I want a defensive team under 200 million"). The rule-based parser answers
+    when it is confident; otherwise the LLM decides, with explicitly stated values kept.
     Returns (formation, build_up_style, defensive_approach, budget_enabled, budget_millions).
     """
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+    parsed = tactics.parse_tactics(message)
+    tracing.set_attributes(rule_based=parsed.confidence >= tactics.MIN_CONFIDENCE, confidence=parsed.confidence)
+    if parsed.confidence >= tactics.MIN_CONFIDENCE:
+        tactics.record_inference(rule_based=True)
+        logger.info(
+            "Parsed tactics (confidence %.2f, no LLM): formation=%s buildUp=%s defensive=%s budgetEnabled=%s budget=%s",
+            parsed.confidence, parsed.formation, parsed.build_up_style, parsed.defensive_approach,
+            parsed.budget_enabled, parsed.budget,
+        )
+        return parsed.formation, parsed.build_up_style, parsed.defensive_approach, parsed.budget_enabled, parsed.budget
+    tactics.record_inference(rule_based=False)
+
+    llm = clients.chat_model("tactics")
     prompt = """You are a football tactics expert. Given the user's message about the kind of team they want, choose the best formation, build-up style, defensive approach, and any budget constraint.
 
 User message: "{message}"
@@ -680,7 +1329,10 @@ Respond with ONLY a single JSON object, no other text, with exactly these keys:
 Interpret tactics: "defensive team" -> 3-5-2 or 4-4-2, Deep Block; "attacking" -> 4-3-3 or 3-4-3, High Press; "possession" -> Short Passing. If the user mentions a budget, set budgetEnabled true and budget to that value in millions."""
 
     try:
-        resp = llm.invoke([HumanMessage(content=prompt.format(message=message or "balanced squad"))])
+        with _llm_slot(client), metrics.llm_call("tactics") as call:
+            resp = call["response"] = llm.invoke(
+                [HumanMessage(content=prompt.format(message=message or "balanced squad"))]
+            )
         content = (resp.content or "").strip()
         if "```" in content:
             start = content.find("{")
@@ -706,21 +1358,257 @@ Interpret tactics: "defensive team" -> 3-5-2 or 4-4-2, Deep Block; "attacking" -
             build_up = "Balanced"
         if defensive not in VALID_DEFENSIVE:
             defensive = "Balanced"
+        # Anything the message stated outright beats the LLM's reading of it
+        if "formation" in parsed.explicit:
+            formation = parsed.formation
+        if "build_up_style" in parsed.explicit:
+            build_up = parsed.build_up_style
+        if "defensive_approach" in parsed.explicit:
+            defensive = parsed.defensive_approach
+        if "budget" in parsed.explicit:
+            budget_enabled, budget = parsed.budget_enabled, parsed.budget
         logger.info(
             "Inferred tactics: formation=%s buildUp=%s defensive=%s budgetEnabled=%s budget=%s",
             formation, build_up, defensive, budget_enabled, budget,
         )
         return formation, build_up, defensive, budget_enabled, budget
+    except admission.Rejected:
+        raise
     except Exception as e:
         logger.warning("Tactics inference failed, using defaults: %s", e)
         return "4-3-3", "Balanced", "Balanced", False, 0.0
 
 
+def _batch_query(job: BatchJob) -> str:
+    if job.prompt:
+        return job.prompt
+    if job.nation:
+        return f"Best {job.nation} players for a World Cup squad"
+    return "Build me a balanced World Cup squad"
+
+
+def _run_batch_job(
+    job: BatchJob,
+    query: str,
+    query_vector: np.ndarray,
+    snap: DatasetSnapshot,
+    client: Optional[str] = None,
+    contexts: Optional[Dict[str, SquadContext]] = None,
+) -> Tuple[Dict[str, Any], float]:
+    with pin_snapshot(snap), tracing.span("batch_job", nation=job.nation, formation=job.formation):
+        if job.nation and job.nation.strip().lower() not in snap.nation_partitions:
+            raise ValueError(f"No players from {job.nation!r} in the index")
+        start = time.perf_counter()
+        result = _run_pipeline(
+            query=query,
+            formation=job.formation,
+            build_up_style=job.buildUpStyle,
+            defensive_approach=job.defensiveApproach,
+            budget=job.budget,
+            budget_enabled=job.budgetEnabled,
+            cons=job.constraints,
+            nation=job.nation,
+            query_vector=query_vector,
+            client=client,
+            contexts=contexts,
+        )
+    return result, time.perf_counter() - start
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    concurrency: int = BATCH_CONCURRENCY,
+    client: Optional[str] = None,
+    contexts: Optional[Dict[str, SquadContext]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Build many squads against the shared player table and index, yielding one record per job as it
+    finishes, then a summary with throughput.
+
+    All query embeddings are made in one batched call; squads are built by up to `concurrency`
+    worker threads, all on the dataset snapshot current when the batch starts. With `client`, each
+    job is admitted like a single build by that client (a rejected job is reported as failed, with
+    its retry_after). With `contexts`, squads bypass the response cache (see _run_pipeline).
+    """
+    ensure_data_loaded()
+    snap = current_snapshot()
+    start = time.perf_counter()
+    queries = [_batch_query(job) for job in jobs]
+    vectors = retrieval.embed_queries(snap.vector_store, queries)
+    logger.info("Batch of %d jobs: embedded %d queries in %.2fs", len(jobs), len(queries), time.perf_counter() - start)
+
+    succeeded = 0
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch") as pool:
+        # Each job runs in a copy of this context, so its spans join the request's trace
+        futures = {
+            pool.submit(contextvars.copy_context().run, _run_batch_job, job, queries[i], vectors[i], snap, client, contexts): i
+            for i, job in enumerate(jobs)
+        }
+        try:
+            for future in as_completed(futures):
+                i = futures[future]
+                record: Dict[str, Any] = {"index": i, "nation": jobs[i].nation, "formation": jobs[i].formation}
+                try:
+                    result, seconds = future.result()
+                    record.update(ok=True, seconds=round(seconds, 3), result=result)
+                    succeeded += 1
+                except admission.Rejected as e:
+                    logger.warning("Batch job %d not admitted: %s", i, e)
+                    record.update(ok=False, error=f"{type(e).__name__}: {e}", retry_after=e.retry_after)
+                except Exception as e:
+                    logger.exception("Batch job %d failed: %s", i, e)
+                    record.update(ok=False, error=f"{type(e).__name__}: {e}")
+                yield record
+        finally:
+            for future in futures:
+                future.cancel()
+
+    elapsed = time.perf_counter() - start
+    yield {"summary": {
+        "jobs": len(jobs),
+        "succeeded": succeeded,
+        "failed": len(jobs) - succeeded,
+        "seconds": round(elapsed, 3),
+        "squads_per_minute": round(succeeded / elapsed * 60, 2) if elapsed > 0 else 0.0,
+    }}
+
+
+def build_presets(
+    nations: Optional[List[str]] = None, concurrency: int = BATCH_CONCURRENCY, client: Optional[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Build every preset squad (src/presets.py) as artifact entries keyed by pipeline cache key.
+
+    The squads never enter the user response cache or squad contexts. With `client`, jobs are
+    admitted as that client; jobs turned away are retried (up to PRESETS_REFRESH_PASSES passes)."""
+    pending = [BatchJob(**job) for job in presets.preset_jobs(nations)]
+    contexts: Dict[str, SquadContext] = {}
+    squads: Dict[str, Dict[str, Any]] = {}
+    for attempt in range(PRESETS_REFRESH_PASSES):
+        rejected: List[BatchJob] = []
+        retry_after = 0
+        for record in run_batch(pending, concurrency, client, contexts):
+            if "retry_after" in record:
+                rejected.append(pending[record["index"]])
+                retry_after = max(retry_after, record["retry_after"])
+            if not record.get("ok"):
+                continue
+            result = record["result"]
+            context = contexts.get(result["squadId"])
+            squads[result["squadId"]] = {
+                "result": result,
+                "shortlist": [ingestion.player_key(p) for p in context.shortlist] if context else [],
+                "tactic": list(context.tactic) if context else [],
+            }
+        if not rejected or attempt == PRESETS_REFRESH_PASSES - 1:
+            break
+        logger.info("%d preset jobs not admitted; retrying in %ds", len(rejected), retry_after)
+        time.sleep(retry_after)
+        pending = rejected
+    return squads
+
+
+def _load_presets() -> None:
+    """Serve the preset artifact if it was built from the loaded data. A stale one is ignored, and
+    rebuilt in the background only with PRESETS_AUTO_REFRESH."""
+    _preset_squads.clear()
+    if not PRESETS_ENABLED:
+        return
+    artifact = presets.load_artifact(PRESETS_PATH)
+    if artifact is None:
+        return
+    snap = current_snapshot()
+    if artifact.get("data_version") != snap.version or artifact.get("embedding_backend") != embeddings.EMBEDDING_BACKEND:
+        logger.warning(
+            "Preset squads at %s are stale (data %s, loaded %s); %s",
+            PRESETS_PATH, artifact.get("data_version"), snap.version,
+            "refreshing in the background" if PRESETS_AUTO_REFRESH else "not serving them until refreshed",
+        )
+        if PRESETS_AUTO_REFRESH:
+            _start_preset_refresh(artifact.get("nations") or [])
+        return
+    for key, entry in artifact.get("squads", {}).items():
+        shortlist = [p for p in (get_player(pid) for pid in entry.get("shortlist", [])) if p is not None]
+        result = entry["result"]
+        _squad_contexts[key] = SquadContext(
+            version=snap.version,
+            shortlist=shortlist,
+            tactic=tuple(entry.get("tactic") or ("4-3-3", "Balanced", "Balanced")),
+            slot_positions=[s["position"] for s in result.get("pitchSlots", [])],
+            slot_player_ids=[s["player"]["id"] if s.get("player") else None for s in result.get("pitchSlots", [])],
+            alternatives={},
+        )
+        _preset_squads[key] = result
+    logger.info("Loaded %d preset squads (data version %s)", len(_preset_squads), snap.version)
+
+
+def _start_preset_refresh(nations: List[str]) -> None:
+    threading.Thread(target=refresh_presets, args=(nations,), name="preset-refresh", daemon=True).start()
+
+
+def refresh_presets(nations: Optional[List[str]] = None) -> None:
+    """Rebuild the preset artifact against the loaded data and start serving it (one refresh at a time).
+    Builds are admitted as PRESETS_CLIENT, PRESETS_REFRESH_CONCURRENCY at a time."""
+    if not _preset_refresh_lock.acquire(blocking=False):
+        return
+    try:
+        start = time.perf_counter()
+        with pin_snapshot():
+            squads = build_presets(nations, PRESETS_REFRESH_CONCURRENCY, PRESETS_CLIENT)
+            version = current_snapshot().version
+        presets.save_artifact(PRESETS_PATH, version, embeddings.EMBEDDING_BACKEND, nations or [], squads)
+        logger.info("Rebuilt %d preset squads in %.1fs", len(squads), time.perf_counter() - start)
+    except Exception as e:
+        logger.exception("Preset refresh failed: %s", e)
+        return
+    finally:
+        _preset_refresh_lock.release()
+    # Outside the lock, so a reload that swapped the snapshot meanwhile can start the next refresh
+    _load_presets()
+
+
+def slot_alternatives(squad_id: str, slot_index: int) -> List[orjson.Fragment]:
+    """Top alternatives from a built squad's shortlist for one pitch slot, by tactical fit (cached).
+
+    Raises KeyError for an unknown (or evicted) squad, or one built before the last data reload, and
+    IndexError for a slot outside the formation.
+    """
+    context = _squad_contexts[squad_id]
+    if context.version != current_snapshot().version:
+        raise KeyError(squad_id)
+    if not 0 <= slot_index < len(context.slot_positions):
+        raise IndexError(slot_index)
+    cached = context.alternatives.get(slot_index)
+    metrics.record_cache("alternatives", cached is not None)
+    if cached is not None:
+        return cached
+    position = context.slot_positions[slot_index]
+    current_id = context.slot_player_ids[slot_index]
+    candidates = [
+        p for p in context.shortlist
+        if project_player(p).id != current_id and _can_cover_slot(p, position)
+    ]
+    fits = slot_fit(candidates, position, tactic_fit(*context.tactic))
+    order = sorted(range(len(candidates)), key=lambda i: fits[i], reverse=True)
+    alternatives = [project_player(candidates[i]).fragment for i in order[:ALTERNATIVES_PER_SLOT]]
+    context.alternatives[slot_index] = alternatives
+    return alternatives
+
+
+def prefetch_alternatives(squad_id: str) -> None:
+    """Compute every slot's alternatives for a squad (run as a background task after the response)."""
+    context = _squad_contexts.get(squad_id)
+    if context is None:
+        return
+    for slot_index in range(len(context.slot_positions)):
+        slot_alternatives(squad_id, slot_index)
+    logger.info("Prefetched alternatives for squad %s", squad_id[:8])
+
+
 # ── Endpoints ──────────────────────────────────────────────────────────────
 
 
 @app.post("/api/build-squad")
-def build_squad_endpoint(request: BuildSquadRequest):
+@pinned
+def build_squad_endpoint(request: BuildSquadRequest, background_tasks: BackgroundTasks, http_request: Request):
     logger.info("POST /api/build-squad formation=%s prompt=%s", request.formation, (request.prompt or "")[:60])
     try:
         ensure_data_loaded()
@@ -729,19 +1617,26 @@ def build_squad_endpoint(request: BuildSquadRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
     try:
-        result = _run_pipeline(
-            query=request.prompt or "Build me a balanced World Cup squad",
-            formation=request.formation,
-            build_up_style=request.buildUpStyle,
-            defensive_approach=request.defensiveApproach,
-            budget=request.budget,
-            budget_enabled=request.budgetEnabled,
-            cons=request.constraints,
-        )
+        with _profiled(http_request, "build-squad") as profile_headers:
+            result = _run_pipeline(
+                query=request.prompt or "Build me a balanced World Cup squad",
+                formation=request.formation,
+                build_up_style=request.buildUpStyle,
+                defensive_approach=request.defensiveApproach,
+                budget=request.budget,
+                budget_enabled=request.budgetEnabled,
+                cons=request.constraints,
+                client=_client_id(http_request),
+            )
         logger.info("POST /api/build-squad success")
-        return result
+        if PREFETCH_ALTERNATIVES:
+            background_tasks.add_task(prefetch_alternatives, result["squadId"])
+        return FastJSONResponse(result, headers=profile_headers)
     except HTTPException:
         raise
+    except admission.Rejected as e:
+        logger.warning("Rejected %s: %s", http_request.url.path, e)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.exception("Pipeline error: %s", e)
         tb = traceback.format_exc()
@@ -753,7 +1648,8 @@ def build_squad_endpoint(request: BuildSquadRequest):
 
 
 @app.post("/api/chat")
-def chat_endpoint(request: ChatRequest):
+@pinned
+def chat_endpoint(request: ChatRequest, background_tasks: BackgroundTasks, http_request: Request):
     logger.info("POST /api/chat message=%s", (request.message or "")[:60])
     try:
         ensure_data_loaded()
@@ -763,18 +1659,22 @@ def chat_endpoint(request: ChatRequest):
 
     try:
         # AI infers formation, build-up, defensive style, and budget from the user's message
-        formation, build_up_style, defensive_approach, budget_enabled, budget = _infer_tactics_from_message(
-            request.message
-        )
-        result = _run_pipeline(
-            query=request.message,
-            formation=formation,
-            build_up_style=build_up_style,
-            defensive_approach=defensive_approach,
-            budget=budget,
-            budget_enabled=budget_enabled,
-            cons=request.constraints,
-        )
+        client = _client_id(http_request)
+        with _profiled(http_request, "chat") as profile_headers:
+            with metrics.stage("tactics"):
+                formation, build_up_style, defensive_approach, budget_enabled, budget = _infer_tactics_from_message(
+                    request.message, client=client
+                )
+            result = _run_pipeline(
+                query=request.message,
+                formation=formation,
+                build_up_style=build_up_style,
+                defensive_approach=defensive_approach,
+                budget=budget,
+                budget_enabled=budget_enabled,
+                cons=request.constraints,
+                client=client,
+            )
         # Return inferred settings so the frontend can update the left panel
         result["formation"] = formation
         result["buildUpStyle"] = build_up_style
@@ -782,9 +1682,14 @@ def chat_endpoint(request: ChatRequest):
         result["budgetEnabled"] = budget_enabled
         result["budget"] = budget
         logger.info("POST /api/chat success")
-        return result
+        if PREFETCH_ALTERNATIVES:
+            background_tasks.add_task(prefetch_alternatives, result["squadId"])
+        return FastJSONResponse(result, headers=profile_headers)
     except HTTPException:
         raise
+    except admission.Rejected as e:
+        logger.warning("Rejected %s: %s", http_request.url.path, e)
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except Exception as e:
         logger.exception("Pipeline error: %s", e)
         logger.error("Traceback:\n%s", traceback.format_exc())
@@ -794,28 +1699,62 @@ def chat_endpoint(request: ChatRequest):
         )
 
 
+@app.post("/api/batch-build-squads")
+def batch_build_squads_endpoint(request: BatchBuildRequest, http_request: Request):
+    """Build squads for many jobs (e.g. every World Cup nation); streams NDJSON, one line per
+    finished job and a final {"summary": ...} line with squads per minute. Each job is admitted
+    under the caller's id, so a batch never runs more builds than the caller's admission share."""
+    concurrency = max(1, min(request.concurrency, BATCH_CONCURRENCY))
+    if ADMISSION_MAX_CONCURRENT > 0:
+        concurrency = min(concurrency, ADMISSION_PER_CLIENT)
+    logger.info("POST /api/batch-build-squads jobs=%d concurrency=%d", len(request.jobs), concurrency)
+    try:
+        ensure_data_loaded()
+    except FileNotFoundError as e:
+        logger.error("Data not found: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+    lines = (orjson.dumps(record) + b"\n" for record in run_batch(request.jobs, concurrency, _client_id(http_request)))
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@app.get("/api/squads/{squad_id}/alternatives/{slot_index}")
+@pinned
+def alternatives_endpoint(squad_id: str, slot_index: int):
+    """Alternatives for one pitch slot of a squad returned by build-squad / chat (its squadId)."""
+    try:
+        with tracing.span("alternatives", squad_id=squad_id, slot_index=slot_index):
+            return FastJSONResponse(slot_alternatives(squad_id, slot_index))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown or expired squad. Build the squad again.")
+    except IndexError:
+        raise HTTPException(status_code=404, detail=f"No pitch slot {slot_index} in this squad.")
+
+
 @app.post("/api/replace-player")
+@pinned
 def replace_player_endpoint(request: ReplaceRequest):
     if not _last_shortlist:
         raise HTTPException(status_code=400, detail="No shortlist available. Build a squad first.")
 
     position = request.position.upper()
-    compatible = SLOT_COMPATIBLE_POSITIONS.get(position, [position])
     squad_ids = set(request.currentSquadIds)
 
-    candidates = []
+    eligible = []
     for p in _last_shortlist:
-        pid = _player_id(p)
-        if pid in squad_ids or pid == request.currentPlayerId:
+        projection = project_player(p)
+        if projection.id in squad_ids or projection.id == request.currentPlayerId:
             continue
-        positions = _get_specific_positions(p)
-        if any(pp in compatible for pp in positions) or _category_match(p, position):
-            player = transform_player(p)
-            reason = _build_replacement_reason(player, position)
-            candidates.append({"player": player, "reason": reason})
+        if _can_cover_slot(p, position):
+            eligible.append(p)
 
-    candidates.sort(key=lambda c: c["player"]["rating"], reverse=True)
-    return candidates[:5]
+    # Best fit for the slot under the tactic the shortlist was built for
+    fits = slot_fit(eligible, position, tactic_fit(*_last_tactic))
+    order = sorted(range(len(eligible)), key=lambda i: fits[i], reverse=True)
+    candidates = []
+    for i in order[:5]:
+        player = project_player(eligible[i]).to_player()
+        candidates.append({"player": player, "reason": _build_replacement_reason(player, position)})
+    return candidates
 
 
 def _build_replacement_reason(player: Dict[str, Any], position: str) -> str:
@@ -837,23 +1776,21 @@ def _build_replacement_reason(player: Dict[str, Any], position: str) -> str:
 
 
 @app.get("/api/search-players")
+@pinned
 def search_players(position: str = "", query: str = "", limit: int = 20):
     """Search the player database by position and/or name using lightweight lookup."""
-    global _player_lookup
-    
-    # Use player lookup instead of loading full documents
-    if not _player_lookup:
-        try:
-            ensure_data_loaded()  # Will populate _player_lookup
-        except FileNotFoundError as e:
-            raise HTTPException(status_code=500, detail=str(e))
+    # Use the player table instead of loading full documents
+    try:
+        ensure_data_loaded()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
     position = position.strip().upper()
     query_lower = query.strip().lower()
     compatible = SLOT_COMPATIBLE_POSITIONS.get(position, [position]) if position else []
 
     results = []
-    for meta in _player_lookup.values():
+    for meta in current_snapshot().players:
         if position:
             positions = _get_specific_positions(meta)
             if not (any(pp in compatible for pp in positions) or _category_match(meta, position)):
@@ -868,7 +1805,43 @@ def search_players(position: str = "", query: str = "", limit: int = 20):
         results.append(meta)
 
     results.sort(key=lambda p: _safe_int(p.get("overall")), reverse=True)
-    return [transform_player(p) for p in results[:limit]]
+    return FastJSONResponse([project_player(p).fragment for p in results[:limit]])
+
+
+@app.get("/api/similar-players")
+@pinned
+def similar_players(player_id: str, position: str = "", max_value: float = 0, nation: str = "", k: int = 10):
+    """Closest stylistic matches to a player across the whole database (max_value in € millions)."""
+    try:
+        ensure_data_loaded()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    snap = current_snapshot()
+    try:
+        row = snap.player_rows.get(int(player_id))
+    except ValueError:
+        row = None
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Unknown player id: {player_id}")
+
+    mask = np.ones(len(snap.players), dtype=bool)
+    position = position.strip().upper()
+    if position:
+        col = scoring.SLOT_INDEX.get(position)
+        if col is not None:
+            mask &= snap.slot_eligible[:, col]
+        else:
+            mask &= np.array([_can_cover_slot(meta, position) for meta in snap.players], dtype=bool)
+    if max_value > 0:
+        mask &= snap.player_values <= max_value * 1_000_000
+    nation = nation.strip().lower()
+    if nation:
+        mask &= np.array([str(meta.get("nationality_name", "")).lower() == nation for meta in snap.players], dtype=bool)
+
+    matches = similarity.nearest(snap.similarity_vectors, row, k=max(0, min(k, 100)), mask=mask)
+    return FastJSONResponse([
+        {"player": snap.projections[r].fragment, "distance": round(distance, 3)} for r, distance in matches
+    ])
 
 
 @app.get("/")
@@ -882,6 +1855,146 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/api/ready")
+def ready():
+    """Readiness: 200 once the index and player table are loaded, 503 while warming up."""
+    is_ready = _data_loader.loaded
+    return JSONResponse(
+        {"status": "ready" if is_ready else "warming_up", "loader": _data_loader.status(), "players": len(current_snapshot().players)},
+        status_code=200 if is_ready else 503,
+    )
+
+
+def _require_admin(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set).")
+    if not token or not hmac.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token.")
+
+
+def _reload_data(rebuild: bool) -> None:
+    try:
+        _data_loader.reload(rebuild=rebuild)
+    except Exception as e:
+        logger.exception("Data reload failed (still serving snapshot %s): %s", current_snapshot().version, e)
+    finally:
+        _reload_lock.release()
+
+
+@app.post("/api/admin/reload", status_code=202)
+def reload_endpoint(request: Optional[ReloadRequest] = None, x_admin_token: Optional[str] = Header(None)):
+    """Reload the player data and index in the background, then swap in the new dataset snapshot.
+    Requests keep being served from the current snapshot meanwhile; poll GET /api/admin/reload."""
+    _require_admin(x_admin_token)
+    rebuild = bool(request and request.rebuild)
+    if not _reload_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A reload is already running.")
+    logger.info("POST /api/admin/reload rebuild=%s (serving snapshot %s)", rebuild, current_snapshot().version)
+    threading.Thread(target=_reload_data, args=(rebuild,), name="data-reload", daemon=True).start()
+    return {"status": "reloading", "rebuild": rebuild, "version": current_snapshot().version}
+
+
+@app.post("/api/admin/presets/refresh", status_code=202)
+def refresh_presets_endpoint(
+    request: Optional[PresetRefreshRequest] = None, x_admin_token: Optional[str] = Header(None)
+):
+    """Rebuild the preset artifact against the loaded data in the background (admitted as one
+    low-concurrency internal client) and serve it once done."""
+    _require_admin(x_admin_token)
+    if not PRESETS_ENABLED:
+        raise HTTPException(status_code=409, detail="Preset squads are disabled (PRESETS_ENABLED=0).")
+    if _preset_refresh_lock.locked():
+        raise HTTPException(status_code=409, detail="A preset refresh is already running.")
+    ensure_data_loaded()
+    nations = request.nations if request and request.nations is not None else None
+    if nations is None:
+        nations = (presets.load_artifact(PRESETS_PATH) or {}).get("nations") or []
+    jobs = len(presets.preset_jobs(nations or None))
+    logger.info("POST /api/admin/presets/refresh: %d jobs (nations %s)", jobs, nations or "-")
+    _start_preset_refresh(nations)
+    return {"status": "refreshing", "jobs": jobs, "concurrency": PRESETS_REFRESH_CONCURRENCY,
+            "version": current_snapshot().version}
+
+
+@app.get("/api/admin/reload")
+def reload_status(x_admin_token: Optional[str] = Header(None)):
+    """Snapshot version being served and the loader's reload status."""
+    _require_admin(x_admin_token)
+    return {"version": current_snapshot().version, "loader": _data_loader.status()}
+
+
+@app.get("/api/admin/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    """Stored request profiles, newest first."""
+    _require_admin(x_admin_token)
+    return _profiler.profiles()
+
+
+@app.get("/api/admin/profiles/{name}")
+def get_profile(name: str, x_admin_token: Optional[str] = Header(None)):
+    """One stored profile in the collapsed-stack format (e.g. `flamegraph.pl profile.collapsed > out.svg`)."""
+    _require_admin(x_admin_token)
+    try:
+        return FileResponse(_profiler.path(name), media_type="text/plain", filename=name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"No profile named {name}")
+
+
+@app.get("/api/stats")
+def stats():
+    """Counters for the fast paths (rule-based tactics, lexical retrieval, speculative reasoning),
+    LLM admission control and cache hit ratios."""
+    return {
+        "tactics": tactics.tactics_stats(),
+        "retrieval": retrieval.retrieval_stats(),
+        "speculation": reasoning.speculation_stats(),
+        "admission": _admission.stats(),
+        "caches": metrics.cache_hit_ratios(),
+        "tracing": tracing.tracing_stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Stage and endpoint latency histograms, LLM calls and tokens per call site, cache hit ratios,
+    admission control and fast-path counters in the Prometheus text format."""
+    admitted = _admission.stats()
+    waits = admitted["wait_seconds"]
+    samples = [
+        ("squad_players_indexed", "gauge", "Players in the current dataset snapshot.", {}, len(current_snapshot().players)),
+        ("squad_admission_running", "gauge", "LLM-bound requests holding an admission slot.", {}, admitted["running"]),
+        ("squad_admission_queued", "gauge", "LLM-bound requests waiting for an admission slot.", {}, admitted["queued"]),
+        ("squad_admission_max_concurrent", "gauge", "Admission slots.", {}, admitted["max_concurrent"]),
+        ("squad_admission_admitted_total", "counter", "LLM-bound requests admitted.", {}, admitted["admitted"]),
+        ("squad_admission_wait_seconds_total", "counter", "Seconds admitted requests waited for a slot.", {}, waits["sum"]),
+        ("squad_admission_wait_seconds_p95", "gauge", "95th percentile of recent admission waits.", {}, waits["p95"]),
+    ]
+    samples += [
+        ("squad_admission_rejected_total", "counter", "LLM-bound requests rejected with 429, by reason.", {"reason": reason}, n)
+        for reason, n in admitted["rejected"].items()
+    ]
+    samples += [
+        ("squad_cache_hit_ratio", "gauge", "Cache hits / lookups since start.", {"cache": cache}, entry["ratio"])
+        for cache, entry in metrics.cache_hit_ratios().items()
+    ]
+    samples += [
+        ("squad_cache_entries", "gauge", "Entries held per cache.", {"cache": cache}, size)
+        for cache, size in (("responses", len(_response_cache)), ("presets", len(_preset_squads)),
+                            ("squad_contexts", len(_squad_contexts)))
+    ]
+    samples += [
+        ("squad_retrieval_queries_total", "counter", "Shortlist queries per retrieval path.", {"path": path}, n)
+        for path, n in retrieval.retrieval_stats().items() if path != "queries"
+    ]
+    inferred = tactics.tactics_stats()
+    samples += [
+        ("squad_tactics_inferences_total", "counter", "Chat tactics inferences, rule-based or by the LLM.",
+         {"method": method}, inferred[method])
+        for method in ("rule_based", "llm")
+    ]
+    return PlainTextResponse(metrics.render(samples), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
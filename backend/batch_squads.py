@@ -0,0 +1,82 @@
+"""
+Build squads for many nations in one run (same pipeline as POST /api/batch-build-squads).
+
+Run from backend/:
+    python batch_squads.py --nations Brazil France Argentina --formation 4-3-3 > squads.ndjson
+    python batch_squads.py --jobs jobs.jsonl --concurrency 8 --output squads.ndjson
+
+--jobs takes a JSON list or JSON-lines file of BatchJob objects (nation, prompt, formation,
+buildUpStyle, defensiveApproach, budget, budgetEnabled, constraints). Results are written as
+NDJSON, one line per finished job, followed by a summary line; throughput goes to stderr.
+"""
+
+import argparse
+import json
+import sys
+from typing import List
+
+import orjson
+
+import app_api
+from src.tactics import VALID_BUILD_UP, VALID_DEFENSIVE, VALID_FORMATIONS
+
+
+def _load_jobs(path: str) -> List[app_api.BatchJob]:
+    with open(path) as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        raw = json.loads(text)
+    else:
+        raw = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [app_api.BatchJob(**job) for job in raw]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--nations", nargs="+", help="one job per nation with the shared settings below")
+    source.add_argument("--jobs", help="JSON or JSON-lines file of jobs")
+    parser.add_argument("--formation", choices=VALID_FORMATIONS, default="4-3-3")
+    parser.add_argument("--build-up", choices=VALID_BUILD_UP, default="Balanced")
+    parser.add_argument("--defensive", choices=VALID_DEFENSIVE, default="Balanced")
+    parser.add_argument("--budget", type=float, default=0, help="budget in € millions (0 = none)")
+    parser.add_argument("--concurrency", type=int, default=app_api.BATCH_CONCURRENCY)
+    parser.add_argument("--output", help="NDJSON output file (default: stdout)")
+    args = parser.parse_args()
+
+    if args.jobs:
+        jobs = _load_jobs(args.jobs)
+    else:
+        jobs = [
+            app_api.BatchJob(
+                nation=nation,
+                formation=args.formation,
+                buildUpStyle=args.build_up,
+                defensiveApproach=args.defensive,
+                budget=args.budget,
+                budgetEnabled=args.budget > 0,
+            )
+            for nation in args.nations
+        ]
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for record in app_api.run_batch(jobs, args.concurrency):
+            out.write(orjson.dumps(record) + b"\n")
+            out.flush()
+            if "summary" in record:
+                s = record["summary"]
+                print(
+                    f"{s['succeeded']}/{s['jobs']} squads in {s['seconds']:.1f}s "
+                    f"({s['squads_per_minute']:.1f} squads/minute)",
+                    file=sys.stderr,
+                )
+            elif not record["ok"]:
+                print(f"job {record['index']} ({record['nation']}) failed: {record['error']}", file=sys.stderr)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Offline benchmarks for the World Cup Squad Builder backend (no OpenAI calls)."""
@@ -0,0 +1,68 @@
+"""
+Microbenchmark for app_api.assign_to_formation across every formation template.
+
+Run from backend/:
+    python benchmarks/bench_assign_to_formation.py [--squads 200] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import app_api  # noqa: E402
+
+# Natural positions drawn for a 23-man squad: 3 GK, 8 DEF, 7 MID, 5 FWD
+SQUAD_SHAPE = [("GK", ["GK"], 3),
+               ("DEF", ["CB", "LB", "RB", "LWB", "RWB"], 8),
+               ("MID", ["CM", "CDM", "CAM", "LM", "RM"], 7),
+               ("FWD", ["ST", "LW", "RW", "CF"], 5)]
+
+
+def _random_squad(rng: random.Random) -> List[Dict[str, Any]]:
+    squad = []
+    for bucket, pool, count in SQUAD_SHAPE:
+        for _ in range(count):
+            positions = rng.sample(pool, k=min(len(pool), rng.randint(1, 3)))
+            squad.append({
+                "short_name": f"P{rng.randrange(10**6)}",
+                "player_positions": ", ".join(positions),
+                "primary_position": bucket,
+                "overall": rng.randint(65, 92),
+                "value_eur": float(rng.randint(1, 150) * 1_000_000),
+                "nationality_name": "Brazil",
+                "club_name": "Club",
+            })
+    rng.shuffle(squad)
+    return squad
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--squads", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    squads = [_random_squad(rng) for _ in range(args.squads)]
+    print(f"{'formation':<10} {'mean_us':>10} {'p95_us':>10} {'filled':>8}")
+    for formation in app_api.FORMATION_TEMPLATES:
+        timings = []
+        filled = 0
+        for squad in squads:
+            start = time.perf_counter()
+            pitch, _, _ = app_api.assign_to_formation(squad, formation)
+            timings.append((time.perf_counter() - start) * 1e6)
+            filled += sum(1 for slot in pitch if slot["player"])
+        timings.sort()
+        p95 = timings[int(0.95 * (len(timings) - 1))]
+        print(f"{formation:<10} {statistics.mean(timings):>10.1f} {p95:>10.1f} {filled / len(squads):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
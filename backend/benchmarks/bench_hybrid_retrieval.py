@@ -0,0 +1,188 @@
+"""
+Offline relevance benchmark for lexical (BM25), semantic (FAISS) and fused retrieval.
+
+Builds a labeled query set from the player table itself: full player names, surname-only
+lookups ("Haaland"), "<club> <position>" and "<nation> <position>" lookups, plus descriptive
+queries labeled by stat rules ("fast wingers" -> pace >= 85 wide players). Reports recall@k
+and latency per mode.
+
+First checks which path hybrid retrieval routes ROUTING_CASES to (name lookups skip the
+embedding call; common words that happen to be names, like "young", must not); a wrong route
+is printed and the script exits with status 1.
+
+Run from backend/:
+    python benchmarks/bench_hybrid_retrieval.py [--csv ../data/raw/male_players.csv] [--embedding-backend hashed]
+
+Without --csv the synthetic player table is used. The default embedding backend is
+EMBEDDING_BACKEND (OpenAI unless set); "hashed" runs fully offline.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.synthetic import synthetic_players  # noqa: E402
+from src import embeddings, ingestion, lexical, retrieval  # noqa: E402
+
+BUCKET_WORDS = {"GK": "goalkeepers", "DEF": "defenders", "MID": "midfielders", "FWD": "forwards"}
+
+# Players whose names collide with everyday words and nations, for the routing check
+ROUTING_PLAYERS = [
+    {"short_name": "E. Haaland", "long_name": "Erling Braut Haaland", "club_name": "Manchester City",
+     "nationality_name": "Norway", "player_positions": "ST", "primary_position": "FWD"},
+    {"short_name": "Lee Young Ju", "long_name": "Lee Young Ju", "club_name": "Madrid CFF",
+     "nationality_name": "Korea Republic", "player_positions": "CM", "primary_position": "MID"},
+    {"short_name": "E. Brazil", "long_name": "Ellie Brazil", "club_name": "Brighton",
+     "nationality_name": "England", "player_positions": "ST", "primary_position": "FWD"},
+    {"short_name": "L. Hope", "long_name": "Lucy Hope", "club_name": "Everton",
+     "nationality_name": "Scotland", "player_positions": "LB", "primary_position": "DEF"},
+    {"short_name": "R. Lavelle", "long_name": "Rose Lavelle", "club_name": "OL Reign",
+     "nationality_name": "United States", "player_positions": "CAM", "primary_position": "MID"},
+    {"short_name": "Mapi León", "long_name": "María Pilar León Cebrián", "club_name": "FC Barcelona",
+     "nationality_name": "Spain", "player_positions": "CB", "primary_position": "DEF"},
+] + [
+    {"short_name": f"B. Player{i}", "long_name": f"Brazilian Player{i}", "club_name": "Santos",
+     "nationality_name": "Brazil", "player_positions": "CM", "primary_position": "MID"}
+    for i in range(retrieval.LEXICAL_FAST_PATH_MIN_HITS)
+]
+
+# (query, whether hybrid retrieval answers it on the lexical fast path)
+ROUTING_CASES = [
+    ("Haaland", True),
+    ("Mapi León", True),
+    ("Rose Lavelle", True),
+    ("Hope", True),
+    ("Brazil", True),  # a nation lookup with enough hits, not the player named Brazil
+    ("young", False),
+    ("best young", False),
+    ("Young players", False),
+    ("hope", False),
+    ("rose", False),
+    ("young brazil midfielders", False),
+]
+
+
+def check_routing() -> List[str]:
+    """Queries in ROUTING_CASES that are routed to the wrong retrieval path."""
+    index = lexical.BM25Index(ROUTING_PLAYERS)
+    wrong = []
+    for query, fast in ROUTING_CASES:
+        hits = len(index.search(query, k=60))
+        if retrieval.takes_lexical_fast_path(query, index, hits) != fast:
+            wrong.append(f"{query!r}: expected {'lexical_fast_path' if fast else 'fused'}")
+    return wrong
+
+# Descriptive queries and the stat rule that defines their relevant players
+DESCRIPTIVE_QUERIES: List[Tuple[str, Callable[[Dict[str, Any]], bool]]] = [
+    ("fast wingers", lambda p: _num(p, "pace") >= 85 and bool(_positions(p) & {"LW", "RW", "LM", "RM"})),
+    ("tall strong centre-backs", lambda p: "CB" in _positions(p) and _num(p, "height_cm") >= 185 and _num(p, "physic") >= 75),
+    ("creative playmakers with great passing", lambda p: _num(p, "passing") >= 80 and bool(_positions(p) & {"CAM", "CM"})),
+    ("elite goalkeepers", lambda p: "GK" in _positions(p) and _num(p, "overall") >= 80),
+    ("clinical strikers", lambda p: "ST" in _positions(p) and _num(p, "shooting") >= 80),
+]
+
+
+def _num(p: Dict[str, Any], key: str) -> float:
+    try:
+        return float(p.get(key) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _positions(p: Dict[str, Any]) -> Set[str]:
+    return {s.strip() for s in str(p.get("player_positions") or "").split(",") if s.strip()}
+
+
+def labeled_queries(players: List[Dict[str, Any]], per_kind: int, seed: int) -> List[Tuple[str, str, Set[int]]]:
+    """(kind, query, relevant player keys) triples drawn from the player table."""
+    rng = random.Random(seed)
+    keys = [ingestion.player_key(p) for p in players]
+    queries: List[Tuple[str, str, Set[int]]] = []
+    for p in rng.sample(players, min(per_kind, len(players))):
+        queries.append(("name", str(p.get("long_name") or p.get("short_name")), {ingestion.player_key(p)}))
+    for p in rng.sample(players, min(per_kind, len(players))):
+        surname = str(p.get("short_name") or "").split()[-1:]
+        if surname:
+            token = lexical.tokenize(surname[0])
+            relevant = {
+                key for q, key in zip(players, keys)
+                if token and set(token) <= set(lexical.tokenize(f"{q.get('short_name')} {q.get('long_name')}"))
+            }
+            queries.append(("surname", surname[0], relevant))
+    for field, kind in (("club_name", "club"), ("nationality_name", "nation")):
+        groups: Dict[Tuple[str, str], Set[int]] = {}
+        for p, key in zip(players, keys):
+            if p.get(field) and p.get("primary_position") in BUCKET_WORDS:
+                groups.setdefault((str(p[field]), p["primary_position"]), set()).add(key)
+        for value, bucket in rng.sample(sorted(groups), min(per_kind, len(groups))):
+            queries.append((kind, f"{value} {BUCKET_WORDS[bucket]}", groups[(value, bucket)]))
+    for query, rule in DESCRIPTIVE_QUERIES:
+        relevant = {key for p, key in zip(players, keys) if rule(p)}
+        if relevant:
+            queries.append(("descriptive", query, relevant))
+    return queries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", help="raw Kaggle players CSV (default: synthetic players)")
+    parser.add_argument("--players", type=int, default=5000, help="synthetic table size")
+    parser.add_argument("--per-kind", type=int, default=20, help="labeled queries per lookup kind")
+    parser.add_argument("--k", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--embedding-backend", choices=sorted(embeddings.BACKEND_DIMENSIONS),
+                        default=embeddings.EMBEDDING_BACKEND)
+    args = parser.parse_args()
+
+    wrong = check_routing()
+    if wrong:
+        print("FAILED routing check:\n  " + "\n  ".join(wrong))
+        sys.exit(1)
+    print(f"Routing check: {len(ROUTING_CASES)} queries on the expected path")
+
+    if args.csv:
+        documents = ingestion.dataframe_to_documents(ingestion.clean_data(ingestion.load_raw_data(args.csv)))
+    else:
+        documents = ingestion.dataframe_to_documents(pd.DataFrame(synthetic_players(args.players, seed=args.seed)))
+    players = [d.metadata for d in documents]
+
+    start = time.perf_counter()
+    vector_store = retrieval.create_vector_store(documents, backend=args.embedding_backend)
+    faiss_s = time.perf_counter() - start
+    start = time.perf_counter()
+    lexical_index = lexical.BM25Index(players)
+    bm25_s = time.perf_counter() - start
+    print(f"{len(players)} players; FAISS build {faiss_s:.2f}s, BM25 build {bm25_s * 1000:.0f}ms")
+
+    queries = labeled_queries(players, args.per_kind, args.seed)
+    kinds = sorted({kind for kind, _, _ in queries})
+    print(f"{'mode':>9} {'kind':>12} {'recall@k':>9} {'p50_ms':>8} {'p95_ms':>8} {'fast_path':>9}")
+    for mode in retrieval.RETRIEVAL_MODES:
+        by_kind: Dict[str, List[Tuple[float, float, bool]]] = {kind: [] for kind in kinds}
+        for kind, query, relevant in queries:
+            start = time.perf_counter()
+            results, path, _ = retrieval.hybrid_search(query, vector_store, lexical_index, players, k=args.k, mode=mode)
+            elapsed = (time.perf_counter() - start) * 1000
+            found = {ingestion.player_key(p) for p in results[:args.k]}
+            recall = len(found & relevant) / min(len(relevant), args.k)
+            by_kind[kind].append((recall, elapsed, path == "lexical_fast_path"))
+        for kind in kinds + ["all"]:
+            rows = [r for rs in by_kind.values() for r in rs] if kind == "all" else by_kind[kind]
+            latencies = sorted(r[1] for r in rows)
+            print(
+                f"{mode:>9} {kind:>12} {statistics.mean(r[0] for r in rows):>9.3f} "
+                f"{statistics.median(latencies):>8.2f} {latencies[int(0.95 * (len(latencies) - 1))]:>8.2f} "
+                f"{sum(r[2] for r in rows) / len(rows):>9.0%}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Concurrency stress check for src/loader.DataLoader: many threads ask for the index at once.
+
+Each round runs three scenarios with --threads callers released together by a barrier:
+  cold    no saved index: the CSV stand-in is parsed, embedded and saved exactly once
+  warm    saved index: loaded from disk exactly once, nothing embedded
+  failing the first load raises: every waiting caller gets that error, the next call retries
+Every caller must receive the same LoadedData object, and on_loaded must run once. Any
+violation is printed and the script exits with status 1.
+
+Run from backend/:
+    python benchmarks/bench_loader_concurrency.py [--threads 32] [--rounds 5] [--players 2000]
+
+Uses synthetic players and StubEmbeddings (local, with a per-batch delay to widen the race
+window), so no CSV or API key is needed.
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.stubs import StubEmbeddings  # noqa: E402
+from benchmarks.synthetic import synthetic_players  # noqa: E402
+from src import ingestion, loader, retrieval  # noqa: E402
+
+
+def _stampede(target: Callable[[], Any], threads: int) -> List[Dict[str, Any]]:
+    """Call `target` from `threads` threads released at once; per-call result or error and wait time."""
+    barrier = threading.Barrier(threads)
+    outcomes: List[Dict[str, Any]] = [{} for _ in range(threads)]
+
+    def worker(i: int) -> None:
+        barrier.wait()
+        start = time.perf_counter()
+        try:
+            outcomes[i]["result"] = target()
+        except Exception as e:
+            outcomes[i]["error"] = e
+        outcomes[i]["seconds"] = time.perf_counter() - start
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return outcomes
+
+
+class Counters:
+    def __init__(self, documents: List[Any], fail_first: bool = False, delay: float = 0.0):
+        self.documents = documents
+        self.fail_first = fail_first
+        self.delay = delay
+        self.document_loads = 0
+        self.on_loaded = 0
+
+    def load_documents(self) -> List[Any]:
+        self.document_loads += 1
+        time.sleep(self.delay)
+        if self.fail_first and self.document_loads == 1:
+            raise RuntimeError("simulated CSV failure")
+        return self.documents
+
+    def loaded(self, data: loader.LoadedData) -> None:
+        self.on_loaded += 1
+
+
+def _check(name: str, condition: bool, failures: List[str]) -> None:
+    if not condition:
+        failures.append(name)
+
+
+def run_round(documents: List[Any], embedder: StubEmbeddings, threads: int, workdir: str) -> Dict[str, Any]:
+    failures: List[str] = []
+    index_path = os.path.join(workdir, "faiss_index")
+    waits: List[float] = []
+
+    # cold: nothing on disk, everyone arrives before the build finishes
+    embedder.document_calls = 0
+    counters = Counters(documents, delay=0.05)
+    data_loader = loader.DataLoader(index_path, backend="hashed", load_documents=counters.load_documents,
+                                    on_loaded=counters.loaded)
+    outcomes = _stampede(data_loader.get, threads)
+    results = {id(o.get("result")) for o in outcomes}
+    _check("cold: a caller got an error", all("result" in o for o in outcomes), failures)
+    _check("cold: callers got different results", len(results) == 1, failures)
+    _check(f"cold: CSV parsed {counters.document_loads}x", counters.document_loads == 1, failures)
+    _check(f"cold: embedded {embedder.document_calls}x", embedder.document_calls == 1, failures)
+    _check(f"cold: on_loaded ran {counters.on_loaded}x", counters.on_loaded == 1, failures)
+    _check("cold: index not saved", os.path.isfile(os.path.join(index_path, retrieval.INDEX_MANIFEST)), failures)
+    _check("cold: temporary index left behind", sorted(os.listdir(workdir)) == ["faiss_index"], failures)
+    waits += [o["seconds"] for o in outcomes]
+
+    # warm: the saved index is opened once
+    embedder.document_calls = 0
+    counters = Counters(documents)
+    data_loader = loader.DataLoader(index_path, backend="hashed", load_documents=counters.load_documents,
+                                    on_loaded=counters.loaded)
+    outcomes = _stampede(data_loader.get, threads)
+    _check("warm: callers got different results", len({id(o.get("result")) for o in outcomes}) == 1, failures)
+    _check(f"warm: CSV parsed {counters.document_loads}x", counters.document_loads == 0, failures)
+    _check(f"warm: embedded {embedder.document_calls}x", embedder.document_calls == 0, failures)
+    _check(f"warm: on_loaded ran {counters.on_loaded}x", counters.on_loaded == 1, failures)
+    _check("warm: not loaded from disk", data_loader.status()["source"] == "disk", failures)
+
+    # failing: the first attempt's error reaches every waiter; a later call retries and succeeds
+    shutil.rmtree(index_path)
+    counters = Counters(documents, fail_first=True, delay=0.05)
+    data_loader = loader.DataLoader(index_path, backend="hashed", load_documents=counters.load_documents,
+                                    on_loaded=counters.loaded)
+    outcomes = _stampede(data_loader.get, threads)
+    _check("failing: a caller did not get the error", all("error" in o for o in outcomes), failures)
+    _check(f"failing: {counters.document_loads} attempts under load", counters.document_loads == 1, failures)
+    data_loader.get()
+    _check("failing: retry did not load", data_loader.loaded and data_loader.status()["attempts"] == 2, failures)
+    shutil.rmtree(index_path)
+
+    return {"failures": failures, "waits": waits}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--players", type=int, default=2000)
+    parser.add_argument("--embed-latency", type=float, default=0.2, help="stub seconds per embedding batch")
+    args = parser.parse_args()
+
+    documents = ingestion.dataframe_to_documents(pd.DataFrame(synthetic_players(args.players)))
+    embedder = StubEmbeddings(latency=args.embed_latency)
+    # Route every index build/load through the counting stub (it reports as the "hashed" backend)
+    retrieval._get_embeddings = lambda backend="hashed": embedder
+
+    failures: List[str] = []
+    waits: List[float] = []
+    for i in range(args.rounds):
+        with tempfile.TemporaryDirectory() as workdir:
+            outcome = run_round(documents, embedder, args.threads, workdir)
+        failures += [f"round {i}: {f}" for f in outcome["failures"]]
+        waits += outcome["waits"]
+
+    print(f"{args.rounds} rounds x {args.threads} threads, {args.players} players")
+    print(f"cold-load wait per caller: median {statistics.median(waits):.2f}s, max {max(waits):.2f}s")
+    if failures:
+        print("FAILED:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("OK: one CSV parse, one embedding pass, one index write and one on_loaded per load")
+
+
+if __name__ == "__main__":
+    main()
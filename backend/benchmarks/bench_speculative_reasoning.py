@@ -0,0 +1,58 @@
+"""
+Latency and payoff of speculative reasoning generations against a stub LLM with random latency.
+
+Run from backend/:
+    python benchmarks/bench_speculative_reasoning.py [--requests 30] [--k 1 3] [--invalid-rate 0.3]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.stubs import StubChatModel  # noqa: E402
+from benchmarks.synthetic import synthetic_players  # noqa: E402
+from src import clients, reasoning  # noqa: E402
+
+CONSTRAINTS = {"max_players": 23, "min_gk": 3, "max_gk": 3, "min_def": 8, "min_mid": 7, "min_fwd": 5}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 2, 3, 5])
+    parser.add_argument("--min-latency", type=float, default=0.05)
+    parser.add_argument("--max-latency", type=float, default=0.4)
+    parser.add_argument("--invalid-rate", type=float, default=0.3)
+    parser.add_argument("--pick-best", action="store_true")
+    args = parser.parse_args()
+
+    seed = iter(range(10**9))
+    clients.set_chat_model_factory(lambda **kw: StubChatModel(
+        latency=(args.min_latency, args.max_latency), invalid_rate=args.invalid_rate, seed=next(seed), **kw
+    ))
+    shortlist = synthetic_players(90, seed=1)
+
+    print(f"{'k':>3} {'p50_ms':>8} {'p95_ms':>8} {'valid_llm':>9} {'repaired':>8} {'paid_off':>8} {'cancelled':>9}")
+    for k in args.k:
+        before = reasoning.speculation_stats()
+        latencies, repaired = [], 0
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            squad = reasoning.build_squad(shortlist, CONSTRAINTS, speculative=k, pick_best=args.pick_best)
+            latencies.append((time.perf_counter() - start) * 1000)
+            repaired += bool(squad.get("repairs"))
+        after = reasoning.speculation_stats()
+        latencies.sort()
+        print(
+            f"{k:>3} {statistics.median(latencies):>8.1f} {latencies[int(0.95 * (len(latencies) - 1))]:>8.1f} "
+            f"{args.requests - repaired:>9} {repaired:>8} {after['paid_off'] - before['paid_off']:>8} "
+            f"{after['generations_cancelled'] - before['generations_cancelled']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Startup benchmark: `import app_api` time and time until the server answers /api/health and
+/api/ready, per STARTUP_MODE.
+
+Each run is a fresh interpreter, so module caches do not carry over. Time-to-ready starts
+uvicorn on a local port and polls both endpoints until they return 200.
+
+Run from backend/:
+    python benchmarks/bench_startup.py [--runs 5] [--modes background eager] [--port 8765]
+
+The server uses the current environment (FAISS index path, EMBEDDING_BACKEND, ...); with
+EMBEDDING_BACKEND=hashed and a saved hashed index it runs fully offline.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+IMPORT_SNIPPET = (
+    "import sys, time; start = time.perf_counter(); import app_api; "
+    "print(time.perf_counter() - start); "
+    "print(','.join(m for m in ('langchain_openai', 'langchain_community.vectorstores', 'pandas') if m in sys.modules))"
+)
+
+
+def _status(url: str) -> Optional[int]:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as resp:
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return None
+
+
+def measure_import() -> Dict[str, object]:
+    """Seconds to import app_api in a fresh interpreter, and which heavy modules it pulled in."""
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    ).stdout.split("\n")
+    return {"seconds": float(out[0]), "heavy_modules": out[1] or "-"}
+
+
+def measure_ready(mode: str, port: int, timeout: float) -> Dict[str, Optional[float]]:
+    """Seconds from process start until /api/health and /api/ready first return 200."""
+    env = dict(os.environ, STARTUP_MODE=mode)
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app_api:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    times: Dict[str, Optional[float]] = {"health": None, "ready": None}
+    try:
+        while time.perf_counter() - start < timeout and times["ready"] is None:
+            for name in ("health", "ready"):
+                if times[name] is None and _status(f"{base}/api/{name}") == 200:
+                    times[name] = time.perf_counter() - start
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait()
+    return times
+
+
+def _summary(values: List[Optional[float]]) -> str:
+    done = [v for v in values if v is not None]
+    if not done:
+        return "timed out"
+    return f"median {statistics.median(done):.2f}s  min {min(done):.2f}s  ({len(done)}/{len(values)} runs)"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", choices=("background", "eager"), default=["background", "eager"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for /api/ready per run")
+    args = parser.parse_args()
+
+    imports = [measure_import() for _ in range(args.runs)]
+    print(f"import app_api: {_summary([r['seconds'] for r in imports])}; heavy modules loaded: {imports[-1]['heavy_modules']}")
+    for mode in args.modes:
+        runs = [measure_ready(mode, args.port, args.timeout) for _ in range(args.runs)]
+        print(f"{mode:>10} /api/health: {_summary([r['health'] for r in runs])}")
+        print(f"{mode:>10} /api/ready:  {_summary([r['ready'] for r in runs])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+Benchmark suite: microbenchmarks of the data and squad-building hot paths on synthetic data,
+with JSON results and a regression check against a stored baseline.
+
+Benchmarks (each timed per call after warm-up; "items" is what the call processes):
+  clean_data                  ingestion.clean_data on the raw Kaggle-schema table (rows)
+  dataframe_to_documents      ingestion.dataframe_to_documents on the cleaned table (rows)
+  index_build                 retrieval.create_vector_store with the stub embedder (documents)
+  index_load                  retrieval.load_vector_store of the saved index (documents)
+  retrieve_diverse_shortlist  app_api.retrieve_diverse_shortlist, cycling formations and queries
+  compact_candidates          reasoning.compact_candidates of a shortlist, as build_squad calls it
+  parse_llm_squad_output      reasoning.parse_llm_squad_output on a stub model answer
+  assign_to_formation         app_api.assign_to_formation of an enriched 23-man squad
+  search_players              app_api.search_players, cycling positions and name queries
+  transform_player            app_api.transform_player over the player table (players)
+
+Run from backend/:
+    python benchmarks/run_benchmarks.py [--players 20000] [--seed 0] [--only clean_data index_load]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.2]
+
+Everything runs offline: the raw table comes from benchmarks.synthetic.synthetic_raw_frame
+(10k to 1M+ rows), embeddings from StubEmbeddings (the local hashed embedder), LLM answers
+from benchmarks.stubs.squad_answer. With --baseline, a benchmark whose median is more than
+--threshold slower than the baseline's is a regression and the script exits with status 1.
+Only compare results from the same --players, --seed and machine.
+"""
+
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Offline backends, fixed before app_api reads its configuration
+os.environ["EMBEDDING_BACKEND"] = "hashed"
+os.environ["PRESETS_ENABLED"] = "0"
+os.environ["TRACE_EXPORTER"] = "none"
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+import app_api  # noqa: E402
+from benchmarks.stubs import StubEmbeddings, squad_answer  # noqa: E402
+from benchmarks.synthetic import synthetic_raw_frame  # noqa: E402
+from src import ingestion, reasoning, retrieval  # noqa: E402
+
+RESULTS_VERSION = 1
+
+QUERIES = [
+    "fast wingers and a clinical striker",
+    "tall strong centre-backs",
+    "creative playmakers with great passing",
+    "experienced goalkeeper",
+    "",
+]
+SEARCHES = [("ST", ""), ("CB", ""), ("", "player1"), ("CM", "madrid"), ("GK", "")]
+
+# name -> (warm-up calls, timed calls); scaled down for the whole-table benchmarks
+ITERATIONS = {
+    "clean_data": (1, 5),
+    "dataframe_to_documents": (1, 3),
+    "index_build": (0, 2),
+    "index_load": (1, 5),
+    "retrieve_diverse_shortlist": (3, 30),
+    "compact_candidates": (20, 300),
+    "parse_llm_squad_output": (20, 500),
+    "assign_to_formation": (20, 300),
+    "search_players": (3, 30),
+    "transform_player": (1, 5),
+}
+BENCHMARKS = list(ITERATIONS)
+
+
+class Suite:
+    """Shared fixtures, built once and only as far as the selected benchmarks need."""
+
+    def __init__(self, players: int, seed: int, workdir: str):
+        self.players = players
+        self.seed = seed
+        self.workdir = workdir
+        self.embedder = StubEmbeddings()
+        # Every index build and load goes through the stub (it reports as the "hashed" backend)
+        retrieval._get_embeddings = lambda backend="hashed": self.embedder
+        self._raw = None
+        self._clean = None
+        self._documents = None
+        self._index_path: Optional[str] = None
+        self._shortlist: Optional[List[Dict[str, Any]]] = None
+        self._squad: Optional[Tuple[str, List[Dict[str, Any]]]] = None
+
+    def raw(self) -> Any:
+        if self._raw is None:
+            self._raw = synthetic_raw_frame(self.players, seed=self.seed, dirty=0.02)
+        return self._raw
+
+    def clean(self) -> Any:
+        if self._clean is None:
+            self._clean = ingestion.clean_data(self.raw().copy())
+        return self._clean
+
+    def documents(self) -> List[Any]:
+        if self._documents is None:
+            self._documents = ingestion.dataframe_to_documents(self.clean())
+        return self._documents
+
+    def index_path(self) -> str:
+        if self._index_path is None:
+            path = os.path.join(self.workdir, "faiss_index")
+            retrieval.save_vector_store(retrieval.create_vector_store(self.documents(), backend="hashed"), path,
+                                        backend="hashed")
+            self._index_path = path
+        return self._index_path
+
+    def api(self) -> None:
+        """Point the API's loader at the saved synthetic index and load its snapshot."""
+        if not app_api._data_loader.loaded:
+            app_api._data_loader.index_path = self.index_path()
+            app_api._data_loader.backend = "hashed"
+            app_api.ensure_data_loaded()
+
+    def shortlist(self) -> List[Dict[str, Any]]:
+        if self._shortlist is None:
+            self.api()
+            self._shortlist = app_api.retrieve_diverse_shortlist(QUERIES[0], formation="4-3-3")
+        return self._shortlist
+
+    def squad(self) -> Tuple[str, List[Dict[str, Any]]]:
+        """A stub reasoning answer for a real shortlist, and that shortlist."""
+        if self._squad is None:
+            shortlist = self.shortlist()
+            table, _, _ = reasoning.compact_candidates(shortlist, {"max_players": 23})
+            self._squad = (squad_answer(f"CANDIDATE PLAYERS\n{table}\nTASK:"), shortlist)
+        return self._squad
+
+
+def _cycle(values: List[Any]) -> Callable[[], Any]:
+    state = {"i": 0}
+
+    def nxt() -> Any:
+        value = values[state["i"] % len(values)]
+        state["i"] += 1
+        return value
+
+    return nxt
+
+
+def prepare(name: str, suite: Suite) -> Tuple[Callable[[], Any], Callable[[Any], Any], int]:
+    """(setup, call, items per call) for a benchmark; setup's result is passed to the timed call."""
+    if name == "clean_data":
+        raw = suite.raw()
+        return raw.copy, ingestion.clean_data, len(raw)
+    if name == "dataframe_to_documents":
+        clean = suite.clean()
+        return lambda: clean, ingestion.dataframe_to_documents, len(clean)
+    if name == "index_build":
+        documents = suite.documents()
+        return lambda: documents, lambda docs: retrieval.create_vector_store(docs, backend="hashed"), len(documents)
+    if name == "index_load":
+        path = suite.index_path()
+        return lambda: path, lambda p: retrieval.load_vector_store(p, backend="hashed"), len(suite.documents())
+    if name == "retrieve_diverse_shortlist":
+        suite.api()
+        formations = list(app_api.FORMATION_TEMPLATES)
+        pairs = [(q, formations[i % len(formations)]) for i, q in enumerate(QUERIES)]
+        return _cycle(pairs), lambda qf: app_api.retrieve_diverse_shortlist(qf[0], formation=qf[1]), 1
+    if name == "compact_candidates":
+        shortlist = suite.shortlist()
+        return lambda: shortlist, lambda sl: reasoning.compact_candidates(sl, {"max_players": 23}), len(shortlist)
+    if name == "parse_llm_squad_output":
+        answer, _ = suite.squad()
+        return lambda: answer, reasoning.parse_llm_squad_output, 1
+    if name == "assign_to_formation":
+        answer, shortlist = suite.squad()
+        selected = app_api._enrich_selected_from_shortlist(reasoning.parse_llm_squad_output(answer)["selected"], shortlist)
+        formations = list(app_api.FORMATION_TEMPLATES)
+        return _cycle(formations), lambda f: app_api.assign_to_formation([dict(p) for p in selected], f), 1
+    if name == "search_players":
+        suite.api()
+        return _cycle(SEARCHES), lambda s: app_api.search_players(position=s[0], query=s[1], limit=20), 1
+    if name == "transform_player":
+        suite.api()
+        players = app_api.current_snapshot().players
+        return lambda: players, lambda ps: [app_api.transform_player(p) for p in ps], len(players)
+    raise ValueError(f"Unknown benchmark: {name}")
+
+
+def run_benchmark(name: str, suite: Suite, repeat_scale: float = 1.0) -> Dict[str, Any]:
+    setup, call, items = prepare(name, suite)
+    warmup, repeats = ITERATIONS[name]
+    for _ in range(warmup):
+        call(setup())
+    timings = []
+    for _ in range(max(1, round(repeats * repeat_scale))):
+        arg = setup()
+        start = time.perf_counter()
+        call(arg)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    median = statistics.median(timings)
+    return {
+        "iterations": len(timings),
+        "items": items,
+        "min_s": timings[0],
+        "median_s": median,
+        "mean_s": statistics.mean(timings),
+        "p95_s": timings[math.ceil(0.95 * len(timings)) - 1],
+        "max_s": timings[-1],
+        "items_per_s": items / median if median else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print current vs. baseline medians; names of benchmarks slower than the baseline by more than `threshold`."""
+    regressions = []
+    if (baseline["meta"].get("players"), baseline["meta"].get("seed")) != (results["meta"]["players"], results["meta"]["seed"]):
+        print(f"warning: baseline was run with players={baseline['meta'].get('players')} "
+              f"seed={baseline['meta'].get('seed')}", file=sys.stderr)
+    print(f"\n{'benchmark':<28} {'baseline_ms':>12} {'current_ms':>12} {'change':>8}")
+    for name, current in results["benchmarks"].items():
+        base = baseline["benchmarks"].get(name)
+        if base is None:
+            print(f"{name:<28} {'-':>12} {current['median_s'] * 1e3:>12.3f} {'new':>8}")
+            continue
+        change = current["median_s"] / base["median_s"] - 1 if base["median_s"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<28} {base['median_s'] * 1e3:>12.3f} {current['median_s'] * 1e3:>12.3f} {change:>+8.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=20000, help="synthetic players (10k to 1M+)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--repeat-scale", type=float, default=1.0, help="multiply every benchmark's timed calls")
+    parser.add_argument("--output", help="write the JSON results here")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed median slowdown (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    # Per-request INFO logs would flood the table (and their cost is not what is measured here)
+    logging.getLogger("squad_api").setLevel(logging.WARNING)
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "meta": {
+            "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "players": args.players,
+            "seed": args.seed,
+        },
+        "benchmarks": {},
+    }
+    print(f"{'benchmark':<28} {'median_ms':>12} {'p95_ms':>12} {'items/s':>12}")
+    with tempfile.TemporaryDirectory() as workdir:
+        suite = Suite(args.players, args.seed, workdir)
+        for name in args.only:
+            result = run_benchmark(name, suite, args.repeat_scale)
+            results["benchmarks"][name] = result
+            print(f"{name:<28} {result['median_s'] * 1e3:>12.3f} {result['p95_s'] * 1e3:>12.3f} "
+                  f"{result['items_per_s'] or 0:>12.0f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nFAILED: {', '.join(regressions)} slower than the baseline by more than {args.threshold:.0%}")
+            sys.exit(1)
+        print("\nOK: no regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Deterministic stand-ins for the OpenAI chat and embedding models used by the benchmarks.
+
+StubChatModel answers the reasoning prompt by reading the candidate table and
+picking the best players per position bucket, and answers anything else with
+a tactics JSON object. Latency and the share of invalid squads are configurable
+so concurrency features can be exercised without network access. StubEmbeddings is
+the local hashed embedder with a per-batch delay and a call counter.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+
+from src.embeddings import HashedEmbeddings
+from src.reasoning import approx_token_count
+
+SQUAD_SHAPE = {"GK": 3, "DEF": 8, "MID": 7, "FWD": 5}
+
+TACTICS_JSON = (
+    '{"formation": "4-3-3", "buildUpStyle": "Balanced", "defensiveApproach": "Balanced", '
+    '"budgetEnabled": false, "budget": 0}'
+)
+
+
+def _prompt_text(value: Any) -> str:
+    if isinstance(value, list):
+        return "\n".join(str(getattr(m, "content", m)) for m in value)
+    if hasattr(value, "to_string"):
+        return value.to_string()
+    return str(value)
+
+
+def _candidate_rows(prompt: str) -> List[Dict[str, str]]:
+    block = prompt.split("CANDIDATE PLAYERS", 1)[1].split("TASK:", 1)[0]
+    lines = [line for line in block.splitlines() if line.count("|") >= 4]
+    if not lines:
+        return []
+    header = lines[0].split("|")
+    return [dict(zip(header, line.split("|"))) for line in lines[1:]]
+
+
+def squad_answer(prompt: str, rng: Optional[random.Random] = None, invalid_rate: float = 0.0) -> str:
+    """Section-formatted reasoning answer for `prompt`; sometimes one GK short when invalid_rate > 0."""
+    rng = rng or random.Random(0)
+    need = dict(SQUAD_SHAPE)
+    if rng.random() < invalid_rate:
+        need["GK"] -= 1
+    rows = sorted(_candidate_rows(prompt), key=lambda r: -int(r.get("ovr", 0) or 0))
+    lines = []
+    for row in rows:
+        if need.get(row.get("pos", ""), 0) > 0:
+            need[row["pos"]] -= 1
+            lines.append(f"{row.get('id', '')} | {row['name']} | {row['pos']} | {row['ovr']} | Rated {row['ovr']}.")
+    return (
+        "---SELECTED---\n" + "\n".join(lines)
+        + "\n---EXCLUDED---\nNobody | Stub model\n---TOTAL_VALUE---\n0\n"
+        + "---FORMATION_NOTES---\nBest available player per slot.\n"
+    )
+
+
+class StubChatModel(Runnable):
+    """Drop-in for ChatOpenAI(model=..., temperature=...) in benchmarks.
+
+    latency is a (min, max) range in seconds drawn per call; invalid_rate is the chance a
+    reasoning answer violates the GK minimum. Calls are counted in `calls`; answers report
+    estimated token usage like the OpenAI client does.
+    """
+
+    calls = 0
+
+    def __init__(
+        self,
+        *args: Any,
+        latency: Tuple[float, float] = (0.0, 0.0),
+        invalid_rate: float = 0.0,
+        seed: Optional[int] = None,
+        **kwargs: Any,
+    ):
+        self.latency = latency
+        self.invalid_rate = invalid_rate
+        self.rng = random.Random(seed)
+        self.temperature = kwargs.get("temperature")
+
+    def _answer(self, value: Any) -> AIMessage:
+        type(self).calls += 1
+        prompt = _prompt_text(value)
+        if "CANDIDATE PLAYERS" in prompt:
+            content = squad_answer(prompt, self.rng, self.invalid_rate)
+        else:
+            content = TACTICS_JSON
+        usage = {"input_tokens": approx_token_count(prompt), "output_tokens": approx_token_count(content)}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return AIMessage(content=content, usage_metadata=usage)
+
+    def invoke(self, input: Any, config: Any = None, **kwargs: Any) -> AIMessage:
+        time.sleep(self.rng.uniform(*self.latency))
+        return self._answer(input)
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs: Any) -> AIMessage:
+        await asyncio.sleep(self.rng.uniform(*self.latency))
+        return self._answer(input)
+
+
+class StubEmbeddings(HashedEmbeddings):
+    """HashedEmbeddings (512-d, reported as the "hashed" backend) that sleeps `latency` seconds
+    per embed_documents batch and counts batches and queries in `document_calls` / `query_calls`."""
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.document_calls = 0
+        self.query_calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.document_calls += 1
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        self.query_calls += 1
+        return super().embed_query(text)
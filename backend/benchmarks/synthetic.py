@@ -0,0 +1,194 @@
+"""
+Synthetic player data for offline benchmarks.
+
+synthetic_players() builds player metadata dicts (the keys ingestion.dataframe_to_documents
+produces). synthetic_raw_frame() builds a raw table with every column of the Kaggle "EA Sports
+FC 24 complete player dataset" CSV (male_players.csv), for benchmarking ingestion itself; it is
+vectorised with numpy, so 1M+ rows take seconds, and repeated categorical strings are shared
+objects to keep memory down.
+"""
+
+import random
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+NATURAL_POSITIONS = {
+    "GK": ["GK"],
+    "DEF": ["CB", "LB", "RB", "LWB", "RWB"],
+    "MID": ["CM", "CDM", "CAM", "LM", "RM"],
+    "FWD": ["ST", "LW", "RW", "CF"],
+}
+BUCKET_WEIGHTS = {"GK": 0.1, "DEF": 0.33, "MID": 0.35, "FWD": 0.22}
+NATIONS = ["Brazil", "France", "Argentina", "England", "Spain", "Germany", "Portugal", "Netherlands"]
+CLUBS = ["Real Madrid", "Manchester City", "Bayern", "PSG", "Inter", "Arsenal", "Benfica", "Ajax"]
+
+
+def synthetic_players(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """n player metadata dicts with realistic stat ranges and unique player_ids."""
+    rng = random.Random(seed)
+    buckets = list(BUCKET_WEIGHTS)
+    weights = list(BUCKET_WEIGHTS.values())
+    players = []
+    for i in range(n):
+        bucket = rng.choices(buckets, weights)[0]
+        pool = NATURAL_POSITIONS[bucket]
+        positions = rng.sample(pool, k=min(len(pool), rng.randint(1, 3)))
+        overall = max(45, min(94, int(rng.gauss(68, 8))))
+        stats = {k: max(20, min(99, overall + rng.randint(-20, 12)))
+                 for k in ("pace", "shooting", "passing", "dribbling", "defending", "physic")}
+        players.append({
+            "player_id": 100000 + i,
+            "short_name": f"P. Player{i}",
+            "long_name": f"Player Number {i}",
+            "player_positions": ", ".join(positions),
+            "primary_position": bucket,
+            "overall": overall,
+            "potential": min(95, overall + rng.randint(0, 8)),
+            **stats,
+            "value_eur": float(round(max(0.1, max(0, overall - 50) ** 2.2 / 40) * 1_000_000, -4)),
+            "wage_eur": float(max(500, (overall - 45) * 2000 + rng.randint(0, 5000))),
+            "age": rng.randint(17, 38),
+            "nationality_name": rng.choice(NATIONS),
+            "club_name": rng.choice(CLUBS),
+            "height_cm": rng.randint(165, 200),
+            "weight_kg": rng.randint(60, 95),
+        })
+    return players
+
+
+# Column order of the Kaggle CSV
+RAW_COLUMNS = [
+    "player_id", "player_url", "fifa_version", "fifa_update", "update_as_of", "short_name",
+    "long_name", "player_positions", "overall", "potential", "value_eur", "wage_eur", "age", "dob",
+    "height_cm", "weight_kg", "club_team_id", "club_name", "league_id", "league_name", "league_level",
+    "club_position", "club_jersey_number", "club_loaned_from", "club_joined_date",
+    "club_contract_valid_until_year", "nationality_id", "nationality_name", "nation_team_id",
+    "nation_position", "nation_jersey_number", "preferred_foot", "weak_foot", "skill_moves",
+    "international_reputation", "work_rate", "body_type", "real_face", "release_clause_eur",
+    "player_tags", "player_traits", "pace", "shooting", "passing", "dribbling", "defending", "physic",
+    "attacking_crossing", "attacking_finishing", "attacking_heading_accuracy",
+    "attacking_short_passing", "attacking_volleys", "skill_dribbling", "skill_curve",
+    "skill_fk_accuracy", "skill_long_passing", "skill_ball_control", "movement_acceleration",
+    "movement_sprint_speed", "movement_agility", "movement_reactions", "movement_balance",
+    "power_shot_power", "power_jumping", "power_stamina", "power_strength", "power_long_shots",
+    "mentality_aggression", "mentality_interceptions", "mentality_positioning", "mentality_vision",
+    "mentality_penalties", "mentality_composure", "defending_marking_awareness",
+    "defending_standing_tackle", "defending_sliding_tackle", "goalkeeping_diving",
+    "goalkeeping_handling", "goalkeeping_kicking", "goalkeeping_positioning", "goalkeeping_reflexes",
+    "goalkeeping_speed", "ls", "st", "rs", "lw", "lf", "cf", "rf", "rw", "lam", "cam", "ram", "lm",
+    "lcm", "cm", "rcm", "rm", "lwb", "ldm", "cdm", "rdm", "rwb", "lb", "lcb", "cb", "rcb", "rb", "gk",
+]
+POSITION_RATING_COLUMNS = RAW_COLUMNS[RAW_COLUMNS.index("ls"):]
+DETAIL_STAT_COLUMNS = RAW_COLUMNS[RAW_COLUMNS.index("attacking_crossing"):RAW_COLUMNS.index("goalkeeping_diving")]
+GOALKEEPING_COLUMNS = RAW_COLUMNS[RAW_COLUMNS.index("goalkeeping_diving"):RAW_COLUMNS.index("ls")]
+LEAGUES = ["Premier League", "La Liga", "Serie A", "Bundesliga", "Ligue 1", "Liga Portugal", "Eredivisie"]
+WORK_RATES = ["High/High", "High/Medium", "Medium/High", "Medium/Medium", "High/Low", "Low/High"]
+BODY_TYPES = ["Normal (170-185)", "Lean (185+)", "Stocky (170-185)", "Normal (185+)", "Unique"]
+PLAYER_TAGS = ["#Speedster", "#Dribbler", "#Playmaker", "#Engine", "#Aerial threat", "#Clinical finisher"]
+PLAYER_TRAITS = ["Finesse Shot", "Power Header", "Long Passer", "Leadership", "Flair", "Injury Prone"]
+
+
+def _choice(rng: np.random.Generator, values: List[Any], n: int) -> np.ndarray:
+    """n draws from `values` as an object array whose entries share the vocabulary's string objects."""
+    return np.array(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def synthetic_raw_frame(n: int, seed: int = 0, history: float = 0.0, dirty: float = 0.0) -> "pd.DataFrame":
+    """n fifa_version 24 rows in the Kaggle CSV schema, with realistic stat ranges.
+
+    `history` adds that share of extra rows for the same players from earlier fifa_versions
+    (which load_raw_data filters out); `dirty` blanks positions, wages or outfield stats in that
+    share of rows (which clean_data drops). Goalkeepers have no outfield face stats and
+    outfield players no goalkeeping_speed, as in the real file.
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    buckets = rng.choice(list(BUCKET_WEIGHTS), size=n, p=list(BUCKET_WEIGHTS.values()))
+    positions = np.empty(n, dtype=object)
+    for bucket, pool in NATURAL_POSITIONS.items():
+        rows = np.flatnonzero(buckets == bucket)
+        combos = [", ".join(pool[j:j + k]) for j in range(len(pool)) for k in (1, 2) if j + k <= len(pool)]
+        positions[rows] = _choice(rng, combos, len(rows))
+    is_gk = buckets == "GK"
+    overall = np.clip(rng.normal(66, 7, n), 45, 94).astype(np.int64)
+    ids = np.arange(200000, 200000 + n)
+
+    def stat(spread: int = 15) -> np.ndarray:
+        return np.clip(overall + rng.integers(-spread, spread // 2, n), 15, 99)
+
+    nation_ids = rng.integers(0, len(NATIONS), n)
+    club_ids = rng.integers(0, len(CLUBS), n)
+    value = np.round(np.maximum(0.1, np.maximum(0, overall - 45) ** 2.2 / 40), 1) * 1_000_000
+    columns: Dict[str, Any] = {
+        "player_id": ids,
+        "player_url": [f"/player/{i}/synthetic-player-{i}/240002" for i in ids],
+        "fifa_version": np.full(n, 24.0),
+        "fifa_update": np.full(n, 2.0),
+        "update_as_of": _choice(rng, ["2023-09-22"], n),
+        "short_name": [f"P. Player{i}" for i in ids],
+        "long_name": [f"Player Number {i}" for i in ids],
+        "player_positions": positions,
+        "overall": overall,
+        "potential": np.minimum(95, overall + rng.integers(0, 9, n)),
+        "value_eur": value,
+        "wage_eur": np.maximum(500.0, (overall - 45) * 2000.0 + rng.integers(0, 5000, n)),
+        "age": rng.integers(17, 39, n),
+        "dob": _choice(rng, [f"{y}-0{m}-1{d}" for y in range(1985, 2007) for m in range(1, 10) for d in range(10)], n),
+        "height_cm": np.where(is_gk, rng.integers(182, 200, n), rng.integers(163, 196, n)),
+        "weight_kg": rng.integers(58, 96, n),
+        "club_team_id": club_ids.astype(np.float64) + 1,
+        "club_name": np.array(CLUBS, dtype=object)[club_ids],
+        "league_id": rng.integers(1, len(LEAGUES) + 1, n).astype(np.float64),
+        "league_name": _choice(rng, LEAGUES, n),
+        "league_level": np.ones(n),
+        "club_position": _choice(rng, ["SUB", "RES", "LCB", "RCB", "LCM", "RCM", "ST", "GK"], n),
+        "club_jersey_number": rng.integers(1, 40, n).astype(np.float64),
+        "club_loaned_from": np.full(n, np.nan, dtype=object),
+        "club_joined_date": _choice(rng, [f"20{y:02d}-07-01" for y in range(10, 24)], n),
+        "club_contract_valid_until_year": rng.integers(2024, 2029, n).astype(np.float64),
+        "nationality_id": nation_ids + 1,
+        "nationality_name": np.array(NATIONS, dtype=object)[nation_ids],
+        "nation_team_id": np.full(n, np.nan),
+        "nation_position": np.full(n, np.nan, dtype=object),
+        "nation_jersey_number": np.full(n, np.nan),
+        "preferred_foot": _choice(rng, ["Right", "Right", "Right", "Left"], n),
+        "weak_foot": rng.integers(1, 6, n),
+        "skill_moves": np.where(is_gk, 1, rng.integers(2, 6, n)),
+        "international_reputation": np.clip((overall - 60) // 7, 1, 5),
+        "work_rate": _choice(rng, WORK_RATES, n),
+        "body_type": _choice(rng, BODY_TYPES, n),
+        "real_face": _choice(rng, ["Yes", "No"], n),
+        "release_clause_eur": value * 1.9,
+        "player_tags": np.where(rng.random(n) < 0.1, _choice(rng, PLAYER_TAGS, n), None),
+        "player_traits": np.where(rng.random(n) < 0.5, _choice(rng, PLAYER_TRAITS, n), None),
+    }
+    for col in ("pace", "shooting", "passing", "dribbling", "defending", "physic"):
+        columns[col] = np.where(is_gk, np.nan, stat().astype(np.float64))
+    for col in DETAIL_STAT_COLUMNS:
+        columns[col] = stat(20)
+    for col in GOALKEEPING_COLUMNS:
+        columns[col] = np.where(is_gk, stat(6), rng.integers(5, 16, n))
+    columns["goalkeeping_speed"] = np.where(is_gk, stat(20).astype(np.float64), np.nan)
+    # The same rating string for every positional column (one shared object per row)
+    rating = (overall - 3).astype(str).astype(object) + "+2"
+    for col in POSITION_RATING_COLUMNS:
+        columns[col] = rating
+
+    df = pd.DataFrame(columns, columns=RAW_COLUMNS)
+    if dirty > 0:
+        rows = rng.random(n) < dirty
+        kind = rng.integers(0, 3, n)
+        df.loc[rows & (kind == 0), "player_positions"] = np.nan
+        df.loc[rows & (kind == 1), "wage_eur"] = np.nan
+        df.loc[rows & (kind == 2) & ~is_gk, "pace"] = np.nan
+    if history > 0:
+        older = df.sample(frac=min(history, 1.0), random_state=seed).copy()
+        older["fifa_version"] = 23.0
+        older["overall"] = np.maximum(45, older["overall"] - 1)
+        df = pd.concat([df, older], ignore_index=True)
+    return df
@@ -0,0 +1,45 @@
+"""
+Precompute the preset squads (every formation x build-up x defensive approach x budget tier with
+the default prompt) into the versioned artifact the API serves at startup.
+
+Run from backend/:
+    python precompute_presets.py [--nations Brazil France ...] [--concurrency 8] [--output PATH]
+
+The artifact records the player-data version it was built from; the API ignores it once the
+data changes, until it is rebuilt here or by POST /api/admin/presets/refresh.
+"""
+
+import argparse
+import sys
+import time
+
+import app_api
+from src import embeddings, presets
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nations", nargs="*", default=[], help="also build every preset per nation")
+    parser.add_argument("--concurrency", type=int, default=app_api.BATCH_CONCURRENCY)
+    parser.add_argument("--output", default=app_api.PRESETS_PATH)
+    args = parser.parse_args()
+
+    # Build from scratch rather than serving (or refreshing) an existing artifact
+    app_api.PRESETS_ENABLED = False
+    app_api.ensure_data_loaded()
+
+    jobs = len(presets.preset_jobs(args.nations or None))
+    print(f"Building {jobs} preset squads (data version {app_api.current_snapshot().version})...", file=sys.stderr)
+    start = time.perf_counter()
+    squads = app_api.build_presets(args.nations or None, args.concurrency)
+    presets.save_artifact(args.output, app_api.current_snapshot().version, embeddings.EMBEDDING_BACKEND, args.nations, squads)
+    elapsed = time.perf_counter() - start
+    print(
+        f"Wrote {len(squads)}/{jobs} preset squads to {args.output} in {elapsed:.1f}s "
+        f"({len(squads) / elapsed * 60:.1f} squads/minute)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Admission control for LLM-bound work (squad builds and LLM tactics inference).
+
+At most `max_concurrent` requests hold a slot at once; up to `max_queue` more wait, each
+for at most `max_wait` seconds. A client may hold or wait for at most `per_client` slots
+at a time. When a slot frees, the waiting client with the fewest running requests is
+served next (FIFO among equals), so one busy client cannot starve the others. Work that
+cannot be admitted fails fast with Rejected, carrying a Retry-After estimate derived
+from recent service times. Slots are reentrant per thread.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator
+
+# Recent waits kept for the percentiles in stats()
+WAIT_WINDOW = 1000
+
+
+class Rejected(Exception):
+    """Raised when a request cannot be admitted; `retry_after` is in whole seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"LLM capacity exhausted ({reason}); retry in {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("client", "enqueued", "event", "granted")
+
+    def __init__(self, client: str):
+        self.client = client
+        self.enqueued = time.perf_counter()
+        self.event = threading.Event()
+        self.granted = False
+
+
+class AdmissionController:
+    def __init__(self, max_concurrent: int, max_queue: int, per_client: int, max_wait: float):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.per_client = max(1, per_client)
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._running = 0
+        self._running_by_client: Dict[str, int] = {}
+        self._in_system: Dict[str, int] = {}  # running + queued per client
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._queued = 0
+        self._service_ewma = 5.0  # seconds per admitted request, for Retry-After
+        self._stats: Dict[str, Any] = {
+            "admitted": 0, "queue_peak": 0, "wait_count": 0, "wait_sum": 0.0, "wait_max": 0.0,
+            "rejected": {"queue_full": 0, "client_share": 0, "timeout": 0},
+        }
+        self._waits: Deque[float] = deque(maxlen=WAIT_WINDOW)
+
+    @contextmanager
+    def slot(self, client: str) -> Iterator[None]:
+        """Hold a slot for the block; raises Rejected if none can be had in time."""
+        if getattr(self._local, "depth", 0):
+            self._local.depth += 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+        self._acquire(client)
+        self._local.depth = 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            self._release(client, time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "max_concurrent": self.max_concurrent,
+                "max_queue": self.max_queue,
+                "per_client": self.per_client,
+                "running": self._running,
+                "queued": self._queued,
+                "queue_peak": self._stats["queue_peak"],
+                "admitted": self._stats["admitted"],
+                "rejected": dict(self._stats["rejected"]),
+                "wait_seconds": {
+                    "count": self._stats["wait_count"],
+                    "sum": round(self._stats["wait_sum"], 3),
+                    "max": round(self._stats["wait_max"], 3),
+                    "p50": round(waits[len(waits) // 2], 3) if waits else 0.0,
+                    "p95": round(waits[int(0.95 * (len(waits) - 1))], 3) if waits else 0.0,
+                },
+                "service_seconds_ewma": round(self._service_ewma, 3),
+            }
+
+    def _acquire(self, client: str) -> None:
+        with self._lock:
+            if self._in_system.get(client, 0) >= self.per_client:
+                raise self._reject("client_share")
+            self._in_system[client] = self._in_system.get(client, 0) + 1
+            if self._running < self.max_concurrent and not self._queued:
+                self._start(client)
+                self._record_wait(0.0)
+                return
+            if self._queued >= self.max_queue:
+                self._leave(client)
+                raise self._reject("queue_full")
+            waiter = _Waiter(client)
+            self._queues.setdefault(client, deque()).append(waiter)
+            self._queued += 1
+            self._stats["queue_peak"] = max(self._stats["queue_peak"], self._queued)
+        if not waiter.event.wait(self.max_wait):
+            with self._lock:
+                if not waiter.granted:
+                    queue = self._queues[client]
+                    queue.remove(waiter)
+                    if not queue:
+                        del self._queues[client]
+                    self._queued -= 1
+                    self._leave(client)
+                    raise self._reject("timeout")
+        with self._lock:
+            self._record_wait(time.perf_counter() - waiter.enqueued)
+
+    def _release(self, client: str, service_seconds: float) -> None:
+        with self._lock:
+            self._running -= 1
+            self._running_by_client[client] -= 1
+            if not self._running_by_client[client]:
+                del self._running_by_client[client]
+            self._leave(client)
+            self._service_ewma = 0.8 * self._service_ewma + 0.2 * service_seconds
+            # Fair share: the waiting client with the fewest running requests goes next, FIFO among equals
+            while self._running < self.max_concurrent and self._queued:
+                nxt = min(self._queues, key=lambda c: (self._running_by_client.get(c, 0), self._queues[c][0].enqueued))
+                queue = self._queues[nxt]
+                waiter = queue.popleft()
+                if not queue:
+                    del self._queues[nxt]
+                self._queued -= 1
+                self._start(nxt)
+                waiter.granted = True
+                waiter.event.set()
+
+    # The helpers below run with self._lock held
+
+    def _start(self, client: str) -> None:
+        self._running += 1
+        self._running_by_client[client] = self._running_by_client.get(client, 0) + 1
+        self._stats["admitted"] += 1
+
+    def _leave(self, client: str) -> None:
+        self._in_system[client] -= 1
+        if not self._in_system[client]:
+            del self._in_system[client]
+
+    def _record_wait(self, seconds: float) -> None:
+        self._waits.append(seconds)
+        self._stats["wait_count"] += 1
+        self._stats["wait_sum"] += seconds
+        self._stats["wait_max"] = max(self._stats["wait_max"], seconds)
+
+    def _reject(self, reason: str) -> Rejected:
+        self._stats["rejected"][reason] += 1
+        retry_after = max(1, math.ceil(self._service_ewma * (self._queued + 1) / self.max_concurrent))
+        return Rejected(reason, retry_after)
@@ -4,17 +4,17 @@ Agent orchestration module for the World Cup Squad Builder.
 
 from typing import Any
 
-from langchain_openai import ChatOpenAI
 from langchain_classic.memory import ConversationBufferMemory
 from langchain_classic.agents import AgentExecutor, create_react_agent
 
+from src import clients
 from src.tools import ALL_TOOLS
 from src.prompts import REACT_AGENT_PROMPT
 
 
 def create_agent() -> Any:
     """Create LangChain agent with tools and conversation memory."""
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+    llm = clients.chat_model("agent")
     memory = ConversationBufferMemory(
         memory_key="chat_history",
         return_messages=False,
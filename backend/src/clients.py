@@ -0,0 +1,127 @@
+"""
+Shared LLM and embedding clients for the World Cup Squad Builder.
+
+Every stage gets its chat model and embeddings from here instead of constructing
+`ChatOpenAI` / `OpenAIEmbeddings` per call, so all calls reuse one pooled set of
+keep-alive HTTP connections. langchain_openai (the slowest import in the app) is only
+imported when the first client is built. Each call site has its own timeout and retry budget
+(CALL_SITES). The pool size doubles as the upstream concurrency limit. LLM_BASE_URL
+points every client at an OpenAI-compatible stand-in (e.g. a local server).
+"""
+
+import asyncio
+import os
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Dict, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from langchain_openai import OpenAIEmbeddings
+
+CHAT_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+EMBEDDING_MODEL = "text-embedding-ada-002"
+
+# OpenAI-compatible base URL (None = the OpenAI default / OPENAI_BASE_URL)
+BASE_URL: Optional[str] = os.getenv("LLM_BASE_URL") or None
+
+# Most concurrent upstream requests; extra requests wait for a pooled connection
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# Per-call-site policy: sampling temperature, request timeout (s) and retry budget
+CALL_SITES: Dict[str, Dict[str, float]] = {
+    "reasoning": {"temperature": 0.2, "timeout": 90.0, "max_retries": 1},
+    "synthesis": {"temperature": 0.3, "timeout": 60.0, "max_retries": 2},
+    "tactics": {"temperature": 0.2, "timeout": 15.0, "max_retries": 1},
+    "agent": {"temperature": 0.2, "timeout": 60.0, "max_retries": 2},
+    "embeddings": {"timeout": 30.0, "max_retries": 3},
+}
+
+# Optional override used by benchmarks/tests: factory(model=..., temperature=...) -> chat model
+_chat_factory: Optional[Callable[..., Any]] = None
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONCURRENCY,
+        max_keepalive_connections=MAX_CONCURRENCY,
+        keepalive_expiry=60.0,
+    )
+
+
+@lru_cache(maxsize=None)
+def _http_client() -> httpx.Client:
+    return httpx.Client(limits=_limits())
+
+
+@lru_cache(maxsize=None)
+def _async_http_client() -> httpx.AsyncClient:
+    # Only ever used on the shared event loop (see run_async)
+    return httpx.AsyncClient(limits=_limits())
+
+
+def _event_loop() -> asyncio.AbstractEventLoop:
+    """Long-lived event loop on a daemon thread, so async connections survive across requests."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-client-loop", daemon=True).start()
+    return _loop
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine that uses async clients on the shared loop and block until it finishes."""
+    return asyncio.run_coroutine_threadsafe(coro, _event_loop()).result()
+
+
+@lru_cache(maxsize=None)
+def _chat_model(site: str, temperature: float) -> Any:
+    if _chat_factory is not None:
+        return _chat_factory(model=CHAT_MODEL, temperature=temperature)
+    from langchain_openai import ChatOpenAI
+
+    policy = CALL_SITES[site]
+    return ChatOpenAI(
+        model=CHAT_MODEL,
+        temperature=temperature,
+        timeout=policy["timeout"],
+        max_retries=int(policy["max_retries"]),
+        base_url=BASE_URL,
+        http_client=_http_client(),
+        http_async_client=_async_http_client(),
+    )
+
+
+def chat_model(site: str, temperature: Optional[float] = None) -> Any:
+    """Shared chat model for a call site in CALL_SITES; temperature defaults to the site's."""
+    if temperature is None:
+        temperature = CALL_SITES[site]["temperature"]
+    return _chat_model(site, float(temperature))
+
+
+@lru_cache(maxsize=None)
+def embeddings() -> "OpenAIEmbeddings":
+    """Shared embedding model so index build, load and queries use the same client and dimensions."""
+    from langchain_openai import OpenAIEmbeddings
+
+    policy = CALL_SITES["embeddings"]
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL,
+        timeout=policy["timeout"],
+        max_retries=int(policy["max_retries"]),
+        base_url=BASE_URL,
+        http_client=_http_client(),
+        http_async_client=_async_http_client(),
+    )
+
+
+def set_chat_model_factory(factory: Optional[Callable[..., Any]]) -> None:
+    """Replace (or with None, restore) how chat models are built, e.g. with a local stub."""
+    global _chat_factory
+    _chat_factory = factory
+    _chat_model.cache_clear()
@@ -0,0 +1,68 @@
+"""
+Embedding backends for the FAISS player index.
+
+"openai" is the hosted text-embedding-ada-002 model (network call per query and per index
+build). "hashed" is a CPU-only local embedder: word unigrams and bigrams (so "pace 90"
+keeps the stat value) feature-hashed into a fixed-size signed vector with sublinear term
+frequency and L2 normalization, deterministic across processes and sub-millisecond per query.
+
+An index records the backend and dimension that built it (retrieval.save_vector_store);
+retrieval.load_vector_store refuses to open it with a different backend.
+"""
+
+import math
+import os
+import zlib
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src import clients
+from src.lexical import tokenize
+
+# Backend used when none is given (e.g. EMBEDDING_BACKEND=hashed to run fully offline)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+
+HASHED_DIMENSION = 512
+
+# Output dimension per backend
+BACKEND_DIMENSIONS: Dict[str, int] = {
+    "openai": 1536,  # text-embedding-ada-002
+    "hashed": HASHED_DIMENSION,
+}
+
+
+class HashedEmbeddings(Embeddings):
+    """Feature-hashed bag of unigrams and bigrams; no model, no network."""
+
+    def __init__(self, dimension: int = HASHED_DIMENSION):
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> List[float]:
+        tokens = tokenize(text)
+        counts: Dict[str, int] = {}
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            counts[feature] = counts.get(feature, 0) + 1
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature, count in counts.items():
+            h = zlib.crc32(feature.encode())
+            sign = 1.0 if (h >> 16) & 1 else -1.0
+            vector[h % self.dimension] += sign * (1.0 + math.log(count))
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def get_embeddings(backend: str = EMBEDDING_BACKEND) -> Embeddings:
+    """Embedding model for a backend name in BACKEND_DIMENSIONS."""
+    if backend == "openai":
+        return clients.embeddings()
+    if backend == "hashed":
+        return HashedEmbeddings(BACKEND_DIMENSIONS["hashed"])
+    raise ValueError(f"Unknown embedding backend: {backend!r} (expected one of {sorted(BACKEND_DIMENSIONS)})")
@@ -12,14 +12,23 @@ Purpose:
       (GK, DEF, MID, FWD).
     - Cache the cleaned data to a reproducible CSV in `data/processed/players_cleaned.csv`.
     - Convert cleaned rows into LangChain `Document` objects for downstream retrieval.
+
+pandas is imported inside the functions that parse the CSV, so the API (which normally
+starts from the saved FAISS index) does not pay for it at import time.
 """
 
+import hashlib
+import math
 import os
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-import pandas as pd
 from langchain_core.documents import Document
 
+from src import metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Get project root (two levels up from this file)
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
@@ -43,7 +52,7 @@ GK_STAT_COLUMNS = [
 ]
 
 SELECT_COLUMNS = [
-    "short_name", "long_name", "player_positions", "primary_position",
+    "player_id", "short_name", "long_name", "player_positions", "primary_position",
     "overall", "potential", "pace", "shooting", "passing", "dribbling", "defending", "physic",
     "gk_diving", "gk_handling", "gk_kicking", "gk_reflexes", "gk_speed", "gk_positioning",
     "value_eur", "wage_eur", "age", "nationality_name", "club_name",
@@ -54,8 +63,23 @@ SELECT_COLUMNS = [
 ]
 
 
-def load_raw_data(filepath: str = None) -> pd.DataFrame:
+def player_key(p: Dict[str, Any]) -> int:
+    """Stable integer key for a player: the dataset's player_id, or a hash of name/overall/club
+    for metadata without one (e.g. indexes built before player_id was kept)."""
+    pid = p.get("player_id")
+    if pid is not None and not (isinstance(pid, float) and math.isnan(pid)):
+        try:
+            return int(pid)
+        except (TypeError, ValueError):
+            pass
+    key = f"{p.get('short_name', '')}_{p.get('overall', '')}_{p.get('club_name', '')}"
+    return int(hashlib.md5(key.encode()).hexdigest()[:8], 16)
+
+
+def load_raw_data(filepath: str = None) -> "pd.DataFrame":
     """Load the raw FIFA player CSV and filter to fifa_version == 24."""
+    import pandas as pd
+
     if filepath is None:
         filepath = os.path.join(PROJECT_ROOT, "data/raw/male_players.csv")
     if not os.path.isfile(filepath):
@@ -69,8 +93,10 @@ def load_raw_data(filepath: str = None) -> pd.DataFrame:
     return df
 
 
-def clean_data(df: pd.DataFrame) -> pd.DataFrame:
+def clean_data(df: "pd.DataFrame") -> "pd.DataFrame":
     """Clean and normalize the raw FIFA player DataFrame."""
+    import pandas as pd
+
     # Drop rows with nulls in universally required columns
     for col in REQUIRED_COLUMNS:
         if col not in df.columns:
@@ -114,13 +140,17 @@ def clean_data(df: pd.DataFrame) -> pd.DataFrame:
 
     df = pd.concat([outfield, gk], ignore_index=True)
 
+    # player_id is the primary key downstream; keep one row per player
+    if "player_id" in df.columns:
+        df = df.dropna(subset=["player_id"]).drop_duplicates(subset=["player_id"], keep="last")
+
     # Select only columns we need (that exist)
     available = [c for c in SELECT_COLUMNS if c in df.columns]
     df = df[available].copy()
     return df
 
 
-def cache_processed_data(df: pd.DataFrame, filepath: str = None) -> None:
+def cache_processed_data(df: "pd.DataFrame", filepath: str = None) -> None:
     """Save cleaned DataFrame to CSV; create directory if needed."""
     if filepath is None:
         filepath = os.path.join(PROJECT_ROOT, "data/processed/players_cleaned.csv")
@@ -128,8 +158,10 @@ def cache_processed_data(df: pd.DataFrame, filepath: str = None) -> None:
     df.to_csv(filepath, index=False)
 
 
-def dataframe_to_documents(df: pd.DataFrame) -> List[Document]:
+def dataframe_to_documents(df: "pd.DataFrame") -> List[Document]:
     """Convert each row to a LangChain Document with natural-language page_content and metadata."""
+    import pandas as pd
+
     docs = []
     for _, row in df.iterrows():
         name = row.get("short_name", row.get("long_name", "Unknown"))
@@ -157,7 +189,7 @@ def dataframe_to_documents(df: pd.DataFrame) -> List[Document]:
         )
         metadata = {k: (int(v) if isinstance(v, (float,)) and k not in ("value_eur", "wage_eur") and pd.notna(v) else v) for k, v in row.items()}
         # Ensure numeric types where appropriate
-        for key in ["overall", "potential", "pace", "shooting", "passing", "dribbling", "defending", "physic", "age", "skill_moves", "weak_foot", "height_cm", "weight_kg", "international_reputation"]:
+        for key in ["player_id", "overall", "potential", "pace", "shooting", "passing", "dribbling", "defending", "physic", "age", "skill_moves", "weak_foot", "height_cm", "weight_kg", "international_reputation"]:
             if key in metadata and metadata[key] is not None and pd.notna(metadata[key]):
                 try:
                     metadata[key] = int(float(metadata[key]))
@@ -174,8 +206,13 @@ def dataframe_to_documents(df: pd.DataFrame) -> List[Document]:
 
 
 def load_and_clean_data() -> List[Document]:
-    """Orchestrate: load_raw_data -> clean_data -> cache_processed_data -> dataframe_to_documents."""
-    df = load_raw_data()
-    df = clean_data(df)
-    cache_processed_data(df)
-    return dataframe_to_documents(df)
+    """Orchestrate: load_raw_data -> clean_data -> cache_processed_data -> dataframe_to_documents
+    (each step timed as an ingest_* stage in src.metrics)."""
+    with metrics.stage("ingest_load"):
+        df = load_raw_data()
+    with metrics.stage("ingest_clean"):
+        df = clean_data(df)
+    with metrics.stage("ingest_cache"):
+        cache_processed_data(df)
+    with metrics.stage("ingest_documents"):
+        return dataframe_to_documents(df)
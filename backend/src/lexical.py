@@ -0,0 +1,156 @@
+"""
+Local BM25 keyword index over player names, clubs, nations and positions.
+
+Runs next to the FAISS index: entity queries ("Real Madrid midfielders", "Haaland") are
+matched exactly and without an embedding call, and retrieval.reciprocal_rank_fusion merges
+lexical and semantic rankings for everything else.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+# BM25 parameters (Robertson/Sparck Jones defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Metadata fields that make up a player's lexical document
+ENTITY_FIELDS = ("short_name", "long_name", "club_name", "nationality_name")
+NAME_FIELDS = ("short_name", "long_name")
+PLACE_FIELDS = ("club_name", "nationality_name")
+POSITION_FIELDS = ("player_positions", "primary_position")
+
+# Query words that carry no lexical signal
+STOPWORDS = frozenset(
+    "a an the of from for in at with and or to i we want need me my our give build find "
+    "player players team squad side best top good great some".split()
+)
+
+# Natural-language position words -> position tokens in the index
+POSITION_SYNONYMS: Dict[str, Tuple[str, ...]] = {
+    "goalkeeper": ("gk",), "goalkeepers": ("gk",), "keeper": ("gk",), "keepers": ("gk",),
+    "defender": ("def",), "defenders": ("def",), "defence": ("def",), "defense": ("def",),
+    "centre-back": ("cb",), "centre-backs": ("cb",), "center-back": ("cb",), "center-backs": ("cb",),
+    "fullback": ("lb", "rb"), "fullbacks": ("lb", "rb"), "full-backs": ("lb", "rb"),
+    "midfielder": ("mid",), "midfielders": ("mid",), "midfield": ("mid",),
+    "forward": ("fwd",), "forwards": ("fwd",), "attacker": ("fwd",), "attackers": ("fwd",),
+    "striker": ("st",), "strikers": ("st",), "winger": ("lw", "rw"), "wingers": ("lw", "rw"),
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+CASED_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:-[A-Za-z0-9]+)*")
+
+
+def _ascii(text: str) -> str:
+    return unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode()
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-stripped word tokens ("Mapi León" -> ["mapi", "leon"])."""
+    return TOKEN_RE.findall(_ascii(text).lower())
+
+
+def _document_tokens(meta: Dict[str, Any]) -> List[str]:
+    entity: List[str] = []
+    for field in ENTITY_FIELDS:
+        value = meta.get(field)
+        if isinstance(value, str):
+            for token in tokenize(value):
+                entity.append(token)
+                entity.extend(token.split("-") if "-" in token else ())
+    positions = [t for field in POSITION_FIELDS for t in tokenize(meta.get(field) or "")]
+    return entity + positions
+
+
+def query_tokens(query: str) -> List[str]:
+    """Query words with stopwords dropped and position words mapped to position tokens."""
+    tokens: List[str] = []
+    for token in tokenize(query):
+        if token in STOPWORDS:
+            continue
+        tokens.extend(POSITION_SYNONYMS.get(token, (token,)))
+    return tokens
+
+
+class BM25Index:
+    """BM25 index over player metadata; search returns rows in the order metadata was given.
+
+    Term weights are query-independent, so each posting list stores its final BM25 weight
+    and a query is a scatter-add of its terms' postings.
+    """
+
+    def __init__(self, players: Iterable[Dict[str, Any]]):
+        postings: Dict[str, Dict[int, int]] = {}
+        name_vocab: Set[str] = set()
+        place_vocab: Set[str] = set()
+        surnames: Set[str] = set()
+        lengths: List[int] = []
+        for row, meta in enumerate(players):
+            tokens = _document_tokens(meta)
+            for field in NAME_FIELDS:
+                name_vocab.update(t for t in tokenize(meta.get(field) or "") if len(t) > 1)
+            shown = tokenize(meta.get("short_name") or "")
+            if shown:
+                surnames.add(shown[-1])  # "E. Haaland" -> "haaland", "Marta" -> "marta"
+            for field in PLACE_FIELDS:
+                place_vocab.update(tokenize(meta.get(field) or ""))
+            lengths.append(len(tokens))
+            for token in tokens:
+                docs = postings.setdefault(token, {})
+                docs[row] = docs.get(row, 0) + 1
+        self.size = len(lengths)
+        self.name_vocab = frozenset(name_vocab)
+        self.place_vocab = frozenset(place_vocab)
+        self.surnames = frozenset(surnames)
+        doc_len = np.asarray(lengths, dtype=np.float32)
+        avgdl = float(doc_len.mean()) if self.size else 1.0
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for token, docs in postings.items():
+            rows = np.fromiter(docs.keys(), dtype=np.int64, count=len(docs))
+            tf = np.fromiter(docs.values(), dtype=np.float32, count=len(docs))
+            idf = np.log(1.0 + (self.size - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * doc_len[rows] / avgdl)
+            self._postings[token] = (rows, (idf * tf * (BM25_K1 + 1.0) / (tf + norm)).astype(np.float32))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Top-k (row, score) pairs for a query; only rows matching at least one term."""
+        scores = np.zeros(self.size, dtype=np.float32)
+        matched = False
+        for token in query_tokens(query):
+            posting = self._postings.get(token)
+            if posting is not None:
+                np.add.at(scores, posting[0], posting[1])
+                matched = True
+        if not matched or k <= 0:
+            return []
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(int(row), float(scores[row])) for row in hits]
+
+    def is_entity_lookup(self, query: str) -> bool:
+        """True when the query is made of club/nation words, position words and capitalised
+        player-name words, with at least one club, nation or name (e.g. "Real Madrid
+        midfielders"). Descriptive words ("young", "fast") make it a semantic query."""
+        words = [w for w in CASED_TOKEN_RE.findall(_ascii(query)) if w.lower() not in STOPWORDS]
+        entities = [w for w in words if w.lower() not in POSITION_SYNONYMS]
+        if not entities:
+            return False
+        return all(
+            w.lower() in self.place_vocab or (not w[0].islower() and w.lower() in self.name_vocab) for w in entities
+        )
+
+    def is_name_lookup(self, query: str) -> bool:
+        """True when the query names players: a surname ("Haaland") or several name words ("Mapi
+        León"), each capitalised and none a club or nation word. Such lookups are answered exactly
+        however few rows match; lowercase words that happen to be names ("young", "hope"), name
+        words that are nobody's surname ("Young") and nations ("Brazil") are not name lookups."""
+        words = [w for w in CASED_TOKEN_RE.findall(_ascii(query)) if w.lower() not in STOPWORDS]
+        if not words or (len(words) == 1 and words[0].lower() not in self.surnames):
+            return False
+        return all(
+            not w[0].islower() and w.lower() in self.name_vocab and w.lower() not in self.place_vocab for w in words
+        )
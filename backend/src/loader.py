@@ -0,0 +1,187 @@
+"""
+Once-only loading of the FAISS index shared by the API startup warm-up, the endpoints and
+the agent tools.
+
+DataLoader.get() loads the saved index, or builds it from the CSV when there is none (or
+it cannot be opened), exactly once per process. Callers that arrive while a load is
+running wait for it and receive the same result, or the same exception. A failed load is
+retried by the next caller. A rebuilt index is written to a temporary folder and moved
+into place, so other processes never open a half-written index.
+
+DataLoader.reload() loads a fresh copy while get() keeps returning the current one, then
+swaps it in (the API's hot reload).
+"""
+
+import logging
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from src import ingestion, metrics, retrieval
+from src.embeddings import EMBEDDING_BACKEND
+
+logger = logging.getLogger("squad_api")
+
+# Saved index per embedding backend (the OpenAI index keeps its original folder name)
+DEFAULT_INDEX_PATH = os.path.join(
+    ingestion.PROJECT_ROOT,
+    "data/faiss_index" if EMBEDDING_BACKEND == "openai" else f"data/faiss_index_{EMBEDDING_BACKEND}",
+)
+
+RETRIEVER_K = 50
+
+
+class LoadedData(NamedTuple):
+    vector_store: Any
+    retriever: Any
+    source: str  # "disk" or "built"
+
+
+class DataLoader:
+    """Lock-protected, once-only loader of the FAISS index.
+
+    `on_loaded(data)` runs inside the load, before any caller sees the result, so state
+    derived from the index (e.g. the API's player table) is complete once get() returns.
+    """
+
+    def __init__(
+        self,
+        index_path: str = DEFAULT_INDEX_PATH,
+        backend: str = EMBEDDING_BACKEND,
+        load_documents: Callable[[], List[Any]] = ingestion.load_and_clean_data,
+        on_loaded: Optional[Callable[[LoadedData], None]] = None,
+    ):
+        self.index_path = index_path
+        self.backend = backend
+        self.load_documents = load_documents
+        self.on_loaded = on_loaded
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._future: Optional[Future] = None
+        self._data: Optional[LoadedData] = None
+        self._status: Dict[str, Any] = {
+            "state": "idle", "source": None, "seconds": None, "error": None, "attempts": 0,
+            "reloading": False, "reloads": 0, "reload_error": None,
+        }
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def get(self) -> LoadedData:
+        """The loaded index, loading it first if no other caller has (or is doing so)."""
+        return self._get()[0]
+
+    def _get(self, rebuild: bool = False) -> Tuple[LoadedData, bool]:
+        """get(), plus whether this call did the first load (with `rebuild`, from the CSV)."""
+        data = self._data
+        if data is not None:
+            return data, False
+        with self._lock:
+            future = self._future
+            owner = future is None or (future.done() and future.exception() is not None)
+            if owner:
+                future = self._future = Future()
+                self._status.update(state="loading", error=None)
+                self._status["attempts"] += 1
+        if owner:
+            self._run(future, rebuild)
+        return future.result(), owner
+
+    def reload(self, rebuild: bool = False) -> LoadedData:
+        """Load a fresh copy (the saved index again, or with `rebuild` the CSV re-parsed, re-embedded
+        and saved) and publish it via on_loaded. get() returns the previous copy until then; one
+        reload runs at a time."""
+        with self._reload_lock:
+            was_loaded = self.loaded
+            # Nothing loaded yet: the first load is the reload (a rebuild builds instead of reading the index)
+            data, loaded_here = self._get(rebuild)
+            if loaded_here or (not was_loaded and not rebuild):
+                return data
+            self._status.update(reloading=True, reload_error=None)
+            start = time.perf_counter()
+            try:
+                data = self._build() if rebuild else self._load()
+                if self.on_loaded is not None:
+                    self.on_loaded(data)
+            except BaseException as e:
+                self._status.update(reloading=False, reload_error=str(e))
+                raise
+            self._data = data
+            self._status.update(
+                state="ready", source=data.source, seconds=round(time.perf_counter() - start, 3), reloading=False
+            )
+            self._status["reloads"] += 1
+            return data
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self._status)
+
+    def _run(self, future: Future, rebuild: bool = False) -> None:
+        start = time.perf_counter()
+        try:
+            data = self._build() if rebuild else self._load()
+            if self.on_loaded is not None:
+                self.on_loaded(data)
+        except BaseException as e:
+            self._status.update(state="failed", error=str(e), seconds=round(time.perf_counter() - start, 3))
+            future.set_exception(e)
+            return
+        self._data = data
+        self._status.update(state="ready", source=data.source, seconds=round(time.perf_counter() - start, 3))
+        future.set_result(data)
+
+    def _load(self) -> LoadedData:
+        # Try loading from disk first (avoids CSV parsing and embedding)
+        if os.path.isdir(self.index_path):
+            try:
+                logger.info("Loading FAISS index from %s...", self.index_path)
+                with metrics.stage("index_load"):
+                    vector_store = retrieval.load_vector_store(self.index_path, backend=self.backend)
+                logger.info("Vector store loaded from disk.")
+                return LoadedData(vector_store, retrieval.get_retriever(vector_store, k=RETRIEVER_K), "disk")
+            except Exception as e:
+                logger.warning("Failed to load FAISS index: %s. Rebuilding...", e)
+        # Only load documents if we need to rebuild FAISS (should be rare)
+        return self._build()
+
+    def _build(self) -> LoadedData:
+        logger.info("Loading and cleaning player data from CSV...")
+        documents = self.load_documents()
+        logger.info("Loaded %d player documents", len(documents))
+        logger.info("Building FAISS vector store (first run or rebuild)...")
+        with metrics.stage("index_build"):
+            vector_store = retrieval.create_vector_store(documents, backend=self.backend)
+        with metrics.stage("index_save"):
+            self._save(vector_store)
+        logger.info("Vector store built and saved to %s", self.index_path)
+        return LoadedData(vector_store, retrieval.get_retriever(vector_store, k=RETRIEVER_K), "built")
+
+    def _save(self, vector_store: Any) -> None:
+        tmp_path = f"{self.index_path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        retrieval.save_vector_store(vector_store, tmp_path, backend=self.backend)
+        # Swap by two back-to-back renames and delete the old index afterwards, so other processes
+        # find a complete index at index_path except for the instant between the renames
+        old_path = f"{self.index_path}.old-{os.getpid()}"
+        shutil.rmtree(old_path, ignore_errors=True)
+        if os.path.isdir(self.index_path):
+            os.replace(self.index_path, old_path)
+        os.replace(tmp_path, self.index_path)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
+_shared: Optional[DataLoader] = None
+_shared_lock = threading.Lock()
+
+
+def shared_loader() -> DataLoader:
+    """The process-wide loader for DEFAULT_INDEX_PATH, used by the API and the agent tools."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = DataLoader()
+        return _shared
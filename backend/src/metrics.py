@@ -0,0 +1,203 @@
+"""
+In-process metrics for the World Cup Squad Builder, exposed in the Prometheus text format
+by GET /metrics.
+
+Pipeline stages are timed with `with metrics.stage("retrieval"):` into one histogram
+labelled by stage; LLM calls record their latency and prompt/completion tokens per call
+site (see clients.CALL_SITES); caches record hits and misses. While a request_timings()
+block is active on the request's context, stage durations are also summed per request
+(the API's optional Server-Timing header). Work handed to other threads (speculative
+generations, batch workers) is still counted in the histograms but not in the headers.
+Stages and LLM calls are also traced as spans (see src.tracing).
+"""
+
+import asyncio
+import contextvars
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src import tracing
+
+# Histogram bucket upper bounds in seconds: sub-millisecond array work up to minute-long LLM calls
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Every metric recorded here: name -> (Prometheus type, help text)
+METRICS: Dict[str, Tuple[str, str]] = {
+    "squad_stage_seconds": ("histogram", "Time spent in each pipeline stage."),
+    "squad_http_request_seconds": ("histogram", "Request latency per endpoint, method and status."),
+    "squad_llm_call_seconds": ("histogram", "LLM call latency per call site."),
+    "squad_llm_calls_total": ("counter", "LLM calls per call site and outcome."),
+    "squad_llm_tokens_total": ("counter", "LLM tokens per call site and kind (prompt or completion)."),
+    "squad_cache_requests_total": ("counter", "Cache lookups per cache and result (hit or miss)."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Labels], float] = {}
+_histograms: Dict[Tuple[str, Labels], List[float]] = {}  # bucket counts, then sum, then count
+
+_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("squad_timings", default=None)
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels: Any) -> None:
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def observe(name: str, value: float, **labels: Any) -> None:
+    key = (name, _labels(labels))
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = [0.0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                hist[i] += 1
+                break
+        hist[-2] += value
+        hist[-1] += 1
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[None]:
+    """Time the block as pipeline stage `name` (also added to the current request's timings) and
+    trace it as a span with `attributes`."""
+    start = time.perf_counter()
+    try:
+        with tracing.span(name, **attributes):
+            yield
+    finally:
+        seconds = time.perf_counter() - start
+        observe("squad_stage_seconds", seconds, stage=name)
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def request_timings() -> Iterator[Dict[str, float]]:
+    """Collect stage durations (seconds, summed per stage) for the request running in this context."""
+    timings: Dict[str, float] = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def token_usage(response: Any) -> Tuple[int, int]:
+    """(prompt, completion) tokens reported with an LLM response; (0, 0) when it reports none."""
+    usage = getattr(response, "usage_metadata", None)
+    if usage:
+        return int(usage.get("input_tokens") or 0), int(usage.get("output_tokens") or 0)
+    usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    return int(usage.get("prompt_tokens") or 0), int(usage.get("completion_tokens") or 0)
+
+
+def record_llm_call(site: str, seconds: float, response: Any = None, error: bool = False) -> Tuple[int, int]:
+    """Count one LLM call for a call site: latency, outcome and the (prompt, completion) tokens it
+    reported, which are returned."""
+    observe("squad_llm_call_seconds", seconds, site=site)
+    inc("squad_llm_calls_total", site=site, outcome="error" if error else "ok")
+    if response is None:
+        return 0, 0
+    prompt_tokens, completion_tokens = token_usage(response)
+    inc("squad_llm_tokens_total", prompt_tokens, site=site, kind="prompt")
+    inc("squad_llm_tokens_total", completion_tokens, site=site, kind="completion")
+    return prompt_tokens, completion_tokens
+
+
+@contextmanager
+def llm_call(site: str, **attributes: Any) -> Iterator[Dict[str, Any]]:
+    """Time and trace an LLM call; put the response in the yielded dict under "response" for its
+    token counts. A cancelled call (a losing speculative generation) is traced but not counted."""
+    call: Dict[str, Any] = {}
+    start = time.perf_counter()
+    with tracing.span(f"llm.{site}", kind="client", site=site, **attributes) as span:
+        try:
+            yield call
+        except asyncio.CancelledError:
+            if span is not None:
+                span.set_attributes(cancelled=True)
+            raise
+        except BaseException:
+            record_llm_call(site, time.perf_counter() - start, error=True)
+            raise
+        prompt_tokens, completion_tokens = record_llm_call(site, time.perf_counter() - start, call.get("response"))
+        if span is not None:
+            span.set_attributes(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    inc("squad_cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+
+def cache_hit_ratios() -> Dict[str, Dict[str, Any]]:
+    """Hits, misses and hit ratio per cache."""
+    caches: Dict[str, Dict[str, Any]] = {}
+    with _lock:
+        for (name, labels), value in _counters.items():
+            if name == "squad_cache_requests_total":
+                label = dict(labels)
+                entry = caches.setdefault(label["cache"], {"hit": 0, "miss": 0})
+                entry[label["result"]] += int(value)
+    for entry in caches.values():
+        total = entry["hit"] + entry["miss"]
+        entry["ratio"] = round(entry["hit"] / total, 4) if total else 0.0
+    return caches
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in pairs
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def render(samples: Iterable[Tuple[str, str, str, Dict[str, Any], float]] = ()) -> str:
+    """Every metric in the Prometheus text exposition format, plus samples read from elsewhere at
+    scrape time, given as (name, type, help, labels, value) with type "gauge" or "counter"."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(hist) for key, hist in _histograms.items()}
+    lines: List[str] = []
+    for name, (kind, help_text) in METRICS.items():
+        series = sorted((labels, v) for (n, labels), v in (histograms if kind == "histogram" else counters).items() if n == name)
+        if not series:
+            continue
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+        for labels, value in series:
+            if kind == "counter":
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            cumulative = 0.0
+            for bound, count in zip(BUCKETS + (math.inf,), value[:-2] + [value[-1] - sum(value[:-2])]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', _format_value(bound)),))} {_format_value(cumulative)}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value[-2])}")
+            lines.append(f"{name}_count{_format_labels(labels)} {_format_value(value[-1])}")
+    by_name: Dict[str, List[Tuple[str, str, Dict[str, Any], float]]] = {}
+    for name, kind, help_text, labels, value in samples:
+        by_name.setdefault(name, []).append((kind, help_text, labels, value))
+    for name, series in by_name.items():
+        lines += [f"# HELP {name} {series[0][1]}", f"# TYPE {name} {series[0][0]}"]
+        lines += [f"{name}{_format_labels(_labels(labels))} {_format_value(value)}" for _, _, labels, value in series]
+    return "\n".join(lines) + "\n"
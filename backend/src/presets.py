@@ -0,0 +1,84 @@
+"""
+Preset squads: every UI tactic combination with the default prompt, built ahead of time.
+
+The presets are VALID_FORMATIONS x VALID_BUILD_UP x VALID_DEFENSIVE x BUDGET_TIERS, optionally
+repeated per nation. backend/precompute_presets.py builds them into a versioned JSON artifact.
+The API loads the artifact at startup and serves matching requests from it, but only while
+its data version matches the loaded player table.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from src.tactics import VALID_BUILD_UP, VALID_DEFENSIVE, VALID_FORMATIONS
+
+# Bump when the artifact layout changes; older artifacts are ignored
+FORMAT_VERSION = 1
+
+# Prompt the frontend sends when the prompt box is empty
+DEFAULT_PROMPT = "Build me a balanced World Cup squad"
+
+# Budget tiers in € millions; 0 = budget disabled (slider values the UI can land on)
+BUDGET_TIERS = (0, 100, 200, 300, 500)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+DEFAULT_ARTIFACT_PATH = os.path.join(PROJECT_ROOT, "data/presets/preset_squads.json")
+
+
+def preset_jobs(nations: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Job settings (BatchJob fields) for every preset, once overall or once per nation."""
+    jobs = []
+    for nation in nations or [""]:
+        for formation in VALID_FORMATIONS:
+            for build_up in VALID_BUILD_UP:
+                for defensive in VALID_DEFENSIVE:
+                    for budget in BUDGET_TIERS:
+                        jobs.append({
+                            "nation": nation,
+                            "prompt": DEFAULT_PROMPT,
+                            "formation": formation,
+                            "buildUpStyle": build_up,
+                            "defensiveApproach": defensive,
+                            "budget": budget,
+                            "budgetEnabled": budget > 0,
+                        })
+    return jobs
+
+
+def save_artifact(
+    path: str,
+    data_version: str,
+    embedding_backend: str,
+    nations: List[str],
+    squads: Dict[str, Dict[str, Any]],
+) -> None:
+    """Write the artifact atomically. `squads` maps pipeline cache key -> {"result", "shortlist", "tactic"}."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    artifact = {
+        "format_version": FORMAT_VERSION,
+        "data_version": data_version,
+        "embedding_backend": embedding_backend,
+        "nations": nations,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "squads": squads,
+    }
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(artifact, f)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path: str) -> Optional[Dict[str, Any]]:
+    """The artifact at `path`, or None if it is missing, unreadable or an older format."""
+    if not os.path.isfile(path):
+        return None
+    try:
+        with open(path) as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if artifact.get("format_version") != FORMAT_VERSION:
+        return None
+    return artifact
@@ -0,0 +1,129 @@
+"""
+On-demand sampling profiler for individual API requests.
+
+While a Profiler.record() block runs, a background thread samples the calling thread's
+Python stack every `interval` seconds. Sampling is wall-clock, so time blocked on LLM and
+embedding HTTP calls (or waiting for speculative generations on the client loop) shows
+up as the frames that were waiting. It works the same for sync handlers (a threadpool
+thread) and async handlers (the event loop thread, where other coroutines running in
+between are sampled too).
+
+Each profile is written in the collapsed-stack format ("outer;inner;leaf count" per line)
+read by flamegraph.pl, inferno, speedscope and similar tools. At most `max_files`
+profiles are kept (oldest removed first) and a profile over `max_bytes` keeps only its
+heaviest stacks.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("squad_api")
+
+PROFILE_SUFFIX = ".collapsed"
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+class Profiler:
+    """Writes one collapsed-stack profile per record() block into `directory`; at most
+    `max_concurrent` requests are profiled at once (others run unprofiled)."""
+
+    def __init__(self, directory: str, interval: float = 0.005, max_files: int = 50,
+                 max_bytes: int = 2_000_000, max_concurrent: int = 2):
+        self.directory = directory
+        self.interval = interval
+        self.max_files = max(1, max_files)
+        self.max_bytes = max_bytes
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrent))
+        self._files_lock = threading.Lock()
+
+    @contextmanager
+    def record(self, label: str) -> Iterator[Optional[str]]:
+        """Profile the block; yields the profile's file name, or None if too many profiles are running."""
+        if not self._slots.acquire(blocking=False):
+            logger.info("Profiler busy; not profiling %s", label)
+            yield None
+            return
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{label}-{uuid.uuid4().hex[:6]}{PROFILE_SUFFIX}"
+        sampler = _Sampler(threading.get_ident(), self.interval)
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            yield name
+        finally:
+            stacks = sampler.stop()
+            self._slots.release()
+            try:
+                self._write(name, stacks)
+                logger.info("Profiled %s in %.2fs (%d samples): %s", label, time.perf_counter() - start,
+                            sum(stacks.values()), name)
+            except OSError as e:
+                logger.warning("Could not write profile %s: %s", name, e)
+
+    def profiles(self) -> List[Dict[str, Any]]:
+        """Stored profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(PROFILE_SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append({"name": name, "bytes": stat.st_size, "modified": stat.st_mtime})
+        return sorted(entries, key=lambda e: e["modified"], reverse=True)
+
+    def path(self, name: str) -> str:
+        """Path of a stored profile; FileNotFoundError for anything that is not one."""
+        if os.path.basename(name) != name or not name.endswith(PROFILE_SUFFIX):
+            raise FileNotFoundError(name)
+        path = os.path.join(self.directory, name)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(name)
+        return path
+
+    def _write(self, name: str, stacks: Counter) -> None:
+        lines, size = [], 0
+        for stack, count in stacks.most_common():
+            line = f"{stack} {count}\n"
+            size += len(line.encode())
+            if size > self.max_bytes:
+                logger.info("Profile %s truncated to its heaviest %d stacks", name, len(lines))
+                break
+            lines.append(line)
+        with self._files_lock:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = os.path.join(self.directory, f".{name}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(lines)
+            os.replace(tmp_path, os.path.join(self.directory, name))
+            for entry in self.profiles()[self.max_files:]:
+                os.remove(os.path.join(self.directory, entry["name"]))
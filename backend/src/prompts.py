@@ -28,13 +28,14 @@ CRITICAL RULES:
   Do NOT put a right back (RB) at left back (LB) or vice versa.
   Do NOT put a right winger (RW) at left wing (LW) or vice versa.
   Every player must play in their natural position — no side-swapping.
-- If a budget constraint is specified in user preferences, the total value_eur of all 23 selected players must NOT exceed that budget. Build the strongest squad possible within the budget.
+- If a budget constraint is specified in user preferences, the total val_m (market value in € millions) of all 23 selected players must NOT exceed that budget. Build the strongest squad possible within the budget.
 - If NO budget is specified, ignore cost entirely and pick the best players.
 
 USER PREFERENCES:
 {user_preferences}
 
-CANDIDATE PLAYERS (each line: name | position | overall | wage/value | stats | age | nationality | club):
+CANDIDATE PLAYERS (one per line; the first line is a header naming the "|"-separated columns:
+id = player id, name, position bucket, overall, val_m = market value in € millions, pac/sho/pas/dri/def/phy = pace/shooting/passing/dribbling/defending/physic, age, nationality, club):
 {candidates}
 
 TASK:
@@ -46,11 +47,11 @@ TASK:
 
 OUTPUT FORMAT (use this exact structure so it can be parsed):
 ---SELECTED---
-[For each player: short_name | primary_position | overall | wage_eur | justification text]
+[For each player: id | short_name | primary_position | overall | justification text]
 ---EXCLUDED---
 [short_name | reason]
----TOTAL_WAGE---
-[sum of selected wage_eur]
+---TOTAL_VALUE---
+[sum of selected val_m]
 ---FORMATION_NOTES---
 [2-3 sentences on positional balance, tradeoffs, and budget rationale if applicable]
 """,
@@ -2,17 +2,259 @@
 Stage 3: Reasoning, constraint solving, and squad construction for the World Cup Squad Builder.
 """
 
+import asyncio
 import json
 import logging
+import math
+import random
 import re
-from typing import List, Dict, Any
+import threading
+from functools import lru_cache
+from typing import Callable, List, Dict, Any, Optional, Tuple
 
-from langchain_openai import ChatOpenAI
+import numpy as np
 
+from src import clients, metrics, tracing
+from src.ingestion import player_key
 from src.prompts import REASONING_PROMPT
 
 logger = logging.getLogger("squad_api")
 
+# Tokenizer: any callable returning the token count of a string
+Tokenizer = Callable[[str], int]
+
+# Target size (in tokens) of the candidate block sent to the reasoning prompt
+DEFAULT_CANDIDATE_TOKEN_BUDGET = 2000
+
+# Each position bucket keeps at least ceil(min_count * factor) candidates when pruning
+CANDIDATE_DEPTH_FACTOR = 1.5
+
+# Temperatures used by speculative generation variant i (cycled when K is larger)
+SPECULATIVE_TEMPERATURES = (0.2, 0.5, 0.8, 0.35, 0.65)
+
+# How often speculative generation paid off (winner was not the baseline variant 0)
+_speculation_lock = threading.Lock()
+_speculation_stats: Dict[str, Any] = {
+    "requests": 0,
+    "generations_started": 0,
+    "generations_cancelled": 0,
+    "generations_failed": 0,
+    "paid_off": 0,
+    "no_valid_generation": 0,
+    "wins_by_variant": {},
+}
+
+# Compact candidate encoding: short column code -> player metadata key
+CANDIDATE_COLUMNS: Dict[str, str] = {
+    "id": "player_id",
+    "name": "short_name",
+    "pos": "primary_position",
+    "ovr": "overall",
+    "val_m": "value_eur",
+    "pac": "pace",
+    "sho": "shooting",
+    "pas": "passing",
+    "dri": "dribbling",
+    "def": "defending",
+    "phy": "physic",
+    "age": "age",
+    "nat": "nationality_name",
+    "club": "club_name",
+}
+
+STAT_CODES = ("pac", "sho", "pas", "dri", "def", "phy")
+
+# Face stats that matter for each tactic option (union of build-up + defensive is kept)
+BUILD_UP_STAT_CODES: Dict[str, Tuple[str, ...]] = {
+    "Balanced": ("pac", "sho", "pas", "dri"),
+    "Counter-Attack": ("pac", "sho", "dri"),
+    "Short Passing": ("sho", "pas", "dri"),
+}
+DEFENSIVE_STAT_CODES: Dict[str, Tuple[str, ...]] = {
+    "Balanced": ("def", "phy"),
+    "Deep Block": ("def", "phy"),
+    "High Press": ("pac", "def", "phy"),
+    "Aggressive": ("pac", "def", "phy"),
+}
+
+
+def approx_token_count(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used when tiktoken is unavailable."""
+    return (len(text) + 3) // 4
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer(model: str = "gpt-4o-mini") -> Tokenizer:
+    """Return a token counter for `model`; falls back to approx_token_count if tiktoken can't load."""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model(model)
+    except Exception as e:
+        logger.debug("tiktoken unavailable for %s (%s); using approximate token counts", model, e)
+        return approx_token_count
+    return lambda text: len(encoding.encode(text))
+
+
+def _candidate_columns(tactics: Optional[Dict[str, Any]] = None) -> List[str]:
+    """Column codes for the compact table; stats irrelevant to the chosen tactics are dropped."""
+    tactics = tactics or {}
+    build_up = tactics.get("build_up_style")
+    defensive = tactics.get("defensive_approach")
+    if build_up in BUILD_UP_STAT_CODES and defensive in DEFENSIVE_STAT_CODES:
+        wanted = set(BUILD_UP_STAT_CODES[build_up]) | set(DEFENSIVE_STAT_CODES[defensive])
+        stats = [c for c in STAT_CODES if c in wanted]
+    else:
+        stats = list(STAT_CODES)
+    return ["id", "name", "pos", "ovr", "val_m"] + stats + ["age", "nat", "club"]
+
+
+def _format_cell(code: str, value: Any) -> str:
+    if value is None or value == "" or (isinstance(value, float) and math.isnan(value)):
+        return "?"
+    if code == "val_m":
+        try:
+            return f"{float(value) / 1_000_000:.1f}"
+        except (TypeError, ValueError):
+            return "?"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).replace("|", "/")
+
+
+def _compact_candidate_row(p: Dict[str, Any], columns: List[str]) -> str:
+    return "|".join(
+        str(player_key(p)) if c == "id" else _format_cell(c, p.get(CANDIDATE_COLUMNS[c])) for c in columns
+    )
+
+
+def _bucket_floors(constraints: Dict[str, Any]) -> Dict[str, int]:
+    """Minimum number of candidates each position bucket must keep after pruning."""
+    mins = {
+        "GK": max(constraints.get("min_gk", 3), constraints.get("max_gk", 3)),
+        "DEF": constraints.get("min_def", 8),
+        "MID": constraints.get("min_mid", 7),
+        "FWD": constraints.get("min_fwd", 5),
+    }
+    return {pos: math.ceil(n * CANDIDATE_DEPTH_FACTOR) for pos, n in mins.items()}
+
+
+def compact_candidates(
+    shortlist: List[Dict[str, Any]],
+    constraints: Dict[str, Any],
+    tactics: Optional[Dict[str, Any]] = None,
+    token_budget: Optional[int] = DEFAULT_CANDIDATE_TOKEN_BUDGET,
+    tokenizer: Optional[Tokenizer] = None,
+    report_savings: bool = False,
+) -> Tuple[str, List[Dict[str, Any]], Dict[str, Any]]:
+    """Encode the shortlist as a compact table (header row + short codes) within a token budget.
+
+    Candidates are dropped lowest-overall-first, but every position bucket keeps enough depth
+    to satisfy the min_* constraints (see CANDIDATE_DEPTH_FACTOR) and the table never holds
+    fewer than max_players rows. Returns (text, kept players, report). report_savings=True adds
+    the verbose table's token count and the tokens saved; that renders and tokenizes the whole
+    verbose table, so it is left off the request path.
+    """
+    count_tokens = tokenizer or get_tokenizer()
+    columns = _candidate_columns(tactics)
+    header = "|".join(columns)
+    rows = [_compact_candidate_row(p, columns) for p in shortlist]
+    row_tokens = [count_tokens(r + "\n") for r in rows]
+    header_tokens = count_tokens(header + "\n")
+
+    keep = set(range(len(shortlist)))
+    total = header_tokens + sum(row_tokens)
+    if token_budget is not None and total > token_budget:
+        floors = _bucket_floors(constraints)
+        bucket_sizes: Dict[str, int] = {}
+        for p in shortlist:
+            pos = str(p.get("primary_position") or "").upper()
+            bucket_sizes[pos] = bucket_sizes.get(pos, 0) + 1
+        min_rows = constraints.get("max_players", 23)
+        by_overall = sorted(range(len(shortlist)), key=lambda i: _parse_num(shortlist[i].get("overall")))
+        for i in by_overall:
+            if total <= token_budget or len(keep) <= min_rows:
+                break
+            pos = str(shortlist[i].get("primary_position") or "").upper()
+            if bucket_sizes.get(pos, 0) <= floors.get(pos, 0):
+                continue
+            keep.discard(i)
+            bucket_sizes[pos] -= 1
+            total -= row_tokens[i]
+
+    kept = [p for i, p in enumerate(shortlist) if i in keep]
+    dropped = [p for i, p in enumerate(shortlist) if i not in keep]
+    text = "\n".join([header] + [rows[i] for i in sorted(keep)])
+    report = {
+        "columns": columns,
+        "candidates_in": len(shortlist),
+        "candidates_kept": len(kept),
+        "compact_tokens": total,
+        "token_budget": token_budget,
+        "best_dropped_overall": max((_parse_int(p.get("overall")) for p in dropped), default=None),
+    }
+    if report_savings:
+        report["verbose_tokens"] = count_tokens(_shortlist_to_candidates_text(shortlist))
+        report["tokens_saved"] = report["verbose_tokens"] - total
+    return text, kept, report
+
+
+def _bucket_caps(constraints: Dict[str, Any]) -> Dict[str, int]:
+    """Most players a valid squad can take from each position bucket."""
+    max_players = constraints.get("max_players", 23)
+    mins = {
+        "GK": constraints.get("min_gk", 3),
+        "DEF": constraints.get("min_def", 8),
+        "MID": constraints.get("min_mid", 7),
+        "FWD": constraints.get("min_fwd", 5),
+    }
+    caps = {pos: max(n, max_players - (sum(mins.values()) - n)) for pos, n in mins.items()}
+    caps["GK"] = max(mins["GK"], min(caps["GK"], constraints.get("max_gk", 3)))
+    return caps
+
+
+def prune_dominated(
+    shortlist: List[Dict[str, Any]],
+    constraints: Dict[str, Any],
+    tactics: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Drop candidates that no rational selector would pick, preserving shortlist order.
+
+    Players are compared within their natural position (first entry of player_positions, or the
+    bucket when missing) on overall, the tactic-relevant face stats and value_eur (lower is
+    better). A player is dropped only when at least as many rivals dominate them as the squad
+    could ever take from that bucket, so every bucket keeps at least that many candidates.
+    """
+    if not shortlist:
+        return []
+    stat_keys = ["overall"] + [CANDIDATE_COLUMNS[c] for c in _candidate_columns(tactics) if c in STAT_CODES]
+    caps = _bucket_caps(constraints)
+
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i, p in enumerate(shortlist):
+        bucket = str(p.get("primary_position") or "").upper()
+        natural = str(p.get("player_positions") or "").split(",")[0].strip().upper() or bucket
+        groups.setdefault((bucket, natural), []).append(i)
+
+    drop = set()
+    for (bucket, _), idx in groups.items():
+        cap = caps.get(bucket)
+        if cap is None or len(idx) <= cap:
+            continue
+        members = [shortlist[i] for i in idx]
+        stats = np.array([[_parse_num(p.get(k)) for k in stat_keys] for p in members], dtype=float)
+        cost = np.array([_parse_num(p.get("value_eur"), math.inf) for p in members], dtype=float)
+        # Higher is better on every column; missing value counts as the most expensive
+        x = np.column_stack([stats, -np.nan_to_num(cost, nan=math.inf)])
+        at_least = (x[:, None, :] >= x[None, :, :]).all(axis=2)
+        better = (x[:, None, :] > x[None, :, :]).any(axis=2)
+        dominators = (at_least & better).sum(axis=0)
+        drop.update(i for i, n in zip(idx, dominators) if n >= cap)
+
+    if drop:
+        logger.info("Pareto pruning removed %d/%d dominated candidates", len(drop), len(shortlist))
+    return [p for i, p in enumerate(shortlist) if i not in drop]
+
 
 def _shortlist_to_candidates_text(shortlist: List[Dict[str, Any]]) -> str:
     """Format shortlist for the reasoning prompt."""
@@ -39,12 +281,14 @@ def _shortlist_to_candidates_text(shortlist: List[Dict[str, Any]]) -> str:
 
 
 def _parse_num(s: str, default: float = 0.0) -> float:
-    """Parse a number from a string that may be '123.45' or 'wage_eur=23000.0'. Returns default on failure."""
-    if not s:
+    """Parse a number from a string that may be '123.45' or 'wage_eur=23000.0'. Returns default on failure
+    or for a missing value (None, NaN, empty); 0 is a value."""
+    if s is None:
         return default
     s = str(s).strip()
     try:
-        return float(s)
+        value = float(s)
+        return default if math.isnan(value) else value
     except ValueError:
         pass
     # Extract first number (integer or decimal) from string
@@ -89,13 +333,20 @@ def parse_llm_squad_output(llm_response: str) -> Dict[str, Any]:
         if not line or line.startswith("["):
             continue
         parts = [p.strip() for p in line.split("|")]
-        if len(parts) >= 5:
+        player_id = None
+        if len(parts) > 1 and parts[0].isdigit():
+            player_id = int(parts[0])
+            parts = parts[1:]
+        if len(parts) >= 4:
+            # Older answers carry a wage_eur column before the justification; wage is not in
+            # the candidate table, so _enrich_from_shortlist replaces it with the data's
+            legacy_wage = len(parts) >= 5 and re.fullmatch(r"[\d.,]+", parts[3]) is not None
             selected.append({
                 "short_name": parts[0],
-                "primary_position": parts[1] if len(parts) > 1 else "",
-                "overall": _parse_int(parts[2], 0) if len(parts) > 2 else 0,
-                "wage_eur": _parse_num(parts[3], 0.0) if len(parts) > 3 else 0.0,
-                "justification": "|".join(parts[4:]) if len(parts) > 4 else "",
+                "primary_position": parts[1],
+                "overall": _parse_int(parts[2], 0),
+                "wage_eur": _parse_num(parts[3], 0.0) if legacy_wage else 0.0,
+                "justification": "|".join(parts[4:] if legacy_wage else parts[3:]),
             })
         elif len(parts) >= 1:
             selected.append({
@@ -105,6 +356,8 @@ def parse_llm_squad_output(llm_response: str) -> Dict[str, Any]:
                 "wage_eur": 0,
                 "justification": "|".join(parts[1:]) if len(parts) > 1 else "",
             })
+        if player_id is not None:
+            selected[-1]["player_id"] = player_id
 
     for line in excluded_text.split("\n"):
         line = line.strip()
@@ -153,13 +406,254 @@ def validate_squad(squad: Dict[str, Any], constraints: Dict[str, Any]) -> bool:
     return True
 
 
+def _bucket_of(p: Dict[str, Any]) -> str:
+    return str(p.get("primary_position") or "").upper()
+
+
+def repair_squad(
+    squad: Dict[str, Any],
+    shortlist: List[Dict[str, Any]],
+    constraints: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Make the fewest local changes that bring a parsed squad within the hard constraints.
+
+    Duplicates are dropped, surplus goalkeepers and players beyond max_players are removed
+    lowest-overall first, position deficits are filled with the best unselected shortlist
+    players, and an over-budget squad swaps (or, failing that, drops surplus) its most
+    expensive players. Players added by a repair get a placeholder justification and
+    needs_justification=True; every change is listed in squad["repairs"].
+    """
+    max_players = constraints.get("max_players", 23)
+    mins = {
+        "GK": constraints.get("min_gk", 3),
+        "DEF": constraints.get("min_def", 8),
+        "MID": constraints.get("min_mid", 7),
+        "FWD": constraints.get("min_fwd", 5),
+    }
+    max_gk = constraints.get("max_gk", 3)
+    budget = constraints.get("budget")
+    by_key = {player_key(p): p for p in shortlist}
+    repairs: List[str] = []
+
+    selected: List[Dict[str, Any]] = []
+    seen = set()
+    for p in squad.get("selected") or []:
+        ident = p.get("player_id", str(p.get("short_name", "")).strip().upper())
+        if ident in seen:
+            repairs.append(f"removed duplicate {p.get('short_name')}")
+            continue
+        seen.add(ident)
+        if p.get("player_id") in by_key:
+            # Count players in their real bucket, not the one the LLM wrote
+            p["primary_position"] = by_key[p["player_id"]].get("primary_position", p.get("primary_position"))
+        selected.append(p)
+
+    def count(bucket: str) -> int:
+        return sum(1 for p in selected if _bucket_of(p) == bucket)
+
+    def remove_weakest(buckets: List[str], reason: str) -> bool:
+        pool = [p for p in selected if _bucket_of(p) in buckets]
+        if not pool:
+            return False
+        weakest = min(pool, key=lambda p: _parse_num(p.get("overall")))
+        selected.remove(weakest)
+        repairs.append(f"removed {weakest.get('short_name')} ({reason})")
+        return True
+
+    def surplus_buckets() -> List[str]:
+        return [b for b, n in mins.items() if count(b) > n] + ["", "?"]
+
+    def add(p: Dict[str, Any], reason: str) -> None:
+        added = dict(p)
+        added["player_id"] = player_key(p)
+        added["wage_eur"] = _parse_num(p.get("wage_eur"))
+        added["justification"] = f"Added to satisfy squad constraints ({reason}); overall {_parse_int(p.get('overall'))}."
+        added["needs_justification"] = True
+        selected.append(added)
+        seen.add(added["player_id"])
+        repairs.append(f"added {p.get('short_name')} ({reason})")
+
+    while count("GK") > max_gk and remove_weakest(["GK"], "above max_gk"):
+        pass
+
+    for bucket, minimum in mins.items():
+        pool = sorted(
+            (p for k, p in by_key.items() if k not in seen and _bucket_of(p) == bucket),
+            key=lambda p: _parse_num(p.get("overall")),
+            reverse=True,
+        )
+        while count(bucket) < minimum and pool:
+            if len(selected) >= max_players and not remove_weakest(surplus_buckets(), f"making room for {bucket}"):
+                break
+            add(pool.pop(0), f"{bucket} below minimum")
+
+    while len(selected) > max_players and remove_weakest(surplus_buckets(), "above max_players"):
+        pass
+
+    if budget is not None:
+        budget = float(budget)
+        for _ in range(len(shortlist) + len(selected)):
+            total = sum(_parse_num(p.get("wage_eur")) for p in selected)
+            if total <= budget:
+                break
+            best = None
+            for out in selected:
+                out_wage = _parse_num(out.get("wage_eur"))
+                for k, cand in by_key.items():
+                    if k in seen or _bucket_of(cand) != _bucket_of(out):
+                        continue
+                    saving = out_wage - _parse_num(cand.get("wage_eur"))
+                    if saving <= 0:
+                        continue
+                    loss = max(0.0, _parse_num(out.get("overall")) - _parse_num(cand.get("overall")))
+                    score = saving / (1.0 + loss)
+                    if best is None or score > best[0]:
+                        best = (score, out, cand)
+            if best is not None:
+                _, out, cand = best
+                selected.remove(out)
+                repairs.append(f"removed {out.get('short_name')} (over budget)")
+                add(cand, f"cheaper {_bucket_of(cand)} within budget")
+            else:
+                surplus = [p for p in selected if _bucket_of(p) in surplus_buckets()]
+                if not surplus:
+                    break
+                priciest = max(surplus, key=lambda p: _parse_num(p.get("wage_eur")))
+                selected.remove(priciest)
+                repairs.append(f"removed {priciest.get('short_name')} (over budget)")
+
+    repaired = dict(squad)
+    repaired["selected"] = selected
+    repaired["total_wage"] = sum(_parse_num(p.get("wage_eur")) for p in selected)
+    repaired["repairs"] = repairs
+    if repairs:
+        logger.info("Repaired squad with %d changes: %s", len(repairs), "; ".join(repairs))
+    return repaired
+
+
+def _enrich_from_shortlist(
+    squad: Dict[str, Any],
+    by_key: Dict[int, Dict[str, Any]],
+    by_name: Dict[str, Dict[str, Any]],
+) -> None:
+    """Merge full shortlist data into parsed selections by player key (name as fallback)."""
+    for s in squad["selected"]:
+        full = by_key.get(s["player_id"]) if "player_id" in s else None
+        if full is None:
+            full = by_name.get(str(s.get("short_name", "")).strip().upper())
+        if full is None:
+            s.pop("player_id", None)  # never trust an id that isn't on the shortlist
+            continue
+        s["player_id"] = player_key(full)
+        # Wage is not part of the candidate table, so trust the data over the LLM's echo
+        if full.get("wage_eur") is not None:
+            s["wage_eur"] = _parse_num(full["wage_eur"])
+        for k, v in full.items():
+            if k not in s:
+                s[k] = v
+    squad["total_wage"] = sum(_parse_num(s.get("wage_eur")) for s in squad["selected"])
+
+
+def speculation_stats() -> Dict[str, Any]:
+    """Snapshot of the speculative-generation counters (see build_squad's speculative argument)."""
+    with _speculation_lock:
+        stats = dict(_speculation_stats)
+        stats["wins_by_variant"] = dict(stats["wins_by_variant"])
+    return stats
+
+
+def _record_speculation(**deltas: int) -> None:
+    with _speculation_lock:
+        for key, delta in deltas.items():
+            _speculation_stats[key] += delta
+
+
+def _shuffled_rows(candidates_text: str, seed: int) -> str:
+    """Same candidate table with the data rows in a different (seeded) order."""
+    header, *rows = candidates_text.split("\n")
+    random.Random(seed).shuffle(rows)
+    return "\n".join([header] + rows)
+
+
+def _squad_score(squad: Dict[str, Any]) -> float:
+    overalls = [_parse_num(s.get("overall")) for s in squad.get("selected") or []]
+    return sum(overalls) / len(overalls) if overalls else 0.0
+
+
+async def _generate(llm: Any, inputs: Dict[str, Any], attempt: int) -> Any:
+    """One reasoning generation, counted and traced in src.metrics (cancelled generations are not counted)."""
+    with metrics.llm_call("reasoning", attempt=attempt, temperature=getattr(llm, "temperature", None)) as call:
+        call["response"] = await (REASONING_PROMPT | llm).ainvoke(inputs)
+    return call["response"]
+
+
+async def _speculate(
+    variants: List[Tuple[Any, Dict[str, Any]]],
+    evaluate: Callable[[str], Tuple[Dict[str, Any], bool]],
+    wait_for_all: bool,
+) -> Tuple[Dict[int, Tuple[Dict[str, Any], bool]], Optional[int], List[BaseException]]:
+    """Run every (llm, prompt inputs) variant concurrently.
+
+    Returns ({variant: (squad, valid)}, index of the first valid variant or None, errors).
+    Unless wait_for_all, the remaining generations are cancelled as soon as one is valid.
+    """
+    chain_tasks = {
+        asyncio.ensure_future(_generate(llm, inputs, i)): i
+        for i, (llm, inputs) in enumerate(variants)
+    }
+    results: Dict[int, Tuple[Dict[str, Any], bool]] = {}
+    errors: List[BaseException] = []
+    first_valid: Optional[int] = None
+    pending = set(chain_tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i = chain_tasks[task]
+                if task.exception() is not None:
+                    errors.append(task.exception())
+                    logger.warning("Speculative generation %d failed: %s", i, task.exception())
+                    continue
+                resp = task.result()
+                results[i] = evaluate(resp.content if hasattr(resp, "content") else str(resp))
+                if results[i][1] and first_valid is None:
+                    first_valid = i
+            if first_valid is not None and not wait_for_all:
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            _record_speculation(generations_cancelled=len(pending))
+    return results, first_valid, errors
+
+
 def build_squad(
     shortlist: List[Dict[str, Any]],
     constraints: Dict[str, Any],
     user_preferences: str = "",
+    tactics: Optional[Dict[str, Any]] = None,
+    token_budget: Optional[int] = DEFAULT_CANDIDATE_TOKEN_BUDGET,
+    tokenizer: Optional[Tokenizer] = None,
+    prune: bool = True,
+    speculative: int = 1,
+    pick_best: bool = False,
+    max_prompt_tokens: Optional[int] = None,
 ) -> Dict[str, Any]:
-    """Build final squad from shortlist using LLM and validate; retry up to 2 times if invalid."""
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2)
+    """Build final squad from shortlist with one LLM call; an invalid selection is fixed by repair_squad.
+
+    Dominated candidates are removed first (see prune_dominated, disable with prune=False), then
+    the rest is sent as a compact, token-budgeted table (see compact_candidates); pass
+    token_budget=None to keep every candidate. The compaction report, including the average
+    overall of the selected players, is returned under squad["candidates_report"].
+
+    With speculative=K > 1, K generations run concurrently with different temperatures and
+    candidate orderings; the first one that passes validate_squad wins and the rest are
+    cancelled, or with pick_best=True all K are awaited and the highest average overall
+    valid squad wins. max_prompt_tokens caps K so K * prompt tokens stays within the ceiling.
+    Outcomes are counted in speculation_stats().
+    """
     max_players = constraints.get("max_players", 23)
     min_gk = constraints.get("min_gk", 3)
     max_gk = constraints.get("max_gk", 3)
@@ -172,33 +666,81 @@ def build_squad(
         f"min_def={min_def}, min_mid={min_mid}, min_fwd={min_fwd}"
         + (f", budget (total value EUR)={budget}" if budget is not None else "")
     )
-    candidates_text = _shortlist_to_candidates_text(shortlist)
+    candidates = prune_dominated(shortlist, constraints, tactics) if prune else shortlist
+    candidates_text, _, report = compact_candidates(candidates, constraints, tactics, token_budget, tokenizer)
+    report["dominated_pruned"] = len(shortlist) - len(candidates)
+    by_key = {player_key(p): p for p in shortlist}
+    by_name = {str(p.get("short_name", "")).strip().upper(): p for p in shortlist}
+    logger.info(
+        "Candidate table: %d/%d players, %d tokens",
+        report["candidates_kept"], report["candidates_in"], report["compact_tokens"],
+    )
+    tracing.set_attributes(candidates=report["candidates_kept"], candidate_tokens=report["compact_tokens"])
+    inputs = {
+        "candidates": candidates_text,
+        "constraints": constraints_text,
+        "user_preferences": user_preferences or "None specified.",
+    }
+
+    def evaluate(content: str) -> Tuple[Dict[str, Any], bool]:
+        with metrics.stage("parsing"):
+            parsed = parse_llm_squad_output(content)
+            _enrich_from_shortlist(parsed, by_key, by_name)
+            valid = validate_squad(parsed, constraints)
+            tracing.set_attributes(selected=len(parsed["selected"]), valid=valid)
+            return parsed, valid
 
-    for attempt in range(2):
-        logger.info("LLM reasoning attempt %d/2", attempt + 1)
+    k = max(1, speculative)
+    if k > 1 and max_prompt_tokens is not None:
+        prompt_tokens = (tokenizer or get_tokenizer())(REASONING_PROMPT.format(**inputs))
+        k = max(1, min(k, max_prompt_tokens // max(prompt_tokens, 1)))
+        if k < speculative:
+            logger.info("Cost ceiling %d tokens allows %d of %d speculative generations", max_prompt_tokens, k, speculative)
+
+    if k == 1:
+        logger.info("LLM reasoning call")
         try:
-            chain = REASONING_PROMPT | llm
-            resp = chain.invoke({
-                "candidates": candidates_text,
-                "constraints": constraints_text,
-                "user_preferences": user_preferences or "None specified.",
-            })
-            content = resp.content if hasattr(resp, "content") else str(resp)
-            squad = parse_llm_squad_output(content)
+            llm = clients.chat_model("reasoning", SPECULATIVE_TEMPERATURES[0])
+            with metrics.llm_call("reasoning", attempt=0, temperature=SPECULATIVE_TEMPERATURES[0]) as call:
+                resp = call["response"] = (REASONING_PROMPT | llm).invoke(inputs)
+            squad, valid = evaluate(resp.content if hasattr(resp, "content") else str(resp))
         except Exception as e:
             logger.exception("LLM invoke or parse failed: %s", e)
             raise
-        # Enrich selected with full player data from shortlist by name
-        by_name = {str(p.get("short_name", "")).strip().upper(): p for p in shortlist}
-        for s in squad["selected"]:
-            key = str(s.get("short_name", "")).strip().upper()
-            if key in by_name:
-                full = by_name[key]
-                for k, v in full.items():
-                    if k not in s:
-                        s[k] = v
-        if validate_squad(squad, constraints):
-            return squad
-        if attempt < 1:
-            constraints_text += "\n[Previous selection violated constraints; try again with exactly these rules.]"
+    else:
+        logger.info("LLM reasoning: %d speculative generations (%s)", k, "best of all" if pick_best else "first valid")
+        variants = []
+        for i in range(k):
+            llm = clients.chat_model("reasoning", SPECULATIVE_TEMPERATURES[i % len(SPECULATIVE_TEMPERATURES)])
+            text = candidates_text if i == 0 else _shuffled_rows(candidates_text, seed=i)
+            variants.append((llm, {**inputs, "candidates": text}))
+        _record_speculation(requests=1, generations_started=k)
+        results, first_valid, errors = clients.run_async(_speculate(variants, evaluate, wait_for_all=pick_best))
+        _record_speculation(generations_failed=len(errors))
+        if not results:
+            logger.error("All %d speculative generations failed", k)
+            raise errors[0]
+        valid = [i for i, (_, ok) in results.items() if ok]
+        if pick_best and valid:
+            winner = max(valid, key=lambda i: _squad_score(results[i][0]))
+        elif first_valid is not None:
+            winner = first_valid
+        else:
+            winner = max(results, key=lambda i: _squad_score(results[i][0]))
+            _record_speculation(no_valid_generation=1)
+        squad, valid = results[winner]
+        with _speculation_lock:
+            wins = _speculation_stats["wins_by_variant"]
+            wins[winner] = wins.get(winner, 0) + 1
+            if winner != 0 and valid:
+                _speculation_stats["paid_off"] += 1  # a valid squad the baseline generation did not provide
+        logger.info("Speculative generation %d won (%d/%d finished)", winner, len(results), k)
+
+    if not valid:
+        logger.info("LLM selection violated constraints; repairing locally instead of re-prompting")
+        with metrics.stage("repair"):
+            squad = repair_squad(squad, shortlist, constraints)
+    overalls = [_parse_int(s.get("overall")) for s in squad["selected"]]
+    report["selected_avg_overall"] = round(sum(overalls) / len(overalls), 2) if overalls else None
+    squad["candidates_report"] = report
     return squad
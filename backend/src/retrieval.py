@@ -2,36 +2,97 @@
 Stage 2: Retrieval and semantic search over player documents for the World Cup Squad Builder.
 """
 
+import json
 import os
-from typing import List, Any
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
 
+import faiss
+import numpy as np
 from langchain_core.documents import Document
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.embeddings import Embeddings
 
+from src import metrics, tracing
+from src.embeddings import BACKEND_DIMENSIONS, EMBEDDING_BACKEND, get_embeddings
+from src.ingestion import POSITION_TO_CATEGORY, player_key
+from src.lexical import BM25Index
 
-def _get_embeddings() -> OpenAIEmbeddings:
+if TYPE_CHECKING:
+    # langchain_community's FAISS wrapper is slow to import; only index build/load needs it
+    from langchain_community.vectorstores import FAISS
+
+# Reciprocal rank fusion constant: score = sum over rankings of 1 / (RRF_K + rank)
+RRF_K = 60
+
+# Entity lookups answered lexically need at least this many hits (player-name lookups need one);
+# otherwise fuse with FAISS
+LEXICAL_FAST_PATH_MIN_HITS = 30
+
+RETRIEVAL_MODES = ("hybrid", "semantic", "lexical")
+
+# Written next to a saved index: which embedding backend and dimension built it
+INDEX_MANIFEST = "embedding_backend.json"
+
+_stats_lock = threading.Lock()
+_stats = {"queries": 0, "lexical_fast_path": 0, "fused": 0, "semantic_only": 0, "lexical_only": 0}
+
+
+def _get_embeddings(backend: str = EMBEDDING_BACKEND) -> Embeddings:
     """Shared embedding model so save/load use the same dimensions."""
-    return OpenAIEmbeddings(model="text-embedding-ada-002")
+    return get_embeddings(backend)
+
+
+def read_index_manifest(folder_path: str) -> Dict[str, Any]:
+    """Backend and dimension recorded with a saved index (indexes saved without one used OpenAI ada-002)."""
+    path = os.path.join(folder_path, INDEX_MANIFEST)
+    if not os.path.isfile(path):
+        return {"backend": "openai", "dimension": BACKEND_DIMENSIONS["openai"]}
+    with open(path) as f:
+        return json.load(f)
 
 
-def create_vector_store(documents: List[Document]) -> FAISS:
-    """Build FAISS index from player documents using OpenAI embeddings."""
-    return FAISS.from_documents(documents, _get_embeddings())
+def create_vector_store(documents: List[Document], backend: str = EMBEDDING_BACKEND) -> "FAISS":
+    """Build FAISS index from player documents with the given embedding backend; docstore ids are player keys."""
+    from langchain_community.vectorstores import FAISS
 
+    ids = [str(player_key(d.metadata)) for d in documents]
+    return FAISS.from_documents(documents, _get_embeddings(backend), ids=ids)
 
-def load_vector_store(folder_path: str) -> FAISS:
-    """Load a persisted FAISS index from disk. Uses same embedding model as create_vector_store."""
-    return FAISS.load_local(folder_path, _get_embeddings(), allow_dangerous_deserialization=True)
 
+def load_vector_store(folder_path: str, backend: str = EMBEDDING_BACKEND) -> "FAISS":
+    """Load a persisted FAISS index from disk with the backend that built it.
 
-def save_vector_store(vector_store: FAISS, folder_path: str) -> None:
-    """Persist FAISS index to disk for faster startup next time."""
+    Raises ValueError if the index was built by a different backend or has the wrong dimension.
+    """
+    from langchain_community.vectorstores import FAISS
+
+    manifest = read_index_manifest(folder_path)
+    if manifest.get("backend") != backend:
+        raise ValueError(
+            f"Index at {folder_path} was built with the {manifest.get('backend')!r} embedding backend "
+            f"({manifest.get('dimension')}-d); refusing to load it with {backend!r}"
+        )
+    vector_store = FAISS.load_local(folder_path, _get_embeddings(backend), allow_dangerous_deserialization=True)
+    if vector_store.index.d != manifest.get("dimension"):
+        raise ValueError(
+            f"Index at {folder_path} has dimension {vector_store.index.d}, "
+            f"but its manifest records {manifest.get('dimension')}"
+        )
+    return vector_store
+
+
+def save_vector_store(vector_store: "FAISS", folder_path: str, backend: str = EMBEDDING_BACKEND) -> None:
+    """Persist FAISS index to disk for faster startup next time, recording its embedding backend."""
+    expected = BACKEND_DIMENSIONS.get(backend)
+    if vector_store.index.d != expected:
+        raise ValueError(f"Index dimension {vector_store.index.d} does not match the {backend!r} backend ({expected}-d)")
     os.makedirs(os.path.dirname(folder_path) or ".", exist_ok=True)
     vector_store.save_local(folder_path)
+    with open(os.path.join(folder_path, INDEX_MANIFEST), "w") as f:
+        json.dump({"backend": backend, "dimension": int(vector_store.index.d)}, f)
 
 
-def get_retriever(vector_store: FAISS, k: int = 10) -> Any:
+def get_retriever(vector_store: "FAISS", k: int = 10) -> Any:
     """Return a retriever over the FAISS store with top-k results."""
     return vector_store.as_retriever(search_kwargs={"k": k})
 
@@ -39,3 +100,139 @@ def get_retriever(vector_store: FAISS, k: int = 10) -> Any:
 def retrieve_players(query: str, retriever: Any) -> List[Document]:
     """Retrieve player documents matching the natural-language query."""
     return retriever.invoke(query)
+
+
+def reciprocal_rank_fusion(rankings: List[List[Dict[str, Any]]], k: int = RRF_K) -> List[Dict[str, Any]]:
+    """Merge ranked lists of player metadata; players ranked well in several lists come first."""
+    scores: Dict[int, float] = {}
+    players: Dict[int, Dict[str, Any]] = {}
+    for ranking in rankings:
+        for rank, meta in enumerate(ranking, start=1):
+            key = player_key(meta)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            players.setdefault(key, meta)
+    return [players[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+
+class SearchResult(NamedTuple):
+    players: List[Dict[str, Any]]
+    path: str  # which retrieval path answered (see _stats)
+    query_vector: Optional[np.ndarray]  # the query embedding, None if no embedding call was made
+
+
+def embed_query(vector_store: "FAISS", query: str) -> np.ndarray:
+    """Embed a query with the index's own embedding model (one embedding call)."""
+    with metrics.stage("embedding", queries=1):
+        return np.asarray(vector_store._embed_query(query), dtype=np.float32)
+
+
+def search_by_vector(
+    vector_store: "FAISS", vector: np.ndarray, k: int, partition: Optional[np.ndarray] = None
+) -> List[Dict[str, Any]]:
+    """Exact nearest players to an already-embedded query, optionally restricted to a set of
+    FAISS row ids (see position_partitions)."""
+    if partition is not None and not len(partition):
+        return []
+    query = np.array([vector], dtype=np.float32)
+    if vector_store._normalize_L2:
+        faiss.normalize_L2(query)
+    with metrics.stage("vector_search", k=k, filtered=partition is not None):
+        if partition is None:
+            _, rows = vector_store.index.search(query, k)
+        else:
+            selector = faiss.IDSelectorBatch(partition)
+            _, rows = vector_store.index.search(query, k, params=faiss.SearchParameters(sel=selector))
+    return [
+        vector_store.docstore.search(vector_store.index_to_docstore_id[row]).metadata
+        for row in rows[0] if row != -1
+    ]
+
+
+def position_partitions(vector_store: "FAISS") -> Dict[str, np.ndarray]:
+    """FAISS row ids per position bucket (GK/DEF/MID/FWD) and per natural position (CB, LW, ...),
+    each sorted by overall descending, for filtered searches."""
+    members: Dict[str, List[Tuple[int, int]]] = {}
+    for row, doc_id in vector_store.index_to_docstore_id.items():
+        meta = vector_store.docstore.search(doc_id).metadata
+        overall = int(meta.get("overall") or 0)
+        positions = [p.strip() for p in str(meta.get("player_positions") or "").split(",") if p.strip()]
+        bucket = meta.get("primary_position") or POSITION_TO_CATEGORY.get(positions[0] if positions else "", "")
+        for name in set(positions) | ({bucket} if bucket else set()):
+            members.setdefault(name, []).append((overall, row))
+    return {
+        name: np.array([row for _, row in sorted(rows, key=lambda r: -r[0])], dtype=np.int64)
+        for name, rows in members.items()
+    }
+
+
+def nation_partitions(vector_store: "FAISS") -> Dict[str, np.ndarray]:
+    """Sorted FAISS row ids per nationality (lowercased), for nation-restricted searches."""
+    members: Dict[str, List[int]] = {}
+    for row, doc_id in vector_store.index_to_docstore_id.items():
+        nation = str(vector_store.docstore.search(doc_id).metadata.get("nationality_name") or "").strip().lower()
+        if nation:
+            members.setdefault(nation, []).append(row)
+    return {nation: np.array(sorted(rows), dtype=np.int64) for nation, rows in members.items()}
+
+
+def embed_queries(vector_store: "FAISS", queries: List[str]) -> np.ndarray:
+    """Embed many queries with the index's embedding model in one batched call (len(queries) x d)."""
+    if not queries:
+        return np.zeros((0, vector_store.index.d), dtype=np.float32)
+    with metrics.stage("embedding", queries=len(queries)):
+        return np.asarray(vector_store.embeddings.embed_documents(queries), dtype=np.float32)
+
+
+def takes_lexical_fast_path(query: str, lexical_index: BM25Index, hits: int) -> bool:
+    """Whether a hybrid query with `hits` keyword hits is answered without an embedding call: player-name
+    lookups with any hit, other entity lookups with at least LEXICAL_FAST_PATH_MIN_HITS."""
+    if not hits:
+        return False
+    if lexical_index.is_name_lookup(query):
+        return True
+    return hits >= LEXICAL_FAST_PATH_MIN_HITS and lexical_index.is_entity_lookup(query)
+
+
+def hybrid_search(
+    query: str,
+    vector_store: "FAISS",
+    lexical_index: BM25Index,
+    players: List[Dict[str, Any]],
+    k: int = 60,
+    mode: str = "hybrid",
+) -> SearchResult:
+    """Top-k player metadata for a query, the path that answered it and the query embedding.
+
+    `players` is the metadata list the lexical index was built from. In "hybrid" mode, player-name
+    lookups ("Haaland") and other entity lookups with enough keyword hits skip the embedding call
+    ("lexical_fast_path"); other queries fuse BM25 and FAISS rankings ("fused").
+    """
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    lexical: List[Dict[str, Any]] = []
+    vector: Optional[np.ndarray] = None
+    if mode != "semantic":
+        with metrics.stage("lexical_search", k=k):
+            lexical = [players[row] for row, _ in lexical_index.search(query, k=k)]
+    if mode == "lexical":
+        path = "lexical_only"
+        results = lexical
+    elif mode == "hybrid" and takes_lexical_fast_path(query, lexical_index, len(lexical)):
+        path = "lexical_fast_path"
+        results = lexical
+    else:
+        vector = embed_query(vector_store, query)
+        semantic = search_by_vector(vector_store, vector, k)
+        path = "semantic_only" if mode == "semantic" else "fused"
+        results = semantic if mode == "semantic" else reciprocal_rank_fusion([semantic, lexical])[:k]
+    with _stats_lock:
+        _stats["queries"] += 1
+        _stats[path] += 1
+    tracing.set_attributes(retrieval_path=path)
+    return SearchResult(results, path, vector)
+
+
+def retrieval_stats() -> Dict[str, int]:
+    """How many queries each retrieval path answered."""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,131 @@
+"""
+Tactic-aware fit scoring for the World Cup Squad Builder.
+
+Every indexed player is reduced once to a row of FIT_FEATURES. A tactic (formation,
+build-up style, defensive approach) maps to one attribute-weight column per slot position
+(SLOT_POSITIONS), so fit scores for the whole player table are a single matrix multiply:
+features (n x F) @ profiles (F x S) -> scores (n x S), on the same 0-99 scale as the stats.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+SLOT_POSITIONS: Tuple[str, ...] = ("GK", "CB", "LB", "RB", "CDM", "CM", "CAM", "LM", "RM", "LW", "RW", "ST")
+SLOT_INDEX: Dict[str, int] = {pos: i for i, pos in enumerate(SLOT_POSITIONS)}
+
+FIT_FEATURES: Tuple[str, ...] = (
+    "overall", "pace", "shooting", "passing", "dribbling", "defending", "physic",
+    "attacking_work_rate", "defensive_work_rate", "goalkeeping",
+)
+FEATURE_INDEX: Dict[str, int] = {name: i for i, name in enumerate(FIT_FEATURES)}
+
+# work_rate is "<attacking>/<defensive>", e.g. "High/Medium"; mapped onto the stat scale
+WORK_RATE_VALUES = {"low": 40.0, "medium": 65.0, "high": 90.0}
+GK_STATS = ("gk_diving", "gk_handling", "gk_kicking", "gk_reflexes", "gk_positioning")
+
+# Base attribute weights per slot position (normalized to sum to 1 after adjustments)
+SLOT_PROFILES: Dict[str, Dict[str, float]] = {
+    "GK": {"overall": 0.5, "goalkeeping": 0.5},
+    "CB": {"overall": 0.4, "defending": 0.35, "physic": 0.2, "pace": 0.05},
+    "LB": {"overall": 0.4, "defending": 0.25, "pace": 0.2, "physic": 0.05, "passing": 0.1},
+    "RB": {"overall": 0.4, "defending": 0.25, "pace": 0.2, "physic": 0.05, "passing": 0.1},
+    "CDM": {"overall": 0.4, "defending": 0.25, "passing": 0.2, "physic": 0.15},
+    "CM": {"overall": 0.4, "passing": 0.3, "dribbling": 0.15, "defending": 0.05, "physic": 0.1},
+    "CAM": {"overall": 0.4, "passing": 0.25, "dribbling": 0.25, "shooting": 0.1},
+    "LM": {"overall": 0.4, "pace": 0.2, "dribbling": 0.2, "passing": 0.2},
+    "RM": {"overall": 0.4, "pace": 0.2, "dribbling": 0.2, "passing": 0.2},
+    "LW": {"overall": 0.4, "pace": 0.25, "dribbling": 0.25, "shooting": 0.1},
+    "RW": {"overall": 0.4, "pace": 0.25, "dribbling": 0.25, "shooting": 0.1},
+    "ST": {"overall": 0.4, "shooting": 0.35, "physic": 0.1, "pace": 0.15},
+}
+
+# Weight added per slot position for a build-up style / defensive approach ("Balanced" adds nothing)
+BUILD_UP_ADJUSTMENTS: Dict[str, Dict[str, Dict[str, float]]] = {
+    "Counter-Attack": {
+        **{pos: {"pace": 0.15} for pos in ("LB", "RB", "LM", "RM", "LW", "RW", "ST")},
+        "CM": {"passing": 0.1},
+        "CAM": {"passing": 0.1, "pace": 0.05},
+    },
+    "Short Passing": {
+        **{pos: {"passing": 0.15} for pos in ("CB", "LB", "RB", "CDM", "CM", "CAM")},
+        **{pos: {"dribbling": 0.1, "passing": 0.05} for pos in ("LM", "RM", "LW", "RW", "ST")},
+    },
+}
+DEFENSIVE_ADJUSTMENTS: Dict[str, Dict[str, Dict[str, float]]] = {
+    "High Press": {
+        **{pos: {"pace": 0.1, "physic": 0.05, "defensive_work_rate": 0.15}
+           for pos in ("CDM", "CM", "CAM", "LM", "RM", "LW", "RW", "ST")},
+        **{pos: {"pace": 0.15} for pos in ("CB", "LB", "RB")},
+    },
+    "Deep Block": {
+        **{pos: {"defending": 0.15, "physic": 0.05} for pos in ("CB", "LB", "RB", "CDM")},
+        **{pos: {"defending": 0.1, "defensive_work_rate": 0.05} for pos in ("CM", "LM", "RM")},
+    },
+    "Aggressive": {
+        **{pos: {"physic": 0.15, "defending": 0.05} for pos in ("CB", "LB", "RB", "CDM", "CM")},
+        **{pos: {"physic": 0.1, "defensive_work_rate": 0.05} for pos in ("CAM", "LM", "RM", "LW", "RW", "ST")},
+    },
+}
+# Formation-specific roles, e.g. wide midfielders in a back three play as wing-backs
+FORMATION_ADJUSTMENTS: Dict[str, Dict[str, Dict[str, float]]] = {
+    "3-5-2": {"LM": {"defending": 0.15, "pace": 0.05}, "RM": {"defending": 0.15, "pace": 0.05}},
+    "3-4-3": {"LM": {"defending": 0.1, "pace": 0.05}, "RM": {"defending": 0.1, "pace": 0.05}},
+    "4-2-3-1": {"LM": {"shooting": 0.1}, "RM": {"shooting": 0.1}},
+}
+
+
+def _stat(meta: Dict[str, Any], key: str) -> float:
+    try:
+        value = float(meta.get(key))
+    except (TypeError, ValueError):
+        return 0.0
+    return value if value == value else 0.0  # NaN -> 0
+
+
+def feature_row(meta: Dict[str, Any]) -> List[float]:
+    """One player's FIT_FEATURES values (missing stats count as 0)."""
+    attacking, _, defensive = str(meta.get("work_rate") or "").lower().partition("/")
+    goalkeeping = [_stat(meta, k) for k in GK_STATS]
+    return [
+        _stat(meta, "overall"),
+        _stat(meta, "pace"),
+        _stat(meta, "shooting"),
+        _stat(meta, "passing"),
+        _stat(meta, "dribbling"),
+        _stat(meta, "defending"),
+        _stat(meta, "physic"),
+        WORK_RATE_VALUES.get(attacking.strip(), WORK_RATE_VALUES["medium"]),
+        WORK_RATE_VALUES.get(defensive.strip(), WORK_RATE_VALUES["medium"]),
+        sum(goalkeeping) / len(goalkeeping),
+    ]
+
+
+def feature_matrix(players: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """Player stat table (n x len(FIT_FEATURES)), built once per player index."""
+    rows = [feature_row(meta) for meta in players]
+    return np.asarray(rows, dtype=np.float32).reshape(len(rows), len(FIT_FEATURES))
+
+
+@lru_cache(maxsize=None)
+def tactic_profiles(formation: str, build_up_style: str, defensive_approach: str) -> np.ndarray:
+    """Attribute weights (len(FIT_FEATURES) x len(SLOT_POSITIONS)) for a tactic; columns sum to 1."""
+    weights = np.zeros((len(FIT_FEATURES), len(SLOT_POSITIONS)), dtype=np.float32)
+    adjustments = (
+        BUILD_UP_ADJUSTMENTS.get(build_up_style, {}),
+        DEFENSIVE_ADJUSTMENTS.get(defensive_approach, {}),
+        FORMATION_ADJUSTMENTS.get(formation, {}),
+    )
+    for pos, j in SLOT_INDEX.items():
+        for profile in (SLOT_PROFILES[pos],) + tuple(adj.get(pos, {}) for adj in adjustments):
+            for feature, w in profile.items():
+                weights[FEATURE_INDEX[feature], j] += w
+        weights[:, j] /= weights[:, j].sum()
+    weights.flags.writeable = False
+    return weights
+
+
+def fit_scores(features: np.ndarray, formation: str, build_up_style: str, defensive_approach: str) -> np.ndarray:
+    """Fit of every player for every slot position under a tactic (n x len(SLOT_POSITIONS))."""
+    return features @ tactic_profiles(formation, build_up_style, defensive_approach)
@@ -0,0 +1,63 @@
+"""
+Numeric "similar players" search for the World Cup Squad Builder.
+
+Players are compared on a z-score normalized stat vector (face stats, GK stats, sprint and
+acceleration, height/weight, weak foot/skill moves). The matrix is rebuilt with the player
+table and searched exactly with one vectorized distance computation: no embedding call.
+"""
+
+import warnings
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+SIMILARITY_FEATURES: Tuple[str, ...] = (
+    "pace", "shooting", "passing", "dribbling", "defending", "physic",
+    "gk_diving", "gk_handling", "gk_kicking", "gk_reflexes", "gk_speed", "gk_positioning",
+    "movement_sprint_speed", "movement_acceleration",
+    "height_cm", "weight_kg",
+    "weak_foot", "skill_moves",
+)
+
+
+def _value(meta: Dict[str, Any], key: str) -> float:
+    try:
+        return float(meta.get(key))
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def similarity_matrix(players: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """Normalized stat vectors (n x len(SIMILARITY_FEATURES)); missing stats sit at the column mean."""
+    rows = [[_value(meta, k) for k in SIMILARITY_FEATURES] for meta in players]
+    matrix = np.asarray(rows, dtype=np.float64).reshape(len(rows), len(SIMILARITY_FEATURES))
+    if not len(matrix):
+        return matrix.astype(np.float32)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-missing columns (e.g. no GK stats)
+        mean = np.nanmean(matrix, axis=0)
+        std = np.nanstd(matrix, axis=0)
+    std = np.where(np.isfinite(std) & (std > 0), std, 1.0)
+    normalized = (matrix - mean) / std
+    return np.nan_to_num(normalized, nan=0.0).astype(np.float32)
+
+
+def nearest(
+    vectors: np.ndarray, row: int, k: int = 10, mask: Optional[np.ndarray] = None
+) -> List[Tuple[int, float]]:
+    """Exact k nearest rows to `row` by Euclidean distance, excluding itself.
+
+    `mask` (bool, one per row) restricts the candidates. Returns (row, distance) pairs, closest first.
+    """
+    candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(vectors))
+    candidates = candidates[candidates != row]
+    if k <= 0 or not len(candidates):
+        return []
+    diff = vectors[candidates] - vectors[row]
+    dist = np.einsum("ij,ij->i", diff, diff)
+    if len(candidates) > k:
+        top = np.argpartition(dist, k - 1)[:k]
+    else:
+        top = np.arange(len(candidates))
+    top = top[np.argsort(dist[top], kind="stable")]
+    return [(int(candidates[i]), float(np.sqrt(dist[i]))) for i in top]
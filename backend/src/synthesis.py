@@ -5,8 +5,7 @@ Stage 4: Synthesis and report generation for the World Cup Squad Builder.
 import json
 from typing import List, Dict, Any
 
-from langchain_openai import ChatOpenAI
-
+from src import clients, metrics
 from src.prompts import SYNTHESIS_PROMPT
 
 
@@ -56,7 +55,8 @@ def generate_report(squad: Dict[str, Any], constraints_applied: Dict[str, Any])
     )
     constraints_text = json.dumps(constraints_applied, indent=2)
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+    llm = clients.chat_model("synthesis")
     chain = SYNTHESIS_PROMPT | llm
-    resp = chain.invoke({"squad": squad_text, "constraints_applied": constraints_text})
+    with metrics.llm_call("synthesis") as call:
+        resp = call["response"] = chain.invoke({"squad": squad_text, "constraints_applied": constraints_text})
     return resp.content if hasattr(resp, "content") else str(resp)
@@ -0,0 +1,175 @@
+"""
+Rule-based tactics extraction for chat messages, used in front of the tactics LLM call.
+
+Messages often state formation, budget and style outright ("4-3-3, high press, under
+200 million"). parse_tactics() reads those deterministically and returns a confidence
+score; the API only calls the LLM when the parser is unsure.
+"""
+
+import re
+import threading
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+# Valid tactic options (must match frontend types)
+VALID_FORMATIONS = ("4-3-3", "4-4-2", "3-5-2", "4-2-3-1", "3-4-3")
+VALID_BUILD_UP = ("Balanced", "Counter-Attack", "Short Passing")
+VALID_DEFENSIVE = ("Balanced", "Deep Block", "High Press", "Aggressive")
+
+# Parses at or above this confidence skip the LLM
+MIN_CONFIDENCE = 0.75
+
+# Confidence earned by each field stated outright; a formation plus one style or the budget is enough
+FIELD_WEIGHTS = {"formation": 0.5, "build_up_style": 0.25, "defensive_approach": 0.25, "budget": 0.25}
+# Messages this short that state any field ("4-4-2", "high press please") need nothing else read
+TERSE_WORDS = 4
+
+BUILD_UP_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "Counter-Attack": ("counter-attack", "counter attack", "counterattack", "counter-attacking",
+                       "counter attacking", "on the break", "direct play", "quick transitions"),
+    "Short Passing": ("short passing", "short-passing", "possession", "tiki-taka", "tiki taka",
+                      "tikitaka", "build from the back", "keep the ball"),
+    "Balanced": ("balanced build", "balanced style", "balanced approach"),
+}
+DEFENSIVE_KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    "High Press": ("high press", "high-press", "high pressing", "pressing", "gegenpress", "press high"),
+    "Deep Block": ("deep block", "low block", "deep defence", "deep defense", "park the bus", "sit deep"),
+    "Aggressive": ("aggressive", "hard tackling", "hard-tackling", "physical defending"),
+    "Balanced": ("balanced defence", "balanced defense", "balanced defensive"),
+}
+
+# Words that signal tactical intent the keyword maps can't resolve on their own
+VAGUE_HINT_RE = re.compile(
+    r"\b(defensive|attacking|offensive|attack-minded|entertaining|solid|compact|similar to|style of|"
+    r"inspired by|plays like)\b"
+)
+BUDGET_HINT_RE = re.compile(r"\b(budget|cheap|afford|spend|million|millions|cost|costs|money|price)\b|€")
+NO_BUDGET_PHRASES = ("no budget", "unlimited budget", "without a budget", "money is no object", "any price")
+
+FORMATION_RE = re.compile(r"(?<![\d.])([2-5])\s*[-–]\s*([1-5])\s*[-–]\s*([1-5])(?:\s*[-–]\s*([1-5]))?(?![\d.])")
+BUDGET_RE = re.compile(
+    r"\b(under|below|max(?:imum)?|budget(?: of)?|up to|less than|within|no more than|cap(?: of)?|spend)\s*"
+    r"(€|eur\s*|euros?\s*)?(\d+(?:[.,]\d+)?)\s*(m|mn|mil|million|millions|b|bn|billion|k|thousand)?\b",
+    re.IGNORECASE,
+)
+# Unit-less amounts below this after "under"/"below" are more likely ages ("players under 25")
+MIN_BARE_BUDGET = 50.0
+AMOUNT_RE = re.compile(
+    r"€\s*(\d+(?:[.,]\d+)?)\s*(m|mn|mil|million|millions|b|bn|billion|k|thousand)?\b"
+    r"|(\d+(?:[.,]\d+)?)\s*(m|mn|million|millions|b|bn|billion)\s*(?:€|eur|euros?)?\b",
+    re.IGNORECASE,
+)
+UNIT_TO_MILLIONS = {"b": 1000.0, "bn": 1000.0, "billion": 1000.0, "k": 0.001, "thousand": 0.001}
+
+
+class ParsedTactics(NamedTuple):
+    formation: str
+    build_up_style: str
+    defensive_approach: str
+    budget_enabled: bool
+    budget: float  # millions EUR
+    confidence: float
+    explicit: FrozenSet[str]  # fields stated outright in the message
+
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "rule_based": 0, "llm": 0}
+
+
+def record_inference(rule_based: bool) -> None:
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["rule_based" if rule_based else "llm"] += 1
+
+
+def tactics_stats() -> Dict[str, float]:
+    """Counts of chat tactics inferences and the fraction that skipped the LLM."""
+    with _stats_lock:
+        stats: Dict[str, float] = dict(_stats)
+    stats["llm_skip_ratio"] = stats["rule_based"] / stats["requests"] if stats["requests"] else 0.0
+    return stats
+
+
+def _to_millions(number: str, unit: Optional[str]) -> float:
+    value = float(number.replace(",", "."))
+    unit = (unit or "").lower()
+    if unit in UNIT_TO_MILLIONS:
+        return value * UNIT_TO_MILLIONS[unit]
+    if not unit and value >= 100_000:
+        return value / 1_000_000  # a raw EUR amount
+    return value
+
+
+def _keyword_matches(text: str, keywords: Dict[str, Tuple[str, ...]]) -> List[str]:
+    return [option for option, words in keywords.items() if any(w in text for w in words)]
+
+
+def parse_tactics(message: str) -> ParsedTactics:
+    """Deterministically extract formation, styles and budget from a chat message.
+
+    Missing fields default to 4-3-3 / Balanced / Balanced / no budget. Confidence comes only
+    from the fields stated outright (FIELD_WEIGHTS), so a message that names none of them
+    ("a team that sits back and counters") scores 0 unless it is empty. It drops further for
+    conflicting keywords, budget talk without a readable amount, and vague intent ("a
+    defensive team") that only the LLM can turn into a formation.
+    """
+    text = " ".join((message or "").lower().split())
+    explicit = set()
+    penalty = 0.0
+
+    formation = "4-3-3"
+    formations = {"-".join(g for g in m.groups() if g) for m in FORMATION_RE.finditer(text)}
+    if len(formations) == 1 and formations <= set(VALID_FORMATIONS):
+        formation = formations.pop()
+        explicit.add("formation")
+    elif formations:
+        penalty += 0.5  # several formations, or one the frontend doesn't offer (e.g. 5-3-2)
+
+    build_up = "Balanced"
+    matches = _keyword_matches(text, BUILD_UP_KEYWORDS)
+    if len(matches) == 1:
+        build_up = matches[0]
+        explicit.add("build_up_style")
+    elif len(matches) > 1:
+        penalty += 0.5
+
+    defensive = "Balanced"
+    matches = _keyword_matches(text, DEFENSIVE_KEYWORDS)
+    if len(matches) == 1:
+        defensive = matches[0]
+        explicit.add("defensive_approach")
+    elif len(matches) > 1:
+        penalty += 0.5
+
+    budget_enabled, budget = False, 0.0
+    if any(p in text for p in NO_BUDGET_PHRASES):
+        explicit.add("budget")
+    else:
+        amount = None
+        for m in BUDGET_RE.finditer(text):
+            keyword, currency, number, unit = m.groups()
+            value = _to_millions(number, unit)
+            if currency or unit or keyword.startswith(("budget", "cap")) or value >= MIN_BARE_BUDGET:
+                amount = value
+                break
+        if amount is None:
+            m = AMOUNT_RE.search(text)
+            if m:
+                amount = _to_millions(m.group(1) or m.group(3), m.group(2) or m.group(4))
+        if amount is not None and 0 < amount <= 2000:
+            budget_enabled, budget = True, round(amount, 1)
+            explicit.add("budget")
+        elif BUDGET_HINT_RE.search(text):
+            penalty += 0.5
+
+    if "formation" not in explicit and VAGUE_HINT_RE.search(text):
+        penalty += 0.4
+
+    if not text:
+        confidence = 1.0  # nothing asked for: the defaults are the answer
+    elif explicit and len(text.split()) <= TERSE_WORDS:
+        confidence = 1.0
+    else:
+        confidence = min(1.0, sum(FIELD_WEIGHTS[f] for f in explicit))
+    return ParsedTactics(
+        formation, build_up, defensive, budget_enabled, budget, max(confidence - penalty, 0.0), frozenset(explicit)
+    )
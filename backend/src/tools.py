@@ -3,41 +3,30 @@ LangChain tools wrapping each pipeline stage for agent orchestration.
 """
 
 import json
-from typing import Any, List
 
 from langchain_core.tools import Tool
 
-from src import ingestion, retrieval, reasoning, synthesis
+from src import loader, retrieval, reasoning, synthesis
 
-# Module-level cache for documents and vector store (set by ingestion, used by retrieval)
-_cached_documents: List[Any] = []
-_cached_vector_store: Any = None
-_cached_retriever: Any = None
+TOOL_RETRIEVER_K = 30
 
 
 def data_ingestion_tool_fn(input_str: str) -> str:
-    """Load and clean FIFA player data; cache documents for retrieval."""
-    global _cached_documents, _cached_vector_store, _cached_retriever
-    _cached_documents = ingestion.load_and_clean_data()
-    _cached_vector_store = None
-    _cached_retriever = None
-    return f"Loaded and cleaned {len(_cached_documents)} players. Use retrieval_or_filter_tool to find players by criteria."
+    """Load the player index (shared with the API; built from the cleaned CSV if not saved yet)."""
+    data = loader.shared_loader().get()
+    return f"Loaded and cleaned {data.vector_store.index.ntotal} players. Use retrieval_or_filter_tool to find players by criteria."
 
 
 def retrieval_or_filter_tool_fn(input_str: str) -> str:
     """Retrieve players matching the query; returns JSON list of player dicts."""
-    global _cached_documents, _cached_vector_store, _cached_retriever
     query = (input_str or "best players").strip()
     if not query:
         query = "best players"
-    if not _cached_documents and not _cached_vector_store:
-        _cached_documents = ingestion.load_and_clean_data()
-    if not _cached_documents:
+    try:
+        data = loader.shared_loader().get()
+    except FileNotFoundError:
         return "No player data available. Run data_ingestion_tool first."
-    if _cached_vector_store is None:
-        _cached_vector_store = retrieval.create_vector_store(_cached_documents)
-        _cached_retriever = retrieval.get_retriever(_cached_vector_store, k=30)
-    docs = retrieval.retrieve_players(query, _cached_retriever)
+    docs = retrieval.retrieve_players(query, retrieval.get_retriever(data.vector_store, k=TOOL_RETRIEVER_K))
     shortlist = []
     for d in docs:
         shortlist.append(d.metadata if hasattr(d, "metadata") else {})
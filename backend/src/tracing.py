@@ -0,0 +1,272 @@
+"""
+Request tracing for the World Cup Squad Builder, exported to a local JSON-lines file or an
+OTLP/HTTP (JSON) collector.
+
+The API opens a root span per request (continuing a W3C `traceparent` header when one
+is sent); every metrics.stage() and metrics.llm_call() inside it becomes a child span
+(tactics, retrieval queries, embedding calls, each LLM attempt, parsing, enrichment,
+assignment, alternatives, ...). The current span follows contextvars, so it carries
+over to the speculative generations on the shared client loop and to batch workers
+started with copy_context(). Finished spans are queued and written by one background
+thread; when the queue is full they are dropped (and counted) rather than slowing
+requests down. Tracing is off until configure() picks an exporter.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+logger = logging.getLogger("squad_api")
+
+EXPORTERS = ("none", "file", "otlp")
+SERVICE_NAME = "squad-api"
+
+# Finished spans waiting for export, spans per write, and seconds between writes
+MAX_QUEUE = 4096
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 1.0
+
+# The JSON-lines file is rotated (one previous file kept) past this size
+FILE_MAX_BYTES = 50_000_000
+
+_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes",
+                 "error", "sampled")
+
+    def __init__(self, name: str, kind: str, trace_id: str, parent_id: Optional[str], sampled: bool = True):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        self.sampled = sampled
+
+    def set_attributes(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class _Exporter:
+    """Queue of finished spans drained in batches by a daemon thread into `write`."""
+
+    def __init__(self, write: Callable[[List[Span]], None]):
+        self.write = write
+        self.stats = {"exported": 0, "dropped": 0, "export_errors": 0}
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=MAX_QUEUE)
+        threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.stats["dropped"] += 1
+
+    def flush(self, timeout: float = 10.0) -> None:
+        """Block until every span submitted so far has been written."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def _run(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if isinstance(item, Span):
+                batch.append(item)
+            if batch and (item is None or isinstance(item, threading.Event) or len(batch) >= BATCH_SIZE):
+                try:
+                    self.write(batch)
+                    self.stats["exported"] += len(batch)
+                except Exception as e:
+                    self.stats["export_errors"] += 1
+                    self.stats["dropped"] += len(batch)
+                    logger.warning("Trace export failed, dropped %d spans: %s", len(batch), e)
+                batch = []
+            if isinstance(item, threading.Event):
+                item.set()
+            if item is None or not batch:
+                deadline = time.monotonic() + FLUSH_INTERVAL
+
+
+def _file_writer(path: str) -> Callable[[List[Span]], None]:
+    def write(spans: List[Span]) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > FILE_MAX_BYTES:
+            os.replace(path, path + ".1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+
+    return write
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON body (ExportTraceServiceRequest) for a batch of spans."""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{
+                "scope": {"name": "squad_api"},
+                "spans": [
+                    {
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                        "name": span.name,
+                        "kind": _SPAN_KINDS.get(span.kind, 1),
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                    }
+                    for span in spans
+                ],
+            }],
+        }]
+    }
+
+
+def _otlp_writer(endpoint: str) -> Callable[[List[Span]], None]:
+    client = httpx.Client(timeout=5.0)
+
+    def write(spans: List[Span]) -> None:
+        client.post(endpoint, json=otlp_payload(spans)).raise_for_status()
+
+    return write
+
+
+_exporter: Optional[_Exporter] = None
+_sample_rate = 1.0
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("squad_span", default=None)
+
+
+def configure(exporter: str = "none", path: str = "", endpoint: str = "", sample_rate: float = 1.0) -> None:
+    """Start exporting spans: "file" appends JSON lines to `path`, "otlp" posts to an OTLP/HTTP
+    `endpoint` (e.g. http://localhost:4318/v1/traces); "none" turns tracing off. `sample_rate`
+    is the share of traces recorded."""
+    global _exporter, _sample_rate
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown trace exporter: {exporter}")
+    _sample_rate = sample_rate
+    if exporter == "file":
+        _exporter = _Exporter(_file_writer(path))
+    elif exporter == "otlp":
+        _exporter = _Exporter(_otlp_writer(endpoint))
+    else:
+        _exporter = None
+
+
+def enabled() -> bool:
+    return _exporter is not None
+
+
+def _parse_traceparent(header: Optional[str]) -> Optional[Span]:
+    """The remote parent from a W3C traceparent header ("00-<trace id>-<span id>-<flags>")."""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16), int(parts[3], 16)
+    except ValueError:
+        return None
+    remote = Span("remote", "server", parts[1], None, sampled=bool(int(parts[3], 16) & 1))
+    remote.span_id = parts[2]
+    return remote
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", traceparent: Optional[str] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Trace the block as a child of the current span (a new trace, or the `traceparent` one, if
+    there is none). Yields the span, or None when tracing is off or the trace is not sampled."""
+    if _exporter is None:
+        yield None
+        return
+    parent = _current.get() or _parse_traceparent(traceparent)
+    if parent is None:
+        current = Span(name, kind, os.urandom(16).hex(), None, sampled=random.random() < _sample_rate)
+    else:
+        current = Span(name, kind, parent.trace_id, parent.span_id, sampled=parent.sampled)
+    token = _current.set(current)
+    if not current.sampled:
+        try:
+            yield None
+        finally:
+            _current.reset(token)
+        return
+    current.attributes.update(attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        _exporter.submit(current)
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Add attributes to the current span, if it is recorded."""
+    current = _current.get()
+    if current is not None and current.sampled and _exporter is not None:
+        current.attributes.update(attributes)
+
+
+def traceparent() -> Optional[str]:
+    """W3C traceparent header value for the current span (to pass on to other services)."""
+    current = _current.get()
+    if current is None:
+        return None
+    return f"00-{current.trace_id}-{current.span_id}-{'01' if current.sampled else '00'}"
+
+
+def flush(timeout: float = 10.0) -> None:
+    if _exporter is not None:
+        _exporter.flush(timeout)
+
+
+def tracing_stats() -> Dict[str, int]:
+    """Spans exported, dropped (queue full or failed export) and failed export batches."""
+    return dict(_exporter.stats) if _exporter is not None else {"exported": 0, "dropped": 0, "export_errors": 0}
@@ -8,7 +8,7 @@ import { RightPanel } from './components/RightPanel';
 import { ProgressIndicator } from './components/ProgressIndicator';
 import { PlayerSelectionModal } from './components/PlayerSelectionModal';
 import { Info } from 'lucide-react';
-import { buildSquad as buildSquadAPI, sendChat as sendChatAPI, getReplacementCandidates } from './api';
+import { buildSquad as buildSquadAPI, sendChat as sendChatAPI, getReplacementCandidates, getSlotAlternatives } from './api';
 
 type SelectedLocation = { source: 'pitch' | 'bench' | 'reserve'; index: number } | null;
 type SelectionModalState = { source: 'pitch' | 'bench' | 'reserve'; index: number; position: string } | null;
@@ -46,6 +46,8 @@ export default function App() {
 
   // Strategy reasoning from backend
   const [strategyReasoning, setStrategyReasoning] = useState<string>('');
+  // Handle of the last built squad, for fetching per-slot alternatives
+  const [squadId, setSquadId] = useState<string | null>(null);
 
   // Player selection modal
   const [selectionModal, setSelectionModal] = useState<SelectionModalState>(null);
@@ -132,6 +134,7 @@ export default function App() {
       setBenchSlots(result.benchSlots);
       setReserveSlots(result.reserveSlots);
       setStrategyReasoning(result.strategyReasoning);
+      setSquadId(result.squadId ?? null);
 
       setPipelineStage('Complete');
       const endTime = Date.now();
@@ -192,6 +195,7 @@ export default function App() {
       setBenchSlots(result.benchSlots);
       setReserveSlots(result.reserveSlots);
       setStrategyReasoning(result.strategyReasoning);
+      setSquadId(result.squadId ?? null);
 
       // Reflect AI-inferred tactics and budget in the left panel so the user can see and optionally adjust
       if (result.formation != null) setFormation(result.formation as Formation);
@@ -248,8 +252,20 @@ export default function App() {
   };
 
   // Handle empty slot click (opens selection modal)
-  const handleEmptySlotClick = (source: 'pitch' | 'bench' | 'reserve', index: number, position: string) => {
+  const handleEmptySlotClick = async (source: 'pitch' | 'bench' | 'reserve', index: number, position: string) => {
     setSelectionModal({ source, index, position });
+    const slot = source === 'pitch' ? squadSlots[index] : undefined;
+    if (!squadId || !slot?.hasAlternatives || slot.alternatives) return;
+    // Alternatives are fetched lazily, the first time the slot is opened
+    setReplaceModalAlternativesLoading(true);
+    try {
+      const alternatives = await getSlotAlternatives(squadId, index);
+      setSquadSlots(prev => prev.map((s, i) => (i === index ? { ...s, alternatives } : s)));
+    } catch (err) {
+      console.error('Failed to fetch slot alternatives:', err);
+    } finally {
+      setReplaceModalAlternativesLoading(false);
+    }
   };
 
   // Open the selection modal for the currently selected player's slot (replace flow)
@@ -13,6 +13,8 @@ export interface BuildSquadRequest {
 }
 
 export interface BuildSquadResponse {
+  /** Handle for fetching per-slot alternatives */
+  squadId?: string;
   pitchSlots: SquadSlot[];
   benchSlots: SquadSlot[];
   reserveSlots: SquadSlot[];
@@ -91,6 +93,15 @@ export async function searchPlayers(
   return response.json();
 }
 
+export async function getSlotAlternatives(squadId: string, slotIndex: number): Promise<Player[]> {
+  const response = await fetch(`${API_BASE}/api/squads/${encodeURIComponent(squadId)}/alternatives/${slotIndex}`);
+  if (!response.ok) {
+    const detail = await response.text();
+    throw new Error(`API error ${response.status}: ${detail}`);
+  }
+  return response.json();
+}
+
 export async function getReplacementCandidates(
   position: string,
   currentPlayerId: string,
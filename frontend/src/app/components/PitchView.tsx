@@ -59,6 +59,7 @@ export function PitchView({ slots, formation, onPlayerClick, benchSlots, reserve
                 player={slot.player}
                 position={slot.position}
                 alternativeCount={slot.alternatives?.length || 0}
+                hasAlternatives={slot.hasAlternatives}
                 onClick={() => {
                   if (slot.player) {
                     onPlayerClick(index);
@@ -7,9 +7,11 @@ interface PlayerCardProps {
   size?: 'small' | 'medium';
   isEmpty?: boolean;
   alternativeCount?: number;
+  /** Alternatives exist but have not been fetched yet (badge shows "+" instead of a count) */
+  hasAlternatives?: boolean;
 }
 
-export function PlayerCard({ player, position, onClick, size = 'medium', isEmpty = false, alternativeCount = 0 }: PlayerCardProps) {
+export function PlayerCard({ player, position, onClick, size = 'medium', isEmpty = false, alternativeCount = 0, hasAlternatives = false }: PlayerCardProps) {
   const isSmall = size === 'small';
   
   if (!player) {
@@ -88,9 +90,9 @@ export function PlayerCard({ player, position, onClick, size = 'medium', isEmpty
         )}
 
         {/* Alternatives badge */}
-        {!player.locked && alternativeCount > 0 && (
+        {!player.locked && (alternativeCount > 0 || hasAlternatives) && (
           <div className="absolute -bottom-1 -right-1 w-5 h-5 rounded-full bg-[#4ade80] flex items-center justify-center shadow-md z-10">
-            <span className="text-[#1a1a2e] font-bold text-[9px]">{alternativeCount}</span>
+            <span className="text-[#1a1a2e] font-bold text-[9px]">{alternativeCount > 0 ? alternativeCount : '+'}</span>
           </div>
         )}
       </div>
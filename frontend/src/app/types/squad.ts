@@ -33,6 +33,8 @@ export interface SquadSlot {
   x: number; // percentage from left
   y: number; // percentage from top
   alternatives?: Player[];
+  /** Set by the API: alternatives exist and can be fetched with getSlotAlternatives */
+  hasAlternatives?: boolean;
 }
 
 export interface SquadConstraints {